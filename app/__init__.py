@@ -1,5 +1,6 @@
 from flask import Flask
 import os
+import threading
 from config import Config
 import logging
 
@@ -25,6 +26,21 @@ def create_app(config_class=Config):
     for folder in upload_folders:
         os.makedirs(folder, exist_ok=True)
     
+    # 디버그 산출물은 미디어 폴더와 분리된 별도 트리에 저장
+    os.makedirs(app.config['DEBUG_FOLDER'], exist_ok=True)
+    
+    # 보존 정책 (백그라운드 정리)
+    from app.services.retention_service import init_retention
+    init_retention(app)
+    
+    # 준비 상태 검사 (/health/ready)
+    from app.services.health_service import init_health
+    init_health(app)
+    
+    # Prometheus 메트릭 (/metrics)
+    from app.services.metrics import init_metrics
+    init_metrics(app)
+    
     # Blueprint 등록
     from app.routes.main import main_bp
     from app.routes.api import api_bp
@@ -32,4 +48,21 @@ def create_app(config_class=Config):
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    is_reloader_parent = app.config.get('DEBUG') and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+    
+    # 생성기 warm-up (첫 요청이 초기화를 기다리지 않도록 백그라운드에서 미리 실행)
+    if app.config.get('WARMUP_ENABLED') and not is_reloader_parent:
+        from app.routes.api import warm_up_media_service
+        threading.Thread(target=warm_up_media_service, name='media-warmup', daemon=True).start()
+    
+    # 재시작 전에 끝나지 않은 작업 복구 (생성기 초기화가 오래 걸리므로 백그라운드에서 실행)
+    if app.config.get('JOB_RECOVERY_ENABLED') and not is_reloader_parent:
+        from app.routes.api import recover_unfinished_jobs
+        threading.Thread(
+            target=recover_unfinished_jobs,
+            args=(app.config['JOB_MAX_ATTEMPTS'],),
+            name='job-recovery',
+            daemon=True
+        ).start()
+    
     return app
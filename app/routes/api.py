@@ -1,6 +1,11 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, send_file, Response
 import sys
 import os
+import json
+import time
+import queue
+import threading
+import importlib.util
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,6 +22,11 @@ except Exception as e:
     media_service_available = False
     
 from app.services.file_service import FileService
+from app.services.workflow_engine import WorkflowEngine, WorkflowValidationError
+from app.services.generation_scheduler import PRIORITIES, PRIORITY_INTERACTIVE, PRIORITY_BATCH, get_scheduler
+from app.services.progress_bus import get_progress_bus
+from app.services.job_store import UNFINISHED_STATUSES
+from app.services import tracing
 import asyncio
 import logging
 
@@ -24,14 +34,31 @@ logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
-# MediaService를 동적으로 초기화
+# MediaService를 동적으로 초기화 (앱 시작 시 warm-up 스레드 또는 첫 요청에서)
 media_service = None
+_media_service_lock = threading.Lock()
+
+# 시작 시 미리 초기화(warm-up) 상태
+_warmup_status = {
+    'state': 'pending',
+    'started_at': None,
+    'duration_seconds': None,
+    'modules': {},
+    'error': None
+}
 
 def get_media_service():
     """MediaService를 동적으로 가져오거나 초기화"""
     global media_service
     
-    if media_service is None and media_service_available:
+    if media_service is not None or not media_service_available:
+        return media_service
+    
+    # warm-up과 첫 요청이 동시에 초기화하지 않도록 잠금 (늦게 온 쪽은 초기화 완료를 기다림)
+    with _media_service_lock:
+        if media_service is not None:
+            return media_service
+        
         try:
             print("🔧 MediaService 초기화 시도...")
             print("🔍 환경 변수 확인:")
@@ -40,23 +67,24 @@ def get_media_service():
             print(f"   VIDEO_GENERATOR_TYPE: {os.getenv('VIDEO_GENERATOR_TYPE', 'auto')}")
             print(f"   USE_PLACEHOLDER_GENERATOR: {os.getenv('USE_PLACEHOLDER_GENERATOR', 'false')}")
             
-            # Playwright 설치 확인
-            try:
-                from playwright.async_api import async_playwright
-                print("✅ Playwright 모듈 import 성공")
-            except ImportError as e:
-                print(f"❌ Playwright 모듈 import 실패: {e}")
+            # Playwright 설치 확인 (import는 첫 사용 시점까지 미룸)
+            if importlib.util.find_spec('playwright') is not None:
+                print("✅ Playwright 모듈 확인")
+            else:
+                print("❌ Playwright 모듈을 찾을 수 없습니다.")
                 print("   Playwright 설치 필요: pip install playwright")
                 print("   브라우저 설치 필요: playwright install")
             
-            media_service = MediaService()
-            print(f"✅ MediaService 초기화 성공! 비디오 생성기: {type(media_service.video_generator).__name__}")
+            service = MediaService()
+            print(f"✅ MediaService 초기화 성공! 비디오 생성기: {type(service.video_generator).__name__}")
             
             # 생성기 상태 확인
-            if hasattr(media_service, 'video_generator') and hasattr(media_service.video_generator, 'get_status_report'):
-                status = media_service.video_generator.get_status_report()
+            if hasattr(service, 'video_generator') and hasattr(service.video_generator, 'get_status_report'):
+                status = service.video_generator.get_status_report()
                 print(f"📊 생성기 상태: {status}")
             
+            media_service = service
+            
         except Exception as e:
             print(f"❌ MediaService 초기화 실패: {e}")
             import traceback
@@ -66,6 +94,37 @@ def get_media_service():
     
     return media_service
 
+def warm_up_media_service():
+    """
+    앱 시작 시 MediaService와 무거운 의존성을 백그라운드에서 미리 초기화
+    
+    첫 요청이 생성기 초기화와 모듈 import 시간을 기다리지 않도록 합니다.
+    """
+    _warmup_status.update(state='warming', started_at=time.time(), error=None)
+    started = time.monotonic()
+    
+    try:
+        service = get_media_service()
+        if service is None:
+            raise RuntimeError('MediaService 초기화에 실패했습니다.')
+        
+        _warmup_status['modules'] = service.warm_up()
+        _warmup_status['state'] = 'ready'
+        logger.info(f"🔥 MediaService warm-up 완료 ({time.monotonic() - started:.2f}초)")
+    except Exception as e:
+        _warmup_status.update(state='failed', error=str(e))
+        logger.error(f"MediaService warm-up 실패: {str(e)}")
+    finally:
+        _warmup_status['duration_seconds'] = round(time.monotonic() - started, 3)
+
+def media_service_if_ready():
+    """초기화가 끝난 MediaService (아직이면 초기화하지 않고 None)"""
+    return media_service
+
+def get_warmup_status():
+    """warm-up 상태와 MediaService 준비 여부"""
+    return {**_warmup_status, 'ready': media_service is not None}
+
 # 비동기 작업을 위한 헬퍼 함수
 def run_async(coro):
     loop = asyncio.new_event_loop()
@@ -75,6 +134,21 @@ def run_async(coro):
     finally:
         loop.close()
 
+def _scheduling_options(data, default_priority):
+    """
+    요청의 스케줄링 우선순위와 테넌트
+
+    우선순위는 엔드포인트 기본값보다 낮추는 것만 허용합니다 (배치 요청이 interactive로 올라가지 않도록).
+    테넌트는 SCHEDULER_TENANT_WEIGHTS에 등록된 X-API-Key만 구분하고 나머지는 공용 테넌트로 묶습니다.
+    """
+    priority = (data or {}).get('priority', default_priority)
+    if PRIORITIES.get(priority, -1) < PRIORITIES[default_priority]:
+        priority = default_priority
+    return {
+        'priority': priority,
+        'tenant': get_scheduler().resolve_tenant(request.headers.get('X-API-Key'))
+    }
+
 @api_bp.route('/generate/image', methods=['POST'])
 def generate_image():
     """이미지 생성 API"""
@@ -92,11 +166,16 @@ def generate_image():
         
         prompt = data['prompt']
         aspect_ratio = data.get('aspect_ratio', '9:16')
+        all_variants = bool(data.get('all_variants', False))
         
-        current_app.logger.info(f"이미지 생성 요청: prompt='{prompt}', aspect_ratio='{aspect_ratio}'")
+        current_app.logger.info(f"이미지 생성 요청: prompt='{prompt}', aspect_ratio='{aspect_ratio}', all_variants={all_variants}")
         
-        # 이미지 생성 (비동기)
-        result = run_async(media_service.generate_image(prompt, aspect_ratio))
+        # 이미지 생성 (브라우저 풀 슬롯을 interactive 우선순위로 배정)
+        result = media_service.scheduler.run(
+            lambda: media_service.generate_image(prompt, aspect_ratio, all_variants),
+            resource='browser',
+            **_scheduling_options(data, PRIORITY_INTERACTIVE)
+        )
         
         if result['status'] == 'success':
             # 파일 경로 검증
@@ -114,7 +193,7 @@ def generate_image():
             current_app.logger.info(f"파일 경로: {filepath}")
             current_app.logger.info(f"웹 경로: {web_path}")
             
-            return jsonify({
+            response = {
                 'success': True,
                 'message': '이미지 생성이 완료되었습니다.',
                 'filename': result['filename'],
@@ -123,7 +202,13 @@ def generate_image():
                 'prompt': result['prompt'],
                 'aspect_ratio': result['aspect_ratio'],
                 'file_size': result.get('file_size', 0)
-            })
+            }
+            if 'variants' in result:
+                response['variants'] = [
+                    {**variant, 'web_path': _to_web_path(variant['filepath'], upload_folder)}
+                    for variant in result['variants']
+                ]
+            return jsonify(response)
         else:
             current_app.logger.error(f"이미지 생성 실패: {result['error']}")
             return jsonify({'error': result['error']}), 500
@@ -132,6 +217,153 @@ def generate_image():
         current_app.logger.error(f"이미지 생성 오류: {str(e)}")
         return jsonify({'error': '이미지 생성 중 오류가 발생했습니다.'}), 500
 
+def _to_web_path(filepath, upload_folder):
+    """파일 시스템 경로를 웹에서 접근 가능한 /uploads 경로로 변환"""
+    relative_path = os.path.relpath(filepath, upload_folder)
+    return '/uploads/' + relative_path.replace('\\', '/')  # Windows 경로 호환성
+
+def _with_web_paths(result, upload_folder):
+    """결과(중첩된 image/video 결과, variants 목록 포함)의 filepath마다 web_path 추가"""
+    if isinstance(result, list):
+        return [_with_web_paths(item, upload_folder) for item in result]
+    if not isinstance(result, dict):
+        return result
+    
+    result = {key: _with_web_paths(value, upload_folder) for key, value in result.items()}
+    if result.get('filepath') and 'web_path' not in result:
+        result['web_path'] = _to_web_path(result['filepath'], upload_folder)
+    return result
+
+def _parse_batch_items(data, default_aspect_ratio):
+    """배치 요청에서 항목 목록 추출 (items 또는 prompts)"""
+    items = data.get('items')
+    if items is None:
+        items = [{'prompt': prompt} for prompt in data.get('prompts', [])]
+    
+    parsed = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'prompt': item}
+        if not isinstance(item, dict) or not item.get('prompt'):
+            return None
+        parsed.append({
+            'prompt': item['prompt'],
+            'aspect_ratio': item.get('aspect_ratio', default_aspect_ratio),
+            'all_variants': bool(item.get('all_variants', data.get('all_variants', False)))
+        })
+    return parsed
+
+def _batch_response(events, stream):
+    """
+    배치 결과 응답 생성
+    
+    stream=True면 완료되는 순서대로 NDJSON 한 줄씩 전송하고 마지막 줄에 요약을 보냅니다.
+    """
+    if stream:
+        def generate():
+            for event in events:
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    items = []
+    summary = None
+    for event in events:
+        if event['type'] == 'summary':
+            summary = event
+        else:
+            items.append(event)
+    
+    items.sort(key=lambda x: x['index'])
+    return jsonify({
+        'success': True,
+        'results': items,
+        'summary': summary
+    })
+
+@api_bp.route('/generate/image/batch', methods=['POST'])
+def generate_image_batch():
+    """이미지 일괄 생성 API (여러 프롬프트를 브라우저 풀에 분산)"""
+    try:
+        media_service = get_media_service()
+        
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '데이터가 필요합니다.'}), 400
+        
+        items = _parse_batch_items(data, data.get('aspect_ratio', '9:16'))
+        if not items:
+            return jsonify({'error': '각 항목에 프롬프트가 필요합니다.'}), 400
+        
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(items) > max_items:
+            return jsonify({'error': f'한 번에 최대 {max_items}개까지 요청할 수 있습니다.'}), 400
+        
+        max_parallel = min(
+            int(data.get('max_parallel', current_app.config['IMAGE_BATCH_MAX_PARALLEL'])),
+            current_app.config['IMAGE_BATCH_MAX_PARALLEL']
+        )
+        stream = bool(data.get('stream', True))
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        
+        current_app.logger.info(f"이미지 배치 생성 요청: {len(items)}개, 동시 실행 {max_parallel}")
+        
+        scheduling = _scheduling_options(data, PRIORITY_BATCH)
+        
+        def events():
+            started = time.time()
+            succeeded = 0
+            
+            for completed in media_service.scheduler.iterate(
+                lambda: media_service.generate_images_batch(items, max_parallel),
+                **scheduling
+            ):
+                result = completed['result']
+                event = {
+                    'type': 'item',
+                    'index': completed['index'],
+                    'prompt': items[completed['index']]['prompt'],
+                    'aspect_ratio': items[completed['index']]['aspect_ratio']
+                }
+                
+                if result.get('status') == 'success' and os.path.exists(result['filepath']):
+                    succeeded += 1
+                    event.update({
+                        'success': True,
+                        'filename': result['filename'],
+                        'filepath': result['filepath'],
+                        'web_path': _to_web_path(result['filepath'], upload_folder),
+                        'file_size': result.get('file_size', 0)
+                    })
+                    if 'variants' in result:
+                        event['variants'] = _with_web_paths(result['variants'], upload_folder)
+                else:
+                    event.update({
+                        'success': False,
+                        'error': result.get('error', '이미지 파일을 찾을 수 없습니다.')
+                    })
+                
+                yield event
+            
+            yield {
+                'type': 'summary',
+                'total': len(items),
+                'succeeded': succeeded,
+                'failed': len(items) - succeeded,
+                'max_parallel': max_parallel,
+                'elapsed_seconds': round(time.time() - started, 2)
+            }
+        
+        return _batch_response(events(), stream)
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'잘못된 요청 값입니다: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"이미지 배치 생성 오류: {str(e)}")
+        return jsonify({'error': '이미지 배치 생성 중 오류가 발생했습니다.'}), 500
+
 @api_bp.route('/generate/video', methods=['POST'])
 def generate_video():
     """동영상 생성 API"""
@@ -209,27 +441,10 @@ def handle_image_to_video(data):
     
     # 생성기 타입 선택 (옵션)
     generator_type_str = data.get('generatorType')  # 'api', 'web', 'placeholder'
-    generator_type = None
-    
-    if generator_type_str:
-        try:
-            from app.services.generators.unified_video_generator import VideoGeneratorType
-            generator_map = {
-                'api': VideoGeneratorType.KLINGAI_API,
-                'web': VideoGeneratorType.KLINGAI_WEB,
-                'placeholder': VideoGeneratorType.PLACEHOLDER
-            }
-            generator_type = generator_map.get(generator_type_str.lower())
-        except ImportError as e:
-            current_app.logger.error(f"VideoGeneratorType import 실패: {e}")
+    generator_type = _parse_generator_type(generator_type_str)
     
     # 이미지 경로를 실제 파일 시스템 경로로 변환
-    if image_path.startswith('/uploads/'):
-        # 웹 경로를 실제 파일 경로로 변환
-        relative_path = image_path.replace('/uploads/', '')
-        absolute_image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], relative_path)
-    else:
-        absolute_image_path = image_path
+    absolute_image_path = _resolve_upload_path(image_path)
     
     # 파일 존재 확인
     if not os.path.exists(absolute_image_path):
@@ -256,17 +471,24 @@ def handle_image_to_video(data):
         current_app.logger.info(f"🎬 통합 비디오 생성기로 동영상 생성 시작!")
         
         # 통합 비디오 생성기를 사용하여 실제 동영상 생성
-        result = run_async(media_service.video_generator.generate_video(
-            image_path=absolute_image_path,
-            prompt=prompt,
-            negative_prompt=negative_prompt,
-            duration=duration,
-            cfg_scale=cfg_scale,
-            mode=mode,
-            output_count=output_count,  # 웹 생성기에서만 사용
-            generator_type=generator_type,  # 지정된 생성기 타입
-            fallback=True  # 실패 시 다른 생성기로 자동 전환
-        ))
+        # (스케줄러 루프에서 실행해 생성기별 동시 작업 할당량을 배치 작업과 공유)
+        # (작업 저장소에 기록해 서버가 재시작되어도 제출된 KlingAI 작업을 이어서 확인)
+        job_params = {
+            'image_path': absolute_image_path,
+            'prompt': prompt,
+            'negative_prompt': negative_prompt,
+            'duration': duration,
+            'cfg_scale': cfg_scale,
+            'mode': mode,
+            'output_count': output_count,  # 웹 생성기에서만 사용
+            'generator_type': generator_type.value if generator_type else None,  # 지정된 생성기 타입
+            'fallback': True,  # 실패 시 다른 생성기로 자동 전환
+            'hedge': bool(data.get('hedge', False))  # 느리면 다른 생성기로 동시 요청 (중복 비용)
+        }
+        result = media_service.scheduler.run(
+            lambda: media_service.run_tracked('video', job_params),
+            **_scheduling_options(data, PRIORITY_INTERACTIVE)
+        )
         
         if result['status'] == 'success':
             # 웹에서 접근 가능한 경로로 변환
@@ -292,7 +514,8 @@ def handle_image_to_video(data):
                 'views': 0,
                 'likes': 0,
                 'generator_type': result.get('generator_type'),
-                'generator_name': generator_name
+                'generator_name': generator_name,
+                'job_id': result['job_id']
             }
             
             # 대안 생성기 사용되었을 경우 메시지 업데이트
@@ -314,6 +537,148 @@ def handle_image_to_video(data):
         traceback.print_exc()
         return jsonify({'error': f'동영상 생성 중 오류가 발생했습니다: {str(e)}'}), 500
 
+def _parse_generator_type(generator_type_str):
+    """'api', 'web', 'placeholder' 문자열을 VideoGeneratorType으로 변환"""
+    if not generator_type_str:
+        return None
+    
+    try:
+        from app.services.generators.unified_video_generator import VideoGeneratorType
+        generator_map = {
+            'api': VideoGeneratorType.KLINGAI_API,
+            'web': VideoGeneratorType.KLINGAI_WEB,
+            'placeholder': VideoGeneratorType.PLACEHOLDER
+        }
+        return generator_map.get(generator_type_str.lower())
+    except ImportError as e:
+        current_app.logger.error(f"VideoGeneratorType import 실패: {e}")
+        return None
+
+def _resolve_upload_path(path):
+    """/uploads/ 웹 경로를 실제 파일 시스템 경로로 변환"""
+    if path.startswith('/uploads/'):
+        relative_path = path.replace('/uploads/', '', 1)
+        return os.path.join(current_app.config['UPLOAD_FOLDER'], relative_path)
+    return path
+
+@api_bp.route('/generate/video/batch', methods=['POST'])
+def generate_video_batch():
+    """이미지→동영상 일괄 생성 API (생성기별 동시 작업 할당량 내에서 실행, 초과분은 대기)"""
+    try:
+        media_service = get_media_service()
+        
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        data = request.get_json()
+        if not data or not isinstance(data.get('items'), list) or not data['items']:
+            return jsonify({'error': 'items 목록이 필요합니다.'}), 400
+        
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(data['items']) > max_items:
+            return jsonify({'error': f'한 번에 최대 {max_items}개까지 요청할 수 있습니다.'}), 400
+        
+        # 공통 옵션 (항목별 값이 있으면 항목 값 우선)
+        defaults = {
+            'prompt': data.get('prompt', ''),
+            'negativePrompt': data.get('negativePrompt', ''),
+            'duration': data.get('duration', 5),
+            'mode': data.get('mode', 'std'),
+            'cfgScale': data.get('cfgScale', 0.5)
+        }
+        
+        items = []
+        for index, raw_item in enumerate(data['items']):
+            if isinstance(raw_item, str):
+                raw_item = {'imagePath': raw_item}
+            if not isinstance(raw_item, dict) or 'imagePath' not in raw_item:
+                return jsonify({'error': f'{index}번 항목에 이미지 경로가 필요합니다.'}), 400
+            
+            image_path = _resolve_upload_path(raw_item['imagePath'])
+            if not os.path.exists(image_path):
+                return jsonify({'error': f"이미지 파일을 찾을 수 없습니다: {raw_item['imagePath']}"}), 400
+            
+            options = {**defaults, **raw_item}
+            items.append({
+                'source_path': raw_item['imagePath'],
+                'image_path': image_path,
+                'prompt': options['prompt'],
+                'negative_prompt': options['negativePrompt'],
+                'duration': int(options['duration']),
+                'mode': options['mode'],
+                'cfg_scale': float(options['cfgScale'])
+            })
+        
+        generator_type = _parse_generator_type(data.get('generatorType'))
+        fallback = bool(data.get('fallback', True))
+        hedge = bool(data.get('hedge', False))
+        max_parallel = data.get('max_parallel')
+        max_parallel = int(max_parallel) if max_parallel else None
+        stream = bool(data.get('stream', True))
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        
+        current_app.logger.info(
+            f"동영상 배치 생성 요청: {len(items)}개, 생성기 제한 {media_service.scheduler.get_stats()['limits']}"
+        )
+        
+        scheduling = _scheduling_options(data, PRIORITY_BATCH)
+        
+        def events():
+            started = time.time()
+            succeeded = 0
+            generators_used = {}
+            
+            for completed in media_service.scheduler.iterate(
+                lambda: media_service.generate_videos_batch(items, generator_type, fallback, max_parallel, hedge),
+                **scheduling
+            ):
+                result = completed['result']
+                event = {
+                    'type': 'item',
+                    'index': completed['index'],
+                    'image_path': items[completed['index']]['source_path'],
+                    'job_id': result.get('job_id')
+                }
+                
+                if result.get('status') == 'success':
+                    succeeded += 1
+                    generator_name = result.get('generator_type', 'unknown')
+                    generators_used[generator_name] = generators_used.get(generator_name, 0) + 1
+                    event.update({
+                        'success': True,
+                        'task_id': result.get('task_id'),
+                        'filename': result['filename'],
+                        'filepath': result['filepath'],
+                        'web_path': _to_web_path(result['filepath'], upload_folder),
+                        'generator_type': result.get('generator_type'),
+                        'generator_name': result.get('generator_name'),
+                        'fallback_from': result.get('fallback_from')
+                    })
+                else:
+                    event.update({
+                        'success': False,
+                        'error': result.get('error', '알 수 없는 오류')
+                    })
+                
+                yield event
+            
+            yield {
+                'type': 'summary',
+                'total': len(items),
+                'succeeded': succeeded,
+                'failed': len(items) - succeeded,
+                'generators_used': generators_used,
+                'elapsed_seconds': round(time.time() - started, 2)
+            }
+        
+        return _batch_response(events(), stream)
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'잘못된 요청 값입니다: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"동영상 배치 생성 오류: {str(e)}")
+        return jsonify({'error': '동영상 배치 생성 중 오류가 발생했습니다.'}), 500
+
 def handle_template_video(data):
     """템플릿으로 동영상 생성 처리"""
     if 'template' not in data:
@@ -398,10 +763,17 @@ def complete_workflow():
         video_options = data.get('video_options', {})
         edit_options = data.get('edit_options', None)
         
-        # 전체 워크플로우 실행 (비동기)
-        result = run_async(media_service.complete_workflow(
-            image_prompt, video_prompt, video_options, edit_options
-        ))
+        media_service = get_media_service()
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        # 전체 워크플로우 실행 (같은 workflow_id로 재요청하면 완료된 단계부터 재개)
+        result = media_service.scheduler.run(
+            lambda: media_service.complete_workflow(
+                image_prompt, video_prompt, video_options, edit_options, data.get('workflow_id')
+            ),
+            **_scheduling_options(data, PRIORITY_INTERACTIVE)
+        )
         
         if result['status'] == 'success':
             return jsonify({
@@ -410,12 +782,123 @@ def complete_workflow():
                 'result': result
             })
         else:
-            return jsonify({'error': result['error']}), 500
+            return jsonify({
+                'error': result['error'],
+                'workflow_id': result.get('workflow_id'),
+                'failed_step': result.get('failed_step')
+            }), 500
             
     except Exception as e:
         current_app.logger.error(f"워크플로우 실행 오류: {str(e)}")
         return jsonify({'error': '워크플로우 실행 중 오류가 발생했습니다.'}), 500
 
+@api_bp.route('/workflow/run', methods=['POST'])
+def run_workflow():
+    """DAG 워크플로우 실행 API (단계별 결과 캐시, 실패 시 같은 workflow_id로 재개)"""
+    try:
+        media_service = get_media_service()
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        data = request.get_json()
+        engine = WorkflowEngine(media_service)
+        
+        try:
+            engine.validate(data)
+        except WorkflowValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # 작업 저장소에 기록해 서버가 재시작되면 캐시된 단계 이후부터 다시 실행
+        result = media_service.scheduler.run(
+            lambda: media_service.run_tracked('dag', data),
+            **_scheduling_options(data, PRIORITY_INTERACTIVE)
+        )
+        
+        return jsonify({
+            'success': result['status'] == 'success',
+            **result
+        }), 200 if result['status'] == 'success' else 500
+        
+    except Exception as e:
+        current_app.logger.error(f"DAG 워크플로우 실행 오류: {str(e)}")
+        return jsonify({'error': '워크플로우 실행 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/workflow/batch', methods=['POST'])
+def batch_workflow():
+    """다중 항목 워크플로우 API (이미지 → 동영상 → 편집 단계를 파이프라인으로 실행)"""
+    try:
+        media_service = get_media_service()
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        data = request.get_json()
+        if not data or not isinstance(data.get('items'), list) or not data['items']:
+            return jsonify({'error': 'items 목록이 필요합니다.'}), 400
+        
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(data['items']) > max_items:
+            return jsonify({'error': f'한 번에 최대 {max_items}개까지 요청할 수 있습니다.'}), 400
+        
+        items = []
+        for index, item in enumerate(data['items']):
+            for field in ['image_prompt', 'video_prompt']:
+                if not isinstance(item, dict) or field not in item:
+                    return jsonify({'error': f'{index}번 항목에 {field}가 필요합니다.'}), 400
+            items.append({
+                'image_prompt': item['image_prompt'],
+                'video_prompt': item['video_prompt'],
+                'aspect_ratio': item.get('aspect_ratio', data.get('aspect_ratio', '9:16')),
+                'video_options': item.get('video_options', data.get('video_options', {})),
+                'edit_options': item.get('edit_options', data.get('edit_options'))
+            })
+        
+        # 단계별 워커 수 (요청 값은 1 ~ 설정값 범위에서만 줄일 수 있음)
+        max_workers = current_app.config['WORKFLOW_STAGE_WORKERS']
+        stage_workers = dict(max_workers)
+        requested_workers = data.get('stage_workers') or {}
+        if not isinstance(requested_workers, dict):
+            return jsonify({'error': 'stage_workers는 단계별 워커 수 객체여야 합니다.'}), 400
+        for stage, count in requested_workers.items():
+            if stage not in max_workers:
+                return jsonify({'error': f'알 수 없는 단계입니다: {stage}'}), 400
+            if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+                return jsonify({'error': f'{stage} 워커 수는 1 이상의 정수여야 합니다.'}), 400
+            stage_workers[stage] = min(count, max_workers[stage])
+        stream = bool(data.get('stream', True))
+        
+        scheduling = _scheduling_options(data, PRIORITY_BATCH)
+        
+        def events():
+            started = time.time()
+            succeeded = 0
+            
+            for result in media_service.scheduler.iterate(
+                lambda: media_service.complete_workflows(items, stage_workers),
+                **scheduling
+            ):
+                if result['status'] == 'success':
+                    succeeded += 1
+                yield {'type': 'item', 'success': result['status'] == 'success', **result}
+            
+            elapsed = time.time() - started
+            yield {
+                'type': 'summary',
+                'total': len(items),
+                'succeeded': succeeded,
+                'failed': len(items) - succeeded,
+                'stage_workers': stage_workers,
+                'elapsed_seconds': round(elapsed, 2),
+                'items_per_minute': round(len(items) / elapsed * 60, 2) if elapsed > 0 else None
+            }
+        
+        return _batch_response(events(), stream)
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'잘못된 요청 값입니다: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"배치 워크플로우 실행 오류: {str(e)}")
+        return jsonify({'error': '배치 워크플로우 실행 중 오류가 발생했습니다.'}), 500
+
 @api_bp.route('/media/list', methods=['GET'])
 def list_media():
     """미디어 파일 목록 조회"""
@@ -524,6 +1007,255 @@ def download_media(filepath):
         current_app.logger.error(f"파일 다운로드 오류: {str(e)}")
         return jsonify({'error': '파일 다운로드 중 오류가 발생했습니다.'}), 500
 
+@api_bp.route('/retention/status', methods=['GET'])
+def get_retention_status():
+    """보존 정책 및 마지막 정리 결과 조회"""
+    retention = current_app.extensions.get('retention')
+    if not retention:
+        return jsonify({'error': '보존 정책 서비스가 초기화되지 않았습니다.'}), 500
+    
+    return jsonify({
+        'success': True,
+        **retention.get_status()
+    })
+
+@api_bp.route('/retention/run', methods=['POST'])
+def run_retention():
+    """보존 정책 정리 즉시 실행"""
+    try:
+        retention = current_app.extensions.get('retention')
+        if not retention:
+            return jsonify({'error': '보존 정책 서비스가 초기화되지 않았습니다.'}), 500
+        
+        report = retention.sweep()
+        return jsonify({
+            'success': True,
+            'message': f"{report['deleted']}개 파일이 정리되었습니다.",
+            'report': report
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f"보존 정책 정리 오류: {str(e)}")
+        return jsonify({'error': '보존 정책 정리 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    작업 등록 API (즉시 job_id를 반환하고 백그라운드에서 실행)
+    
+    작업은 작업 저장소에 기록되므로 서버가 재시작되어도 이어서 실행됩니다.
+    """
+    try:
+        media_service = get_media_service()
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다. 서버 로그를 확인하세요.'}), 500
+        
+        data = request.get_json() or {}
+        kind = data.get('kind')
+        params = dict(data.get('params') or {})
+        
+        required_fields = {
+            'image': ['prompt'],
+            'video': ['image_path'],
+            'workflow': ['image_prompt', 'video_prompt']
+        }
+        if kind not in required_fields:
+            return jsonify({'error': 'kind는 image, video, workflow 중 하나여야 합니다.'}), 400
+        
+        for field in required_fields[kind]:
+            if field not in params:
+                return jsonify({'error': f'{field}가 필요합니다.'}), 400
+        
+        if kind == 'video':
+            params['image_path'] = _resolve_upload_path(params['image_path'])
+            if not os.path.exists(params['image_path']):
+                return jsonify({'error': f"이미지 파일을 찾을 수 없습니다: {data['params']['image_path']}"}), 400
+            
+            generator_type = _parse_generator_type(params.pop('generatorType', None))
+            if generator_type:
+                params['generator_type'] = generator_type.value
+        
+        job_id = media_service.submit_job(kind, params, **_scheduling_options(data, PRIORITY_BATCH))
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
+        
+    except Exception as e:
+        current_app.logger.error(f"작업 등록 오류: {str(e)}")
+        return jsonify({'error': '작업 등록 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """작업 목록 조회 (?status=queued|running|succeeded|failed)"""
+    try:
+        media_service = get_media_service()
+        if not media_service:
+            return jsonify({'error': 'MediaService를 사용할 수 없습니다.'}), 500
+        
+        jobs = media_service.jobs.list(
+            status=request.args.get('status'),
+            limit=request.args.get('limit', 50, type=int)
+        )
+        return jsonify({'success': True, 'jobs': [_without_traces(job) for job in jobs]})
+        
+    except Exception as e:
+        current_app.logger.error(f"작업 목록 조회 오류: {str(e)}")
+        return jsonify({'error': '작업 목록 조회 중 오류가 발생했습니다.'}), 500
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태 및 결과 조회"""
+    media_service = get_media_service()
+    if not media_service:
+        return jsonify({'error': 'MediaService를 사용할 수 없습니다.'}), 500
+    
+    job = media_service.jobs.get(job_id)
+    if not job:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    job['result'] = _with_web_paths(job['result'], current_app.config['UPLOAD_FOLDER'])
+    return jsonify({'success': True, 'job': _without_traces(job)})
+
+def _without_traces(job):
+    """작업 조회 응답에서 trace 본문 대신 개수만 포함 (상세는 /jobs/<id>/trace)"""
+    job = dict(job)
+    job['trace_count'] = len(job.pop('traces', None) or [])
+    return job
+
+def _trace_response(traces):
+    """?format=otlp면 OTLP/JSON, 아니면 span 목록 그대로 반환"""
+    if request.args.get('format') == 'otlp':
+        return jsonify(tracing.to_otlp(traces))
+    return jsonify({'success': True, 'traces': traces})
+
+@api_bp.route('/jobs/<job_id>/trace', methods=['GET'])
+def get_job_trace(job_id):
+    """작업의 단계별 실행 시간 trace 조회 (?format=json|otlp)"""
+    media_service = get_media_service()
+    if not media_service:
+        return jsonify({'error': 'MediaService를 사용할 수 없습니다.'}), 500
+    
+    job = media_service.jobs.get(job_id)
+    if not job:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    return _trace_response(job.get('traces') or [])
+
+@api_bp.route('/traces', methods=['GET'])
+def list_traces():
+    """최근 완료된 trace 요약 목록 (작업 밖에서 실행된 생성 포함)"""
+    limit = request.args.get('limit', 20, type=int)
+    summaries = [
+        {key: value for key, value in trace.items() if key != 'spans'}
+        for trace in tracing.recent_traces(limit)
+    ]
+    return jsonify({'success': True, 'traces': summaries})
+
+@api_bp.route('/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """최근 trace 상세 조회 (?format=json|otlp)"""
+    trace = tracing.find_trace(trace_id)
+    if not trace:
+        return jsonify({'error': 'trace를 찾을 수 없습니다.'}), 404
+    
+    return _trace_response([trace])
+
+def _sse_frame(event, upload_folder):
+    """진행 이벤트를 SSE 메시지 형식으로 변환"""
+    data = event['data']
+    if event['type'] == 'done':
+        data = {**data, 'result': _with_web_paths(data.get('result'), upload_folder)}
+    
+    lines = [f"event: {event['type']}", f"data: {json.dumps(data, ensure_ascii=False, default=str)}"]
+    if event.get('id') is not None:
+        lines.insert(0, f"id: {event['id']}")
+    return '\n'.join(lines) + '\n\n'
+
+@api_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    작업 진행 상황 SSE 스트림
+    
+    이벤트 종류:
+    - status: 작업 상태 변경 ({'status': 'running'})
+    - progress: 단계별 진행 상황 ({'stage', 'percent', 'message', ...})
+    - done: 작업 종료 ({'status': 'succeeded'|'failed', 'result'}) 후 스트림 종료
+    
+    재연결 시 Last-Event-ID 헤더 이후의 이벤트부터 다시 보냅니다.
+    """
+    media_service = get_media_service()
+    if not media_service:
+        return jsonify({'error': 'MediaService를 사용할 수 없습니다.'}), 500
+    
+    job = media_service.jobs.get(job_id)
+    if not job:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', 0), type=int)
+    progress_bus = get_progress_bus()
+    
+    def events():
+        replay, subscriber = progress_bus.subscribe(job_id, last_event_id)
+        try:
+            # 구독 전에 이미 끝난 작업이면 저장소의 결과로 바로 종료
+            finished = media_service.jobs.get(job_id)
+            if finished['status'] not in UNFINISHED_STATUSES and not any(e['type'] == 'done' for e in replay):
+                replay.append({'id': None, 'type': 'done', 'data': {'status': finished['status'], 'result': finished['result']}})
+            
+            for event in replay:
+                yield _sse_frame(event, upload_folder)
+                if event['type'] == 'done':
+                    return
+            
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # 프록시가 유휴 연결을 끊지 않도록 주석 전송
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                yield _sse_frame(event, upload_folder)
+                if event['type'] == 'done':
+                    return
+        finally:
+            progress_bus.unsubscribe(job_id, subscriber)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def recover_unfinished_jobs(max_attempts):
+    """서버 시작 시 미완료 작업 복구 (백그라운드 스레드에서 호출)"""
+    try:
+        # 복구할 작업이 없으면 생성기를 미리 초기화하지 않음
+        from app.services.job_store import get_job_store
+        if not get_job_store().list_unfinished():
+            return
+        
+        media_service = get_media_service()
+        if media_service:
+            media_service.recover_jobs(max_attempts)
+    except Exception as e:
+        logger.error(f"미완료 작업 복구 오류: {str(e)}")
+
+@api_bp.route('/scheduler/stats', methods=['GET'])
+def get_scheduler_stats():
+    """생성 스케줄러 상태 (리소스별 대기/실행 수, 우선순위별 대기 시간)"""
+    media_service = get_media_service()
+    if not media_service:
+        return jsonify({'error': 'MediaService를 사용할 수 없습니다.'}), 500
+    
+    return jsonify({
+        'success': True,
+        **media_service.scheduler.get_stats()
+    })
+
 @api_bp.route('/video/generators/status', methods=['GET'])
 def get_video_generators_status():
     """비디오 생성기 상태 확인 API"""
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, jsonify, send_from_directory, current_app
+from flask import Blueprint, render_template, request, jsonify, send_from_directory, current_app, Response
 from werkzeug.utils import secure_filename
 import os
 from app.services.file_service import FileService
@@ -108,6 +108,11 @@ def uploaded_file(filename):
         directory = os.path.dirname(file_path)
         basename = os.path.basename(file_path)
         
+        # LRU 보존 정책을 위한 접근 기록
+        retention = current_app.extensions.get('retention')
+        if retention:
+            retention.record_access(file_path)
+        
         current_app.logger.debug(f"파일 서빙: {filename}")
         return send_from_directory(directory, basename)
         
@@ -129,10 +134,16 @@ def health_check():
             'edited_folder_exists': os.path.exists(os.path.join(upload_folder, 'edited'))
         }
         
+        # 생성기 warm-up 상태 (ready가 false면 첫 생성 요청이 초기화를 기다림)
+        from app.routes.api import get_warmup_status
+        warmup = get_warmup_status()
+        
         return jsonify({
             'status': 'healthy', 
             'message': 'ImageAuto Flask app is running!',
             'version': '2.0.0',
+            'ready': warmup['ready'],
+            'warmup': warmup,
             'upload_folder': upload_folder,
             'folder_status': folder_status
         })
@@ -144,6 +155,34 @@ def health_check():
             'message': f'헬스 체크 실패: {str(e)}'
         }), 500
 
+@main_bp.route('/health/live')
+def liveness_check():
+    """라이브니스 검사 (프로세스가 요청에 응답하는지만 확인)"""
+    return jsonify(current_app.extensions['health'].liveness())
+
+@main_bp.route('/health/ready')
+def readiness_check():
+    """준비 상태 검사 (렌더링 요청을 처리할 수 없으면 503)"""
+    from app.routes.api import media_service_if_ready, get_media_service
+    
+    # warm-up을 끈 경우에는 API 요청 전까지 초기화되지 않으므로 준비 검사에서 초기화
+    if current_app.config.get('WARMUP_ENABLED'):
+        service = media_service_if_ready()
+    else:
+        service = get_media_service()
+    
+    readiness = current_app.extensions['health'].readiness(service)
+    return jsonify({
+        'status': 'ready' if readiness['ready'] else 'not_ready',
+        **readiness
+    }), 200 if readiness['ready'] else 503
+
+@main_bp.route('/metrics')
+def metrics():
+    """Prometheus 메트릭 (텍스트 형식)"""
+    from app.services.metrics import registry
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @main_bp.route('/debug/check-files')
 def debug_check_files():
     """디버깅용 파일 체크"""
@@ -0,0 +1,363 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import queue
+import time
+import contextvars
+import logging
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 비동기 반복자 종료 표시
+_END = object()
+
+# 우선순위 (값이 작을수록 먼저 실행)
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BATCH = 'batch'
+PRIORITIES = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 1}
+
+# 가중치가 설정되지 않은 클라이언트가 함께 쓰는 테넌트
+SHARED_TENANT = 'shared'
+
+# 현재 작업의 스케줄링 정보 (우선순위, 테넌트)
+# 생성기 안쪽의 run_with_limit까지 인자 없이 전달하기 위해 컨텍스트 변수 사용
+scheduling_context = contextvars.ContextVar(
+    'scheduling_context', default={'priority': PRIORITY_INTERACTIVE, 'tenant': None}
+)
+
+# 대기 시간 통계에 사용할 최근 샘플 수
+_QUEUE_TIME_SAMPLES = 500
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(ratio * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _ResourceQueue:
+    """
+    리소스별 슬롯 할당기
+
+    - 우선순위: interactive 대기열이 batch보다 먼저 슬롯을 받습니다.
+      batch 작업이 batch_max_wait초 넘게 기다리면 한 번 먼저 실행해 기아 상태를 막습니다.
+    - 같은 우선순위 안에서는 테넌트별 가중 공정 큐잉(WFQ)으로 순서를 정합니다.
+      테넌트마다 가상 완료 시각(이전 완료 시각 + 1/가중치)을 매겨 가장 작은 작업부터 실행하므로
+      한 테넌트가 대량 배치를 넣어도 다른 테넌트의 작업이 그 뒤에 밀리지 않습니다.
+    """
+
+    def __init__(self, limit, batch_max_wait=None):
+        self.limit = limit
+        self.batch_max_wait = batch_max_wait
+        self.running = 0
+        self._waiters = {rank: [] for rank in PRIORITIES.values()}
+        self._virtual_time = 0.0
+        self._tenant_finish = {}
+        self._counter = itertools.count()
+
+    def queued(self):
+        return sum(
+            1 for heap in self._waiters.values() for entry in heap if not entry[3].done()
+        )
+
+    async def acquire(self, priority, tenant, weight):
+        """슬롯 확보 (대기한 시간(초) 반환)"""
+        if self.running < self.limit and not self.queued():
+            self.running += 1
+            return 0.0
+
+        rank = PRIORITIES.get(priority, PRIORITIES[PRIORITY_INTERACTIVE])
+        key = (rank, tenant)
+        start = max(self._virtual_time, self._tenant_finish.get(key, 0.0))
+        finish = start + 1.0 / max(weight, 0.01)
+        self._tenant_finish[key] = finish
+
+        enqueued = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters[rank], (finish, next(self._counter), enqueued, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되었으면 다음 대기자에게 반환
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        return time.monotonic() - enqueued
+
+    def release(self):
+        """슬롯 반환 (대기자가 있으면 그대로 넘겨줌)"""
+        while True:
+            entry = self._next_waiter()
+            if entry is None:
+                self.running -= 1
+                return
+
+            finish, _, _, future = entry
+            if future.done():
+                continue
+
+            self._virtual_time = max(self._virtual_time, finish)
+            self._prune_tenants()
+            future.set_result(None)
+            return
+
+    def _prune_tenants(self):
+        # 가상 시각이 지난 완료 시각은 다음 작업 순서에 영향이 없으므로 정리 (테넌트 기록 무한 증가 방지)
+        self._tenant_finish = {
+            key: finish for key, finish in self._tenant_finish.items()
+            if finish > self._virtual_time
+        }
+
+    def _next_waiter(self):
+        interactive = self._waiters[PRIORITIES[PRIORITY_INTERACTIVE]]
+        batch = self._waiters[PRIORITIES[PRIORITY_BATCH]]
+
+        # 오래 기다린 batch 작업이 있으면 먼저 실행 (기아 방지)
+        if batch and self.batch_max_wait:
+            oldest = min(batch, key=lambda entry: entry[2])
+            if time.monotonic() - oldest[2] > self.batch_max_wait:
+                batch.remove(oldest)
+                heapq.heapify(batch)
+                return oldest
+
+        for heap in (interactive, batch):
+            if heap:
+                return heapq.heappop(heap)
+        return None
+
+
+class GenerationScheduler:
+    """
+    생성 작업 스케줄러
+
+    전용 이벤트 루프 스레드 하나에서 모든 생성 작업을 실행하고,
+    리소스(브라우저 풀 등)별로 동시에 실행되는 작업 수를 제한합니다.
+    Flask 요청 스레드에서는 submit()/run()/iterate()로 작업을 넘깁니다.
+
+    슬롯이 부족하면 우선순위(interactive > batch)와 테넌트별 가중 공정 큐잉 순서로 배분합니다.
+    """
+
+    def __init__(self, limits=None, tenant_weights=None, batch_max_wait=None):
+        self.limits = dict(limits or {})
+        self.tenant_weights = dict(tenant_weights or {})
+        self.batch_max_wait = batch_max_wait
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._queues = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._queue_times = {}
+
+    def start(self):
+        """이벤트 루프 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            ready = threading.Event()
+
+            def run_loop():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name='generation-scheduler', daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(f"⚙️ 생성 스케줄러 시작 (리소스 제한: {self.limits})")
+
+    @property
+    def loop(self):
+        self.start()
+        return self._loop
+
+    def set_limit(self, resource, limit):
+        """리소스 동시 실행 수 설정 (None이면 제한 없음)"""
+        self.limits[resource] = limit
+
+        # 실행 중인 작업은 그대로 두고 다음 작업부터 새 제한 적용
+        resource_queue = self._queues.get(resource)
+        if resource_queue is not None and limit:
+            resource_queue.limit = limit
+
+    def set_tenant_weight(self, tenant, weight):
+        """테넌트 가중치 설정 (기본 1, 클수록 더 많은 슬롯을 배분받음)"""
+        self.tenant_weights[tenant] = weight
+
+    def resolve_tenant(self, api_key):
+        """가중치가 설정된 API 키만 별도 테넌트로 구분하고 나머지는 공용 테넌트로 묶음"""
+        if api_key and api_key in self.tenant_weights:
+            return api_key
+        return SHARED_TENANT
+
+    def _get_queue(self, resource):
+        limit = self.limits.get(resource)
+        if not limit:
+            return None
+
+        resource_queue = self._queues.get(resource)
+        if resource_queue is None:
+            resource_queue = _ResourceQueue(limit, self.batch_max_wait)
+            self._queues[resource] = resource_queue
+        return resource_queue
+
+    def _update_stats(self, resource, key, delta):
+        with self._stats_lock:
+            stats = self._stats.setdefault(resource, {'queued': 0, 'running': 0, 'completed': 0})
+            stats[key] += delta
+
+    def _record_queue_time(self, resource, priority, tenant, waited):
+        with self._stats_lock:
+            samples = self._queue_times.get((resource, priority))
+            if samples is None:
+                samples = {
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'recent': deque(maxlen=_QUEUE_TIME_SAMPLES),
+                    'tenants': {}
+                }
+                self._queue_times[(resource, priority)] = samples
+
+            samples['count'] += 1
+            samples['total'] += waited
+            samples['max'] = max(samples['max'], waited)
+            samples['recent'].append(waited)
+            tenant_key = tenant or 'anonymous'
+            samples['tenants'][tenant_key] = samples['tenants'].get(tenant_key, 0) + 1
+
+    async def run_with_limit(self, coro_factory, resource=None):
+        """
+        리소스 슬롯을 확보한 뒤 작업 실행 (스케줄러 루프 안에서 호출)
+
+        우선순위와 테넌트는 submit()/iterate()에서 설정한 scheduling_context를 따릅니다.
+        """
+        resource_queue = self._get_queue(resource) if resource else None
+
+        # 다른 이벤트 루프(run_async 등)에서 호출되면 제한 없이 실행
+        if resource_queue is None or asyncio.get_running_loop() is not self._loop:
+            return await coro_factory()
+
+        context = scheduling_context.get()
+        priority, tenant = context['priority'], context['tenant']
+
+        self._update_stats(resource, 'queued', 1)
+        try:
+            waited = await resource_queue.acquire(priority, tenant, self.tenant_weights.get(tenant, 1))
+        finally:
+            self._update_stats(resource, 'queued', -1)
+        self._record_queue_time(resource, priority, tenant, waited)
+
+        self._update_stats(resource, 'running', 1)
+        try:
+            return await coro_factory()
+        finally:
+            resource_queue.release()
+            self._update_stats(resource, 'running', -1)
+            self._update_stats(resource, 'completed', 1)
+
+    async def _run_in_context(self, awaitable_factory, priority, tenant):
+        scheduling_context.set({'priority': priority, 'tenant': tenant})
+        return await awaitable_factory()
+
+    def submit(self, coro_factory, resource=None, priority=PRIORITY_INTERACTIVE, tenant=None):
+        """
+        작업 제출
+
+        Args:
+            coro_factory: 코루틴을 반환하는 함수 (스케줄러 루프에서 호출됨)
+            resource: 동시 실행 수를 제한할 리소스 이름
+            priority: 'interactive' 또는 'batch'
+            tenant: 공정 큐잉 단위 (API 키 또는 사용자)
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._run_in_context(lambda: self.run_with_limit(coro_factory, resource), priority, tenant),
+            self.loop
+        )
+
+    def run(self, coro_factory, resource=None, timeout=None, priority=PRIORITY_INTERACTIVE, tenant=None):
+        """작업을 제출하고 결과를 기다림"""
+        return self.submit(coro_factory, resource, priority, tenant).result(timeout)
+
+    def iterate(self, agen_factory, priority=PRIORITY_BATCH, tenant=None):
+        """
+        스케줄러 루프에서 비동기 제너레이터를 실행하고 값을 동기적으로 반환
+
+        스트리밍 응답처럼 결과가 나오는 대로 요청 스레드에 전달할 때 사용합니다.
+        제너레이터 안에서 만들어지는 작업은 모두 같은 우선순위와 테넌트로 스케줄링됩니다.
+        """
+        results = queue.Queue()
+
+        async def pump():
+            scheduling_context.set({'priority': priority, 'tenant': tenant})
+            try:
+                async for item in agen_factory():
+                    results.put(item)
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(_END)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+
+        try:
+            while True:
+                item = results.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # 클라이언트 연결이 끊기면 남은 작업 취소
+            if not future.done():
+                future.cancel()
+
+    def get_stats(self):
+        with self._stats_lock:
+            queue_times = {}
+            for (resource, priority), samples in self._queue_times.items():
+                recent = sorted(samples['recent'])
+                queue_times.setdefault(resource, {})[priority] = {
+                    'count': samples['count'],
+                    'avg_ms': round(samples['total'] / samples['count'] * 1000, 1),
+                    'p50_ms': round(_percentile(recent, 0.5) * 1000, 1),
+                    'p95_ms': round(_percentile(recent, 0.95) * 1000, 1),
+                    'max_ms': round(samples['max'] * 1000, 1),
+                    'by_tenant': dict(samples['tenants'])
+                }
+
+            return {
+                'limits': dict(self.limits),
+                'tenant_weights': dict(self.tenant_weights),
+                'resources': {name: dict(stats) for name, stats in self._stats.items()},
+                'queue_time': queue_times
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 공용 스케줄러 반환"""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GenerationScheduler(
+                tenant_weights=Config.SCHEDULER_TENANT_WEIGHTS,
+                batch_max_wait=Config.SCHEDULER_BATCH_MAX_WAIT_SECONDS
+            )
+        return _scheduler
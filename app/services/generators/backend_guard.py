@@ -0,0 +1,187 @@
+import time
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 서킷 브레이커 상태
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 요청을 보내지 않음"""
+
+    def __init__(self, backend, retry_in):
+        super().__init__(f"{backend} 생성기가 일시 차단되었습니다. ({retry_in:.0f}초 후 재시도)")
+        self.backend = backend
+        self.retry_in = retry_in
+
+
+class AdaptiveTokenBucket:
+    """
+    적응형 토큰 버킷
+
+    분당 rate_per_minute개의 토큰이 채워지고 최대 burst개까지 쌓입니다.
+    429(요청 한도 초과)를 받으면 채움 속도를 절반으로 줄이고,
+    성공할 때마다 원래 속도까지 조금씩 회복합니다 (AIMD).
+    """
+
+    def __init__(self, rate_per_minute, burst=None, min_rate_per_minute=1):
+        self.max_rate = float(rate_per_minute)
+        self.min_rate = min(float(min_rate_per_minute), self.max_rate)
+        self.rate = self.max_rate
+        self.burst = float(burst or max(1, rate_per_minute))
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate / 60.0)
+
+    def try_acquire(self):
+        """토큰을 하나 가져오고, 부족하면 다음 토큰까지 기다릴 시간(초) 반환"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) * 60.0 / self.rate
+
+    async def acquire(self):
+        """토큰이 생길 때까지 대기"""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def on_rate_limited(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+
+    def to_dict(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'rate_per_minute': round(self.rate, 2),
+                'max_rate_per_minute': self.max_rate,
+                'tokens': round(self.tokens, 2),
+                'burst': self.burst
+            }
+
+
+class CircuitBreaker:
+    """
+    서킷 브레이커
+
+    - closed: 정상. 연속 실패가 failure_threshold에 도달하거나 429를 받으면 open
+    - open: recovery_seconds 동안 요청 차단 (429의 Retry-After가 있으면 그 시간만큼)
+    - half_open: 차단 시간이 지나면 한 요청만 시험적으로 보내고, 성공하면 closed, 실패하면 다시 open
+      (다시 열릴 때마다 차단 시간을 두 배로 늘리며 max_recovery_seconds까지)
+    """
+
+    def __init__(self, name, failure_threshold=3, recovery_seconds=60, max_recovery_seconds=600):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.max_recovery_seconds = max_recovery_seconds
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._current_recovery = recovery_seconds
+        self._opened_at = 0.0
+        self._open_for = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _retry_in(self, now):
+        return max(0.0, self._opened_at + self._open_for - now)
+
+    def is_available(self):
+        """요청을 보낼 수 있는 상태인지 확인 (상태는 바꾸지 않음, 라우팅용)"""
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_OPEN:
+                return self._retry_in(time.monotonic()) <= 0
+            return not self._probe_in_flight
+
+    def before_request(self):
+        """요청 전 호출 (차단 상태면 CircuitOpenError)"""
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == CIRCUIT_OPEN:
+                retry_in = self._retry_in(now)
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = CIRCUIT_HALF_OPEN
+                logger.info(f"🟡 {self.name} 서킷 반개방: 시험 요청 허용")
+
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, 0)
+                self._probe_in_flight = True
+
+    def on_success(self):
+        with self._lock:
+            if self.state != CIRCUIT_CLOSED:
+                logger.info(f"🟢 {self.name} 서킷 복구")
+            self.state = CIRCUIT_CLOSED
+            self.consecutive_failures = 0
+            self._current_recovery = self.recovery_seconds
+            self._probe_in_flight = False
+
+    def on_cancel(self):
+        """요청이 결과 없이 취소된 경우 (시험 요청 자리만 반환)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def on_failure(self, rate_limited=False, retry_after=None):
+        with self._lock:
+            self.consecutive_failures += 1
+
+            should_open = (
+                rate_limited
+                or self.state == CIRCUIT_HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            )
+            if not should_open:
+                return
+
+            if self.state == CIRCUIT_HALF_OPEN:
+                self._current_recovery = min(self.max_recovery_seconds, self._current_recovery * 2)
+
+            self.state = CIRCUIT_OPEN
+            self._opened_at = time.monotonic()
+            self._open_for = max(self._current_recovery, retry_after or 0)
+            self._probe_in_flight = False
+            logger.warning(
+                f"🔴 {self.name} 서킷 개방: {self._open_for:.0f}초 동안 요청 차단 "
+                f"({'429 요청 한도 초과' if rate_limited else f'연속 실패 {self.consecutive_failures}회'})"
+            )
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': round(self._retry_in(time.monotonic()), 1) if self.state == CIRCUIT_OPEN else 0
+            }
+
+
+def is_rate_limited(result):
+    """생성 결과가 429(요청 한도 초과)인지 확인"""
+    if result.get('rate_limited'):
+        return True
+    debug_info = result.get('debug_info')
+    return isinstance(debug_info, dict) and debug_info.get('response_status') == 429
@@ -0,0 +1,84 @@
+import time
+import threading
+from collections import deque
+
+# 기록이 없을 때 사용할 생성기별 예상 소요 시간(초)
+DEFAULT_LATENCY_SECONDS = {
+    'klingai_api': 180.0,
+    'klingai_web': 300.0,
+    'placeholder': 1.0
+}
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(ratio * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class BackendStats:
+    """
+    생성기별 최근 실행 통계
+
+    최근 window_size건(그리고 window_seconds 이내)의 성공 여부와 소요 시간,
+    현재 대기/실행 중인 요청 수를 기록합니다.
+    """
+
+    def __init__(self, name, window_size=100, window_seconds=1800, concurrency=1):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.concurrency = max(1, concurrency or 1)
+        self.in_flight = 0
+        self._samples = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self):
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def record(self, success, latency):
+        with self._lock:
+            self._samples.append((time.time(), success, latency))
+
+    def _recent(self):
+        cutoff = time.time() - self.window_seconds
+        return [sample for sample in self._samples if sample[0] >= cutoff]
+
+    def snapshot(self):
+        """성공률, 지연 시간 분위수, 대기 중인 요청 수"""
+        with self._lock:
+            samples = self._recent()
+            in_flight = self.in_flight
+
+        latencies = sorted(latency for _, success, latency in samples if success)
+        successes = sum(1 for _, success, _ in samples if success)
+
+        return {
+            'samples': len(samples),
+            # 표본이 적을 때 한두 번의 결과에 휘둘리지 않도록 보정한 성공률
+            'success_rate': round((successes + 1) / (len(samples) + 2), 3),
+            'p50_seconds': _percentile(latencies, 0.5),
+            'p90_seconds': _percentile(latencies, 0.9),
+            'p95_seconds': _percentile(latencies, 0.95),
+            'in_flight': in_flight,
+            'concurrency': self.concurrency
+        }
+
+    def expected_completion_seconds(self, cost=0.0, cost_weight=0.0):
+        """
+        지금 요청을 보냈을 때 예상 완료 시간(초)
+
+        앞에 대기 중인 요청이 동시 실행 슬롯을 차지하는 시간 + 자신의 실행 시간을
+        성공률로 나눠 재시도 비용을 반영하고, 비용 가중치를 더합니다.
+        """
+        stats = self.snapshot()
+        p50 = stats['p50_seconds'] or DEFAULT_LATENCY_SECONDS.get(self.name, 300.0)
+
+        waves_ahead = stats['in_flight'] // stats['concurrency']
+        expected = (waves_ahead + 1) * p50 / stats['success_rate']
+        return expected + cost * cost_weight
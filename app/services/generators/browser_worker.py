@@ -0,0 +1,116 @@
+"""
+브라우저 생성기 워커 프로세스
+
+BrowserWorkerPool이 `python -m app.services.generators.browser_worker <생성기> <워커 번호>`로 실행합니다.
+표준 입력으로 작업을 한 줄에 하나씩(JSON) 받아 생성기를 실행하고, 결과와 진행 이벤트를
+표준 출력으로 돌려줍니다. 로그는 표준 에러로 출력되어 서버 로그에 함께 표시됩니다.
+
+메시지 형식:
+    부모 → 워커: {'type': 'task', 'id', 'method', 'args', 'kwargs', 'job_id'} / {'type': 'shutdown'}
+    워커 → 부모: {'type': 'ready', 'pid'} / {'type': 'result', 'id', 'result'} /
+                 {'type': 'progress', 'job_id', 'event_type', 'data'}
+"""
+import os
+import sys
+import json
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def create_generator(name, worker_id):
+    """워커에서 실행할 생성기 생성 (ImageFX는 워커마다 다른 프로필 슬롯 사용)"""
+    if name == 'imagefx':
+        from .imagefx_generator import ImageFXGenerator
+        return ImageFXGenerator(pool_size=1, slot_offset=worker_id)
+    if name == 'klingai_web':
+        from .klingai_web_generator import KlingAIWebGenerator
+        return KlingAIWebGenerator()
+    raise ValueError(f"알 수 없는 브라우저 생성기: {name}")
+
+
+class _Channel:
+    """부모 프로세스로 메시지를 보내는 통로 (여러 스레드에서 호출)"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stream.write(line + '\n')
+            self._stream.flush()
+
+
+def _install_progress_forwarding(channel):
+    """워커에서 발행한 진행 이벤트를 부모 프로세스의 진행 이벤트 버스로 전달"""
+    from .. import progress_bus
+
+    class ForwardingProgressBus(progress_bus.ProgressBus):
+        def publish(self, job_id, event_type, data, throttle_key=None):
+            event = super().publish(job_id, event_type, data, throttle_key=throttle_key)
+            if event is not None:
+                channel.send({'type': 'progress', 'job_id': job_id, 'event_type': event_type, 'data': data})
+            return event
+
+    progress_bus._bus = ForwardingProgressBus(history_size=1)
+
+
+async def _run_task(generator, task):
+    from ..job_store import current_job_id
+
+    if task.get('job_id'):
+        current_job_id.set(task['job_id'])
+    try:
+        return await getattr(generator, task['method'])(*task.get('args', []), **task.get('kwargs', {}))
+    except Exception as e:
+        logger.exception(f"워커 작업 실패 ({task['method']})")
+        return {'status': 'error', 'error': str(e)}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    name, worker_id = argv[0], int(argv[1])
+
+    # 표준 출력은 메시지 전용으로 쓰고, 라이브러리가 print하는 내용은 표준 에러로 보냄
+    channel = _Channel(os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8'))
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - [{name}-{worker_id}] %(name)s - %(levelname)s - %(message)s'
+    )
+
+    _install_progress_forwarding(channel)
+    generator = create_generator(name, worker_id)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name=f'{name}-worker-loop', daemon=True).start()
+
+    logger.info(f"🧩 브라우저 워커 시작: {name} #{worker_id} (PID {os.getpid()})")
+    channel.send({'type': 'ready', 'pid': os.getpid()})
+
+    def send_result(future, task_id):
+        try:
+            result = future.result()
+        except BaseException as e:
+            result = {'status': 'error', 'error': str(e) or type(e).__name__}
+        channel.send({'type': 'result', 'id': task_id, 'result': result})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        task = json.loads(line)
+        if task['type'] == 'shutdown':
+            break
+        future = asyncio.run_coroutine_threadsafe(_run_task(generator, task), loop)
+        future.add_done_callback(lambda f, task_id=task['id']: send_result(f, task_id))
+
+    logger.info(f"🧩 브라우저 워커 종료: {name} #{worker_id}")
+
+
+if __name__ == '__main__':
+    main()
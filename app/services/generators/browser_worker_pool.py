@@ -0,0 +1,423 @@
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import asyncio
+import atexit
+import functools
+import threading
+import subprocess
+import logging
+from concurrent.futures import Future
+from ..job_store import current_job_id
+from ..progress_bus import get_progress_bus
+
+logger = logging.getLogger(__name__)
+
+# 작업을 보낼 워커가 없을 때 다시 확인하는 간격(초)
+_DISPATCH_POLL_SECONDS = 0.5
+
+# 워커 상태를 확인하는 간격(초)
+_MONITOR_INTERVAL = 5
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def process_isolation_enabled():
+    return os.getenv('BROWSER_PROCESS_ISOLATION', 'false').lower() == 'true'
+
+
+def _process_tree_rss(pid):
+    """
+    프로세스와 모든 하위 프로세스(브라우저 렌더러 등)의 RSS 합계(바이트)
+
+    /proc을 읽을 수 없는 환경(Windows, macOS)에서는 None
+    """
+    try:
+        children = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    # comm(2번째 필드)에 공백이 있을 수 있으므로 마지막 ')' 뒤부터 분리
+                    fields = f.read().rsplit(')', 1)[1].split()
+                children.setdefault(int(fields[1]), []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    except OSError:
+        return None
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class _Worker:
+    """워커 프로세스 하나의 상태 (BrowserWorkerPool의 _lock을 잡고 접근)"""
+
+    def __init__(self, index, process):
+        self.index = index
+        self.process = process
+        self.started_at = time.time()
+        self.tasks = {}  # 작업 ID → (Future, 시작 시각)
+        self.completed = 0
+        self.retiring = False  # True면 새 작업을 받지 않고, 남은 작업이 끝나면 재시작
+        self.retire_reason = None
+        self.rss_bytes = None
+        self.write_lock = threading.Lock()
+
+
+class BrowserWorkerPool:
+    """
+    브라우저 생성기를 별도 프로세스에서 실행하는 워커 풀
+
+    브라우저 자동화를 서버 프로세스에서 떼어 내 브라우저/드라이버가 멈추거나 죽어도 서버는 영향을 받지 않고,
+    워커별 CPU(GIL)를 따로 쓰도록 합니다. 워커는 표준 입출력(JSON 한 줄)으로 작업과 결과를 주고받습니다.
+
+    - 비정상 종료한 워커는 진행 중이던 작업을 오류로 끝내고 다시 실행합니다.
+    - BROWSER_WORKER_MAX_MEMORY_MB를 넘은 워커(브라우저 포함)는 새 작업을 받지 않고, 진행 중인 작업이 끝나면 재시작합니다.
+    - BROWSER_WORKER_HARD_MEMORY_MB(기본 MAX_MEMORY_MB의 1.5배)를 넘으면 진행 중인 작업이 있어도 바로 강제 종료합니다.
+    - BROWSER_WORKER_MAX_TASKS개의 작업을 처리한 워커도 재시작합니다 (브라우저 메모리 누적 방지).
+    - BROWSER_WORKER_TASK_TIMEOUT초가 지나도 끝나지 않는 작업이 있으면 워커를 강제 종료합니다.
+    """
+
+    def __init__(self, generator_name, workers=1, tasks_per_worker=1):
+        self.generator_name = generator_name
+        self.worker_count = max(1, workers)
+        self.tasks_per_worker = max(1, tasks_per_worker)
+
+        self.max_memory_bytes = int(os.getenv('BROWSER_WORKER_MAX_MEMORY_MB', 2048)) * 1024 * 1024
+        hard_memory_mb = os.getenv('BROWSER_WORKER_HARD_MEMORY_MB')
+        if hard_memory_mb:
+            self.hard_memory_bytes = int(hard_memory_mb) * 1024 * 1024
+        else:
+            self.hard_memory_bytes = self.max_memory_bytes * 3 // 2
+        self.max_tasks = int(os.getenv('BROWSER_WORKER_MAX_TASKS', 50))
+        self.task_timeout = float(os.getenv('BROWSER_WORKER_TASK_TIMEOUT', 900))
+
+        self._workers = [None] * self.worker_count
+        self._lock = threading.Lock()
+        self._closed = False
+        self.restarts = {'crashed': 0, 'memory': 0, 'max_tasks': 0, 'timeout': 0}
+
+        for index in range(self.worker_count):
+            self._spawn(index)
+
+        threading.Thread(
+            target=self._monitor, name=f'{generator_name}-worker-monitor', daemon=True
+        ).start()
+        atexit.register(self.shutdown)
+
+    @property
+    def capacity(self):
+        return self.worker_count * self.tasks_per_worker
+
+    def _spawn(self, index):
+        """워커 프로세스 실행 (_lock 없이 호출 - 실행 중에는 해당 자리가 비어 있음)"""
+        popen_kwargs = {}
+        if os.name == 'posix':
+            # 워커가 띄운 브라우저까지 한 번에 종료할 수 있도록 별도 프로세스 그룹으로 실행
+            popen_kwargs['start_new_session'] = True
+        else:
+            popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'app.services.generators.browser_worker', self.generator_name, str(index)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=_PROJECT_ROOT,
+            text=True,
+            encoding='utf-8',
+            **popen_kwargs
+        )
+        worker = _Worker(index, process)
+        with self._lock:
+            self._workers[index] = worker
+
+        threading.Thread(
+            target=self._read_messages, args=(worker,), name=f'{self.generator_name}-worker-{index}-reader', daemon=True
+        ).start()
+        logger.info(f"🧩 브라우저 워커 실행: {self.generator_name} #{index} (PID {process.pid})")
+        return worker
+
+    def _read_messages(self, worker):
+        """워커가 보낸 결과와 진행 이벤트 처리 (워커마다 전용 스레드)"""
+        for line in worker.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f"브라우저 워커 #{worker.index} 메시지 해석 실패: {line[:200]}")
+                continue
+
+            if message['type'] == 'result':
+                with self._lock:
+                    entry = worker.tasks.pop(message['id'], None)
+                    worker.completed += 1
+                    if self.max_tasks and worker.completed >= self.max_tasks and not worker.retiring:
+                        self._retire(worker, 'max_tasks')
+                if entry is not None and not entry[0].done():
+                    entry[0].set_result(message['result'])
+            elif message['type'] == 'progress':
+                get_progress_bus().publish(message['job_id'], message['event_type'], message['data'])
+            elif message['type'] == 'ready':
+                logger.info(f"🧩 브라우저 워커 준비 완료: {self.generator_name} #{worker.index}")
+
+        # 표준 출력이 닫힘 = 워커 종료 (재시작은 모니터 스레드가 처리)
+        worker.process.wait()
+
+    def _retire(self, worker, reason):
+        """새 작업을 받지 않도록 표시 (_lock을 잡은 상태에서 호출)"""
+        worker.retiring = True
+        worker.retire_reason = reason
+        logger.info(f"♻️ 브라우저 워커 #{worker.index} 재시작 예정 ({reason})")
+
+    def _pick_worker(self):
+        """진행 중인 작업이 가장 적은 워커 (_lock을 잡은 상태에서 호출)"""
+        candidates = [
+            worker for worker in self._workers
+            if worker is not None and not worker.retiring and worker.process.poll() is None
+            and len(worker.tasks) < self.tasks_per_worker
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda worker: len(worker.tasks))
+
+    def _send(self, worker, message):
+        with worker.write_lock:
+            worker.process.stdin.write(json.dumps(message, ensure_ascii=False) + '\n')
+            worker.process.stdin.flush()
+
+    async def run(self, method, *args, **kwargs):
+        """
+        워커 프로세스에서 생성기 메서드 실행
+
+        Returns:
+            dict: 생성기 결과 (워커가 비정상 종료하면 {'status': 'error', ...})
+        """
+        task_id = uuid.uuid4().hex
+        future = Future()
+        while True:
+            with self._lock:
+                if self._closed:
+                    return {'status': 'error', 'error': '브라우저 워커 풀이 종료되었습니다.'}
+                worker = self._pick_worker()
+                if worker is not None:
+                    worker.tasks[task_id] = (future, time.monotonic())
+                    break
+            await asyncio.sleep(_DISPATCH_POLL_SECONDS)
+
+        try:
+            self._send(worker, {
+                'type': 'task',
+                'id': task_id,
+                'method': method,
+                'args': list(args),
+                'kwargs': kwargs,
+                'job_id': current_job_id.get()
+            })
+        except (OSError, ValueError) as e:
+            with self._lock:
+                worker.tasks.pop(task_id, None)
+            return {'status': 'error', 'error': f'브라우저 워커에 작업을 보내지 못했습니다: {e}'}
+
+        return await asyncio.wrap_future(future)
+
+    def _monitor(self):
+        while not self._closed:
+            time.sleep(_MONITOR_INTERVAL)
+            for index in range(self.worker_count):
+                try:
+                    self._check_worker(index)
+                except Exception as e:
+                    logger.warning(f"브라우저 워커 #{index} 상태 확인 실패: {e}")
+
+    def _check_worker(self, index):
+        with self._lock:
+            worker = self._workers[index]
+            if worker is None or self._closed:
+                return
+
+        returncode = worker.process.poll()
+        if returncode is not None:
+            logger.error(f"❌ 브라우저 워커 #{index} 비정상 종료 (종료 코드 {returncode})")
+            self._replace(worker, 'crashed', '브라우저 워커 프로세스가 비정상 종료되었습니다.')
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            timed_out = any(now - started > self.task_timeout for _, started in worker.tasks.values())
+        if self.task_timeout and timed_out:
+            logger.error(f"⏱️ 브라우저 워커 #{index} 작업 시간 초과 ({self.task_timeout:.0f}초) - 강제 종료")
+            self._replace(worker, 'timeout', '브라우저 작업 시간이 초과되어 워커를 재시작했습니다.')
+            return
+
+        worker.rss_bytes = _process_tree_rss(worker.process.pid)
+        if self.hard_memory_bytes and worker.rss_bytes is not None and worker.rss_bytes > self.hard_memory_bytes:
+            logger.error(
+                f"❌ 브라우저 워커 #{index} 메모리 {worker.rss_bytes / 1024 / 1024:.0f}MB "
+                f"(강제 종료 한도 {self.hard_memory_bytes / 1024 / 1024:.0f}MB) - 강제 종료"
+            )
+            self._replace(worker, 'memory', '브라우저 워커 메모리가 한도를 넘어 워커를 재시작했습니다.')
+            return
+
+        with self._lock:
+            if (
+                self.max_memory_bytes and worker.rss_bytes is not None
+                and worker.rss_bytes > self.max_memory_bytes and not worker.retiring
+            ):
+                logger.warning(
+                    f"⚠️ 브라우저 워커 #{index} 메모리 {worker.rss_bytes / 1024 / 1024:.0f}MB "
+                    f"(제한 {self.max_memory_bytes / 1024 / 1024:.0f}MB)"
+                )
+                self._retire(worker, 'memory')
+            recycle = worker.retiring and not worker.tasks
+
+        if recycle:
+            self._replace(worker, worker.retire_reason, None)
+
+    def _replace(self, worker, reason, error):
+        """워커를 종료하고 진행 중이던 작업을 오류로 끝낸 뒤 새 워커 실행"""
+        with self._lock:
+            if self._workers[worker.index] is not worker:
+                return
+            self._workers[worker.index] = None
+            tasks, worker.tasks = worker.tasks, {}
+            self.restarts[reason] = self.restarts.get(reason, 0) + 1
+
+        self._stop_process(worker, graceful=not tasks)
+        for future, _ in tasks.values():
+            if not future.done():
+                future.set_result({'status': 'error', 'error': error or '브라우저 워커가 재시작되었습니다.'})
+
+        if not self._closed:
+            self._spawn(worker.index)
+
+    def _stop_process(self, worker, graceful=True, timeout=10):
+        """워커 종료 (graceful이면 종료 메시지를 먼저 보냄) 후 남은 브라우저 프로세스까지 정리"""
+        process = worker.process
+        if graceful and process.poll() is None:
+            try:
+                self._send(worker, {'type': 'shutdown'})
+                process.wait(timeout=timeout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+
+        if os.name == 'posix':
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        elif process.poll() is None:
+            process.kill()
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"브라우저 워커 #{worker.index} 종료 대기 시간 초과")
+
+    def shutdown(self):
+        """모든 워커 종료 (진행 중인 작업은 오류로 끝남)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = [worker for worker in self._workers if worker is not None]
+
+        for worker in workers:
+            with self._lock:
+                tasks, worker.tasks = worker.tasks, {}
+            self._stop_process(worker, graceful=not tasks, timeout=5)
+            for future, _ in tasks.values():
+                if not future.done():
+                    future.set_result({'status': 'error', 'error': '브라우저 워커 풀이 종료되었습니다.'})
+
+    def stats(self):
+        with self._lock:
+            workers = [worker for worker in self._workers if worker is not None]
+            return {
+                'generator': self.generator_name,
+                'workers': self.worker_count,
+                'tasks_per_worker': self.tasks_per_worker,
+                'alive_workers': sum(1 for worker in workers if worker.process.poll() is None),
+                'active_tasks': sum(len(worker.tasks) for worker in workers),
+                'restarts': dict(self.restarts),
+                'processes': [
+                    {
+                        'index': worker.index,
+                        'pid': worker.process.pid,
+                        'active_tasks': len(worker.tasks),
+                        'completed': worker.completed,
+                        'rss_mb': round(worker.rss_bytes / 1024 / 1024, 1) if worker.rss_bytes is not None else None,
+                        'retiring': worker.retiring,
+                        'uptime_seconds': round(time.time() - worker.started_at, 1)
+                    }
+                    for worker in workers
+                ]
+            }
+
+
+class ProcessGeneratorProxy:
+    """
+    생성 메서드만 워커 프로세스에서 실행하는 생성기 대리 객체
+
+    동시 실행 수, 비용 등 나머지 속성은 서버 프로세스에 만든 원래 생성기 객체의 값을 그대로 사용합니다.
+    """
+
+    def __init__(self, generator, pool, methods):
+        self._generator = generator
+        self._pool = pool
+        self._methods = frozenset(methods)
+        self.generator_name = type(generator).__name__
+
+    def __getattr__(self, name):
+        if name in self._methods:
+            return functools.partial(self._pool.run, name)
+        return getattr(self._generator, name)
+
+    def pool_stats(self):
+        """브라우저 풀 상태 (워커 프로세스 하나 = 브라우저 하나)"""
+        stats = self._pool.stats()
+        return {
+            'pool_size': stats['workers'],
+            'pages_per_context': stats['tasks_per_worker'],
+            'open_contexts': stats['alive_workers'],
+            'active_pages': stats['active_tasks'],
+            'worker_processes': stats
+        }
+
+
+def isolate(name, generator):
+    """
+    BROWSER_PROCESS_ISOLATION=true이면 생성기를 워커 프로세스 풀 대리 객체로 감싸서 반환
+
+    ImageFX는 브라우저 슬롯마다 워커 하나(탭 IMAGEFX_PAGES_PER_CONTEXT개),
+    KlingAI 웹은 동시 실행 수만큼 워커를 실행합니다.
+    """
+    if not process_isolation_enabled():
+        return generator
+
+    if name == 'imagefx':
+        pool = BrowserWorkerPool(name, workers=generator.pool_size, tasks_per_worker=generator.pages_per_context)
+        methods = ('generate_image',)
+    elif name == 'klingai_web':
+        pool = BrowserWorkerPool(name, workers=generator.max_concurrent_tasks, tasks_per_worker=1)
+        methods = ('generate_video',)
+    else:
+        raise ValueError(f"알 수 없는 브라우저 생성기: {name}")
+
+    logger.info(f"🧩 {name} 생성기를 워커 프로세스 {pool.worker_count}개에서 실행합니다.")
+    return ProcessGeneratorProxy(generator, pool, methods)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PageLease:
+    """풀에서 빌린 페이지 (slot: 컨텍스트 번호, index: 컨텍스트 안의 페이지 번호)"""
+
+    def __init__(self, slot, index, context, page, login_lock):
+        self.slot = slot
+        self.index = index
+        self.context = context
+        self.page = page
+        # 같은 컨텍스트의 여러 페이지가 동시에 로그인하지 않도록
+        self.login_lock = login_lock
+
+
+class PersistentContextPool:
+    """
+    Playwright persistent context 풀
+
+    슬롯(브라우저 프로필)마다 컨텍스트를 하나씩 띄우고, 컨텍스트 하나에서 최대 pages_per_context개의 페이지를
+    동시에 사용합니다. 새 브라우저를 띄우기 전에 이미 열린 컨텍스트의 빈 자리를 먼저 채우므로
+    브라우저 하나의 메모리로 여러 생성을 병렬 실행할 수 있습니다.
+
+    마지막 페이지를 반납한 컨텍스트는 idle_seconds 뒤에 닫습니다 (0이면 즉시).
+    asyncio 객체를 사용하므로 처음 사용한 이벤트 루프에서만 사용해야 합니다.
+    """
+
+    def __init__(self, launch, pool_size=1, pages_per_context=1, idle_seconds=0):
+        """
+        Args:
+            launch: async (playwright, slot) -> BrowserContext
+        """
+        self._launch = launch
+        self.pool_size = max(1, pool_size)
+        self.pages_per_context = max(1, pages_per_context)
+        self.idle_seconds = max(0, idle_seconds)
+        self._slots = [
+            {'context': None, 'indices': set(), 'open_lock': None, 'login_lock': None, 'closing': None, 'idle_handle': None}
+            for _ in range(self.pool_size)
+        ]
+        self._playwright = None
+        self._condition = None
+        self._loop = None
+        self._waiting = 0
+
+    @property
+    def capacity(self):
+        return self.pool_size * self.pages_per_context
+
+    def usable_in(self, loop):
+        """아직 사용 전이거나 같은 이벤트 루프에서 사용 중인지"""
+        return self._loop is None or self._loop is loop
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            for state in self._slots:
+                state['open_lock'] = asyncio.Lock()
+                state['login_lock'] = asyncio.Lock()
+        elif self._loop is not loop:
+            raise RuntimeError("브라우저 컨텍스트 풀은 처음 사용한 이벤트 루프에서만 사용할 수 있습니다.")
+
+    def _pick_slot(self):
+        """열린 컨텍스트의 빈 자리(사용 중인 페이지가 적은 순) → 닫힌 슬롯 순으로 선택"""
+        open_slots = [
+            slot for slot, state in enumerate(self._slots)
+            if state['context'] is not None and len(state['indices']) < self.pages_per_context
+        ]
+        if open_slots:
+            return min(open_slots, key=lambda slot: len(self._slots[slot]['indices']))
+
+        for slot, state in enumerate(self._slots):
+            if len(state['indices']) < self.pages_per_context:
+                return slot
+        return None
+
+    async def acquire(self):
+        """빈 페이지 자리를 기다렸다가 새 페이지를 열어 반환"""
+        self._bind_loop()
+        async with self._condition:
+            while True:
+                slot = self._pick_slot()
+                if slot is not None:
+                    break
+                self._waiting += 1
+                try:
+                    await self._condition.wait()
+                finally:
+                    self._waiting -= 1
+
+            state = self._slots[slot]
+            index = min(set(range(self.pages_per_context)) - state['indices'])
+            state['indices'].add(index)
+            if state['idle_handle'] is not None:
+                state['idle_handle'].cancel()
+                state['idle_handle'] = None
+            
+            # 대기 중이던 요청을 위해 열어 둔 다른 컨텍스트가 쓰이지 않았으면 정리
+            for other in range(self.pool_size):
+                self._schedule_close_if_unused(other)
+
+        try:
+            context = await self._ensure_context(slot)
+            page = await context.new_page()
+        except BaseException:
+            await self._return_index(slot, index)
+            raise
+
+        return PageLease(slot, index, context, page, state['login_lock'])
+
+    async def release(self, lease):
+        try:
+            await lease.page.close()
+        except Exception as e:
+            logger.debug(f"페이지 닫기 실패 (슬롯 {lease.slot}): {e}")
+        await self._return_index(lease.slot, lease.index)
+
+    async def _return_index(self, slot, index):
+        async with self._condition:
+            state = self._slots[slot]
+            state['indices'].discard(index)
+            self._schedule_close_if_unused(slot)
+            self._condition.notify_all()
+    
+    def _schedule_close_if_unused(self, slot):
+        """사용 중인 페이지가 없는 컨텍스트를 idle_seconds 뒤에 닫기 (_condition을 잡은 상태에서 호출)"""
+        state = self._slots[slot]
+        # 기다리는 요청이 있으면 방금 빈 컨텍스트를 그대로 넘겨줌
+        if state['indices'] or state['context'] is None or self._waiting or state['idle_handle'] is not None:
+            return
+        if self.idle_seconds:
+            state['idle_handle'] = self._loop.call_later(
+                self.idle_seconds, lambda: asyncio.ensure_future(self._close_if_idle(slot))
+            )
+        else:
+            self._start_close(slot)
+
+    async def _close_if_idle(self, slot):
+        async with self._condition:
+            state = self._slots[slot]
+            state['idle_handle'] = None
+            if not state['indices'] and state['context'] is not None:
+                self._start_close(slot)
+
+    def _start_close(self, slot):
+        """컨텍스트 닫기 시작 (_condition을 잡은 상태에서 호출)"""
+        state = self._slots[slot]
+        context, state['context'] = state['context'], None
+        state['closing'] = asyncio.ensure_future(self._close_context(slot, context))
+
+    async def _close_context(self, slot, context):
+        try:
+            await context.close()
+            logger.info(f"🧹 브라우저 컨텍스트 닫음 (슬롯 {slot})")
+        except Exception as e:
+            logger.debug(f"브라우저 컨텍스트 닫기 실패 (슬롯 {slot}): {e}")
+
+        async with self._condition:
+            if all(state['context'] is None and not state['indices'] for state in self._slots):
+                playwright, self._playwright = self._playwright, None
+            else:
+                playwright = None
+        if playwright is not None:
+            await playwright.stop()
+
+    async def _ensure_context(self, slot):
+        state = self._slots[slot]
+        async with state['open_lock']:
+            # 같은 프로필을 쓰는 이전 컨텍스트가 완전히 닫힐 때까지 대기
+            if state['closing'] is not None:
+                await state['closing']
+                state['closing'] = None
+
+            if state['context'] is None:
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+
+                context = await self._launch(self._playwright, slot)
+                context.on('close', lambda _: self._on_context_closed(slot, context))
+                state['context'] = context
+                logger.info(f"🌐 브라우저 컨텍스트 시작 (슬롯 {slot}, 최대 {self.pages_per_context}페이지)")
+            return state['context']
+
+    def _on_context_closed(self, slot, context):
+        """브라우저가 비정상 종료되면 다음 요청에서 다시 띄우도록 표시"""
+        state = self._slots[slot]
+        if state['context'] is context:
+            logger.warning(f"⚠️ 브라우저 컨텍스트가 예기치 않게 닫혔습니다 (슬롯 {slot})")
+            state['context'] = None
+
+    def stats(self):
+        return {
+            'pool_size': self.pool_size,
+            'pages_per_context': self.pages_per_context,
+            'open_contexts': sum(1 for state in self._slots if state['context'] is not None),
+            'active_pages': sum(len(state['indices']) for state in self._slots)
+        }
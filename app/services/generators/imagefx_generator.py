@@ -1,15 +1,39 @@
 import os
+import shutil
 import asyncio
-from playwright.async_api import async_playwright
 import aiofiles
 from datetime import datetime
 import logging
 import json
+import base64
+from ..retention_service import get_debug_dir
+from ..progress_bus import report_progress
+from ..tracing import span, add_event, mark_error, set_attribute
+from .selector_cache import get_selector_cache
+from .resource_policy import ResourcePolicy
+from .session_recorder import SessionRecorder
+from .context_pool import PersistentContextPool
 
 logger = logging.getLogger(__name__)
 
+# 슬롯 프로필을 복사할 때 제외할 파일 (실행 중 잠금 파일과 캐시)
+_PROFILE_COPY_IGNORE = shutil.ignore_patterns('Singleton*', 'lockfile', '*.lock', 'Cache', 'Code Cache', 'GPUCache')
+
+# 진행률 계산에 사용하는 보통의 이미지 생성 소요 시간(초)
+_TYPICAL_GENERATION_SECONDS = 90
+
+# 페이지에서 생성 결과로 인정할 이미지 최소 크기(px) (아이콘, 썸네일 제외)
+_MIN_VARIANT_SIZE = 256
+
+_IMAGE_EXTENSIONS = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/webp': '.webp', 'image/gif': '.gif'}
+
 class ImageFXGenerator:
-    def __init__(self):
+    def __init__(self, pool_size=None, slot_offset=0):
+        """
+        Args:
+            pool_size (int): 브라우저 수 (None이면 IMAGEFX_BROWSER_POOL_SIZE)
+            slot_offset (int): 프로필/다운로드 폴더 번호 시작값 (워커 프로세스마다 다른 프로필을 쓰도록)
+        """
         # 절대 경로로 수정하여 경로 문제 해결
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
         self.download_dir = os.path.join(project_root, 'uploads', 'images')
@@ -20,107 +44,430 @@ class ImageFXGenerator:
         os.makedirs(self.user_data_dir, exist_ok=True)
         logger.info(f"브라우저 데이터 디렉토리: {self.user_data_dir}")
         
-    async def generate_image(self, prompt, aspect_ratio="9:16"):
+        # 브라우저 풀: 동시에 띄울 수 있는 브라우저 수
+        # 같은 프로필 디렉토리는 한 브라우저만 열 수 있으므로 슬롯마다 프로필을 따로 사용
+        self.project_root = project_root
+        self.pool_size = max(1, int(pool_size or os.environ.get('IMAGEFX_BROWSER_POOL_SIZE', 1)))
+        self.slot_offset = slot_offset
+        # 브라우저(로그인된 컨텍스트) 하나에서 동시에 사용할 탭 수
+        self.pages_per_context = max(1, int(os.environ.get('IMAGEFX_PAGES_PER_CONTEXT', 1)))
+        # 마지막 탭을 닫은 뒤 브라우저를 열어 둘 시간(초) (0이면 바로 닫음)
+        self.context_idle_seconds = float(os.environ.get('IMAGEFX_CONTEXT_IDLE_SECONDS', 0))
+        # 동시에 실행할 수 있는 생성 수 (스케줄러의 browser 리소스 한도)
+        self.max_concurrent_tasks = self.pool_size * self.pages_per_context
+        self._pool = None
+        self._policies = {}
+        
+        # 선택자 순위 캐시 (마지막으로 성공한 선택자부터 시도)
+        self.selectors = get_selector_cache()
+        
+        # ImageFX 주소 (기록한 세션 재생이나 로컬 대체 서버 사용 시 변경)
+        self.page_url = os.environ.get('IMAGEFX_URL', 'https://aitestkitchen.withgoogle.com/tools/image-fx')
+        # 세션 기록(HAR + DOM 스냅샷)/재생
+        self.recorder = SessionRecorder.from_env('imagefx')
+        
+    def _get_profile_dir(self, slot):
+        """
+        슬롯별 브라우저 프로필 디렉토리 (0번 슬롯은 기존 프로필 사용)
+
+        새 슬롯 프로필은 0번 프로필을 복사해 만들므로 0번 슬롯에서 로그인해 두면 다시 로그인하지 않아도 됩니다.
+        """
+        slot += self.slot_offset
+        if slot == 0:
+            return self.user_data_dir
+        
+        profile_dir = os.path.join(self.project_root, 'browser_data', f'imagefx_{slot}')
+        if not os.path.isdir(profile_dir) and os.path.isdir(self.user_data_dir):
+            try:
+                shutil.copytree(self.user_data_dir, profile_dir, ignore=_PROFILE_COPY_IGNORE)
+                logger.info(f"📋 ImageFX 슬롯 {slot} 프로필을 기본 프로필에서 복사했습니다")
+            except (OSError, shutil.Error) as e:
+                logger.warning(f"ImageFX 슬롯 {slot} 프로필 복사 실패, 새 프로필로 시작합니다: {e}")
+                shutil.rmtree(profile_dir, ignore_errors=True)
+        os.makedirs(profile_dir, exist_ok=True)
+        return profile_dir
+    
+    def _get_download_dir(self, slot, page_index=0):
+        """페이지별 다운로드 감시 디렉토리 (완료된 파일은 _collect_slot_download가 이미지 폴더로 이동)"""
+        slot += self.slot_offset
+        download_dir = os.path.join(self.project_root, 'browser_data', 'downloads', f'slot_{slot}', f'page_{page_index}')
+        os.makedirs(download_dir, exist_ok=True)
+        return download_dir
+    
+    def _collect_slot_download(self, result, download_dir):
+        """슬롯 다운로드 디렉토리의 결과 파일을 이미지 폴더로 이동"""
+        if download_dir == self.download_dir or result.get('status') != 'success':
+            return result
+        
+        filename = result['filename']
+        name, ext = os.path.splitext(filename)
+        target_path = os.path.join(self.download_dir, filename)
+        
+        # 같은 초에 다른 슬롯/워커가 만든 파일을 덮어쓰지 않도록 빈 이름을 배타적으로 선점
+        suffix = 1
+        while True:
+            try:
+                os.close(os.open(target_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                filename = f"{name}_{suffix}{ext}"
+                target_path = os.path.join(self.download_dir, filename)
+                suffix += 1
+        
+        try:
+            os.replace(result['filepath'], target_path)
+        except OSError:
+            os.remove(target_path)
+            raise
+        result['filename'] = filename
+        result['filepath'] = target_path
+        return result
+    
+    # 한 번의 생성에서 나온 후보 이미지를 모두 가져올 수 있음 (MediaService가 확인)
+    supports_variants = True
+    
+    async def generate_image(self, prompt, aspect_ratio="9:16", all_variants=False):
         """
         ImageFX를 사용하여 이미지를 생성합니다.
         
         Args:
             prompt (str): 이미지 생성 프롬프트
             aspect_ratio (str): 가로세로 비율 (기본값: 9:16)
+            all_variants (bool): ImageFX가 그린 후보 이미지를 모두 저장 (결과의 'variants'에 목록,
+                대표 filename/filepath는 첫 번째 후보)
             
         Returns:
             dict: 생성된 이미지 정보
         """
-        async with async_playwright() as p:
+        with span('imagefx.generate_image', aspect_ratio=aspect_ratio, prompt_length=len(prompt), all_variants=all_variants):
+            report_progress('image', 0, '브라우저 슬롯 대기 중...')
+            pool = self._get_pool()
             try:
-                # headless 모드 설정 (환경변수로 제어 가능)
-                headless_mode = os.environ.get('IMAGEFX_HEADLESS', 'true').lower() == 'true'
-                logger.info(f"Headless 모드: {headless_mode}")
-                
-                # 브라우저 실행 (사용자 데이터 유지)
-                browser = await p.chromium.launch_persistent_context(
-                    user_data_dir=self.user_data_dir,
-                    headless=headless_mode,
-                    viewport={'width': 1920, 'height': 1080},
-                    accept_downloads=True,
-                    downloads_path=self.download_dir,  # 다운로드 경로 명시적 설정
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-web-security',
-                        '--disable-features=VizDisplayCompositor',
-                        f'--download-path={self.download_dir}',  # 추가 다운로드 경로 설정
-                    ]
-                )
-                
-                # 자동화 감지 우회를 위한 스크립트 추가
-                await browser.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-                    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-                    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-                """)
-                
-                page = browser.pages[0] if browser.pages else await browser.new_page()
-                
+                with span('imagefx.slot_wait') as slot_span:
+                    lease = await pool.acquire()
+                    if slot_span:
+                        slot_span['attributes'].update(slot=lease.slot, page=lease.index)
+            except Exception as e:
+                logger.error(f"브라우저 실행 중 오류 발생: {str(e)}")
+                mark_error(str(e))
+                return {'status': 'error', 'error': str(e)}
+            
+            try:
+                result = await self._generate_image_on_page(lease, prompt, aspect_ratio, all_variants)
+                if result.get('status') != 'success':
+                    mark_error(result.get('error', '알 수 없는 오류'))
+                return result
+            finally:
+                await pool.release(lease)
+    
+    def _get_pool(self):
+        """현재 이벤트 루프에서 사용할 브라우저 컨텍스트 풀"""
+        loop = asyncio.get_running_loop()
+        if self._pool is None or not self._pool.usable_in(loop):
+            self._pool = PersistentContextPool(
+                self._launch_context,
+                pool_size=self.pool_size,
+                pages_per_context=self.pages_per_context,
+                idle_seconds=self.context_idle_seconds
+            )
+        return self._pool
+    
+    def pool_stats(self):
+        """열린 브라우저 수와 사용 중인 페이지 수"""
+        if self._pool is None:
+            return {'pool_size': self.pool_size, 'pages_per_context': self.pages_per_context, 'open_contexts': 0, 'active_pages': 0}
+        return self._pool.stats()
+    
+    async def _launch_context(self, playwright, slot):
+        """슬롯 프로필로 persistent context 실행 (풀에서 호출)"""
+        # headless 모드 설정 (환경변수로 제어 가능)
+        headless_mode = os.environ.get('IMAGEFX_HEADLESS', 'true').lower() == 'true'
+        logger.info(f"Headless 모드: {headless_mode}")
+        report_progress('image', 5, '브라우저 실행 중...')
+        
+        # 브라우저가 받은 파일은 페이지별 폴더로 옮기므로 원본은 별도 폴더에 저장
+        incoming_dir = os.path.join(self.project_root, 'browser_data', 'downloads', f'slot_{slot + self.slot_offset}', 'incoming')
+        os.makedirs(incoming_dir, exist_ok=True)
+        
+        session_options = self.recorder.launch_options(f'slot{slot + self.slot_offset}')
+        
+        with span('imagefx.launch_browser', headless=headless_mode, slot=slot):
+            # 브라우저 실행 (사용자 데이터 유지)
+            browser = await playwright.chromium.launch_persistent_context(
+                user_data_dir=self._get_profile_dir(slot),
+                headless=headless_mode,
+                viewport={'width': 1920, 'height': 1080},
+                accept_downloads=True,
+                downloads_path=incoming_dir,  # 다운로드 경로 명시적 설정
+                service_workers='block',  # 서비스 워커가 요청 차단 정책을 우회하지 않도록
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                args=[
+                    '--disable-blink-features=AutomationControlled',
+                    '--no-sandbox',
+                    '--disable-setuid-sandbox',
+                    '--disable-dev-shm-usage',
+                    '--disable-web-security',
+                    '--disable-features=VizDisplayCompositor',
+                    f'--download-path={incoming_dir}',  # 추가 다운로드 경로 설정
+                    # 여러 탭을 동시에 사용하므로 뒤에 있는 탭도 느려지지 않도록
+                    '--disable-background-timer-throttling',
+                    '--disable-backgrounding-occluded-windows',
+                    '--disable-renderer-backgrounding',
+                ],
+                **session_options
+            )
+            
+            # 자동화 감지 우회를 위한 스크립트 추가
+            await browser.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+                delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+            """)
+            
+            # 글꼴/미디어/추적 스크립트 요청 차단
+            policy = ResourcePolicy.from_env('imagefx')
+            await policy.install(browser)
+            self._policies[slot] = policy
+            
+            # 재생 모드의 HAR 라우팅은 차단 정책보다 나중에 등록해야 먼저 적용됨
+            await self.recorder.attach(browser, session_options)
+        
+        return browser
+    
+    async def _save_download(self, download, download_dir):
+        """페이지에서 받은 파일을 그 페이지의 다운로드 폴더로 이동 (같은 브라우저의 다른 페이지와 섞이지 않도록)"""
+        try:
+            await download.save_as(os.path.join(download_dir, download.suggested_filename))
+            await download.delete()
+        except Exception as e:
+            logger.warning(f"다운로드 파일 저장 실패: {e}")
+    
+    async def _generate_image_on_page(self, lease, prompt, aspect_ratio, all_variants=False):
+        """풀에서 빌린 페이지에서 이미지 생성"""
+        page = lease.page
+        # 페이지별 다운로드 디렉토리 (동시 실행 시 다른 페이지의 다운로드와 섞이지 않도록)
+        download_dir = self._get_download_dir(lease.slot, lease.index)
+        page.on('download', lambda download: asyncio.ensure_future(self._save_download(download, download_dir)))
+        
+        policy = self._policies.get(lease.slot)
+        blocked_before = policy.stats()['blocked'] if policy else 0
+        
+        try:
+            with span('imagefx.navigate'):
                 # ImageFX 페이지로 이동
                 logger.info("ImageFX 페이지로 이동 중...")
-                await page.goto('https://aitestkitchen.withgoogle.com/tools/image-fx', 
+                report_progress('image', 15, 'ImageFX 페이지로 이동 중...')
+                await page.goto(self.page_url, 
                               wait_until='domcontentloaded', timeout=30000)
                 
-                # 페이지 로드 대기
-                await page.wait_for_timeout(5000)
-                
-                # URL 확인 - 로그인 페이지로 리다이렉트되었는지 체크
-                current_url = page.url
-                logger.info(f"현재 URL: {current_url}")
-                
-                if 'accounts.google.com' in current_url or 'signin' in current_url:
-                    logger.info("Google 로그인이 필요합니다.")
-                    await self._handle_google_login(page)
-                    
-                    # 로그인 후 ImageFX 페이지로 다시 이동
-                    logger.info("로그인 완료 후 ImageFX 페이지로 이동...")
-                    await page.goto('https://aitestkitchen.withgoogle.com/tools/image-fx', 
-                                  wait_until='domcontentloaded', timeout=30000)
-                    await page.wait_for_timeout(3000)
-                
-                # ImageFX 페이지가 로드되었는지 최종 확인
-                current_url = page.url
-                if 'image-fx' not in current_url:
-                    raise Exception(f"ImageFX 페이지 로드 실패. 현재 URL: {current_url}")
+                # 페이지 로드 대기 (입력 필드가 나타나면 바로 진행, 로그인 페이지면 최대 5초)
+                await self._wait_for_prompt_field(page, timeout=5000)
+            await self.recorder.snapshot(page, 'navigate')
                 
-                logger.info("ImageFX 페이지 로드 완료")
+            # URL 확인 - 로그인 페이지로 리다이렉트되었는지 체크
+            current_url = page.url
+            logger.info(f"현재 URL: {current_url}")
+            
+            if 'accounts.google.com' in current_url or 'signin' in current_url:
+                # 같은 브라우저의 다른 페이지와 동시에 로그인하지 않도록 (먼저 로그인한 페이지가 있으면 다시 이동만)
+                async with lease.login_lock:
+                    with span('imagefx.login'):
+                        await page.goto(self.page_url, 
+                                      wait_until='domcontentloaded', timeout=30000)
+                        if 'accounts.google.com' in page.url or 'signin' in page.url:
+                            logger.info("Google 로그인이 필요합니다.")
+                            await self._handle_google_login(page)
+                            
+                            # 로그인 후 ImageFX 페이지로 다시 이동
+                            logger.info("로그인 완료 후 ImageFX 페이지로 이동...")
+                            await page.goto(self.page_url, 
+                                          wait_until='domcontentloaded', timeout=30000)
+                        await self._wait_for_prompt_field(page, timeout=3000)
+                await self.recorder.snapshot(page, 'login')
                 
-                # 프롬프트 입력
+            # ImageFX 페이지가 로드되었는지 최종 확인
+            current_url = page.url
+            if 'image-fx' not in current_url:
+                raise Exception(f"ImageFX 페이지 로드 실패. 현재 URL: {current_url}")
+            
+            logger.info("ImageFX 페이지 로드 완료")
+            report_progress('image', 30, '프롬프트 입력 중...')
+            
+            # 프롬프트 입력
+            with span('imagefx.input_prompt'):
                 await self._input_prompt(page, prompt)
-                
-                # 가로세로 비율 설정 (가능한 경우)
+            await self.recorder.snapshot(page, 'input_prompt')
+            report_progress('image', 40, '가로세로 비율 설정 중...')
+            
+            # 가로세로 비율 설정 (가능한 경우)
+            with span('imagefx.set_aspect_ratio'):
                 await self._set_aspect_ratio(page, aspect_ratio)
-                
-                # 이미지 생성 실행
+            await self.recorder.snapshot(page, 'set_aspect_ratio')
+            report_progress('image', 45, '이미지 생성 요청 중...')
+            
+            # 생성 전에 이미 있던 이미지 (예시, 이전 결과)는 후보에서 제외
+            existing_images = await self._list_page_images(page) if all_variants else set()
+            
+            # 이미지 생성 실행
+            with span('imagefx.start_generation'):
                 await self._start_generation(page)
-                
+            await self.recorder.snapshot(page, 'start_generation')
+            report_progress('image', 50, '이미지 생성 중...')
+            
+            result = None
+            if all_variants:
+                # 페이지에 그려진 후보 이미지를 모두 직접 가져오기
+                with span('imagefx.collect_variants'):
+                    result = await self._wait_and_collect_variants(page, prompt, aspect_ratio, existing_images)
+            
+            if result is None:
                 # 생성 완료 대기 및 이미지 다운로드
-                result = await self._wait_and_download_image(page, prompt, aspect_ratio)
+                with span('imagefx.wait_and_download'):
+                    result = await self._wait_and_download_image(page, prompt, aspect_ratio, download_dir)
                 
-                return result
-                
-            except Exception as e:
-                logger.error(f"이미지 생성 중 오류 발생: {str(e)}")
-                return {
-                    'status': 'error',
-                    'error': str(e)
+                result = self._collect_slot_download(result, download_dir)
+                if all_variants and result.get('status') == 'success':
+                    result['variants'] = [
+                        {key: result.get(key) for key in ('filename', 'filepath', 'file_size')}
+                    ]
+            
+            await self.recorder.snapshot(page, 'result')
+            if result.get('status') == 'success':
+                report_progress('image', 100, '이미지 생성 완료')
+            return result
+            
+        except Exception as e:
+            logger.error(f"이미지 생성 중 오류 발생: {str(e)}")
+            await self.recorder.snapshot(page, 'error')
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+            
+        finally:
+            if policy:
+                # 같은 브라우저의 다른 페이지 요청도 포함된 근삿값
+                set_attribute('requests_blocked', policy.stats()['blocked'] - blocked_before)
+    
+    async def _list_page_images(self, page):
+        """페이지에 표시된 큰 이미지의 src 목록"""
+        try:
+            sources = await page.evaluate("""(minSize) => Array.from(document.images)
+                .filter(img => img.complete && img.naturalWidth >= minSize && img.naturalHeight >= minSize)
+                .map(img => img.currentSrc || img.src)
+                .filter(src => src)""", _MIN_VARIANT_SIZE)
+        except Exception as e:
+            logger.debug(f"페이지 이미지 목록 조회 실패: {e}")
+            return set()
+        # 같은 이미지가 여러 번 표시될 수 있으므로 순서를 유지하며 중복 제거
+        return dict.fromkeys(sources)
+    
+    async def _fetch_image_bytes(self, page, src):
+        """이미지 src의 바이트와 MIME 형식 반환 (data:, blob:, http(s) 지원)"""
+        if src.startswith('data:'):
+            header, _, data = src.partition(',')
+            mime = header[5:].split(';')[0] or 'image/png'
+            return base64.b64decode(data), mime
+        
+        if src.startswith('blob:'):
+            # blob URL은 페이지 안에서만 읽을 수 있음
+            fetched = await page.evaluate("""async (src) => {
+                const blob = await (await fetch(src)).blob();
+                const bytes = new Uint8Array(await blob.arrayBuffer());
+                let binary = '';
+                for (let i = 0; i < bytes.length; i += 0x8000) {
+                    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
                 }
-                
-            finally:
-                if 'browser' in locals():
-                    await browser.close()
+                return { type: blob.type, data: btoa(binary) };
+            }""", src)
+            return base64.b64decode(fetched['data']), fetched['type'] or 'image/png'
+        
+        # 원격 이미지는 브라우저 쿠키를 공유하는 요청 컨텍스트로 받기 (CORS 영향 없음)
+        response = await page.context.request.get(src)
+        if not response.ok:
+            raise Exception(f"이미지 요청 실패 ({response.status})")
+        mime = (response.headers.get('content-type') or 'image/png').split(';')[0]
+        return await response.body(), mime
+    
+    async def _wait_and_collect_variants(self, page, prompt, aspect_ratio, existing_images, max_wait_time=600, check_interval=2):
+        """
+        생성된 후보 이미지가 모두 나타날 때까지 기다렸다가 페이지에서 직접 저장
+        
+        새 이미지 수가 두 번 연속 같으면 생성이 끝난 것으로 봅니다.
+        후보를 찾지 못하면 None을 반환해 다운로드 메뉴 방식으로 넘어갑니다.
+        """
+        logger.info("🎨 후보 이미지 생성 대기 중 (전체 후보 수집)...")
+        new_images = []
+        stable_checks = 0
+        
+        for elapsed in range(0, max_wait_time, check_interval):
+            report_progress(
+                'image', 50 + 35 * min(1.0, elapsed / _TYPICAL_GENERATION_SECONDS),
+                '이미지 생성 중...', elapsed=elapsed
+            )
+            
+            current = [src for src in await self._list_page_images(page) if src not in existing_images]
+            if current and len(current) == len(new_images):
+                stable_checks += 1
+                if stable_checks >= 2:
+                    break
+            else:
+                stable_checks = 0
+            new_images = current
+            await page.wait_for_timeout(check_interval * 1000)
+        
+        if not new_images:
+            logger.warning("⚠️ 페이지에서 후보 이미지를 찾지 못함, 다운로드 메뉴 방식으로 진행")
+            return None
+        
+        add_event('variants_detected', count=len(new_images))
+        report_progress('image', 90, f'후보 이미지 {len(new_images)}개 저장 중...')
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        variants = []
+        for index, src in enumerate(new_images, 1):
+            try:
+                data, mime = await self._fetch_image_bytes(page, src)
+            except Exception as e:
+                logger.warning(f"후보 이미지 {index} 가져오기 실패: {e}")
+                continue
+            
+            # 아이콘이나 깨진 응답 제외 (다운로드 방식과 같은 5KB 기준)
+            if len(data) <= 5000:
+                continue
+            
+            filename = f"imagefx_{timestamp}_{index}{_IMAGE_EXTENSIONS.get(mime, '.png')}"
+            filepath = os.path.join(self.download_dir, filename)
+            async with aiofiles.open(filepath, 'wb') as f:
+                await f.write(data)
+            variants.append({'filename': filename, 'filepath': filepath, 'file_size': len(data)})
+            logger.info(f"✅ 후보 이미지 {index} 저장: {filename} ({len(data):,} bytes)")
+        
+        if not variants:
+            return None
+        
+        return {
+            'status': 'success',
+            'filename': variants[0]['filename'],
+            'filepath': variants[0]['filepath'],
+            'prompt': prompt,
+            'aspect_ratio': aspect_ratio,
+            'generator': 'imagefx',
+            'file_size': variants[0]['file_size'],
+            'download_method': 'page_variants',
+            'variants': variants
+        }
+    
+    async def _wait_for_prompt_field(self, page, timeout):
+        """프롬프트 입력 필드가 렌더링될 때까지 대기 (고정 대기 대신)"""
+        try:
+            await page.wait_for_selector('textarea, [contenteditable="true"]', state='visible', timeout=timeout)
+            await page.wait_for_timeout(500)
+        except Exception:
+            logger.debug("프롬프트 입력 필드 대기 시간 초과, 계속 진행")
 
     async def _handle_google_login(self, page):
         """Google 로그인 처리"""
@@ -271,7 +618,8 @@ class ImageFXGenerator:
         
         prompt_input = None
         
-        # 순차적으로 선택자 시도
+        # 순차적으로 선택자 시도 (마지막으로 성공한 선택자 먼저)
+        prompt_selectors = self.selectors.rank('imagefx', 'prompt_input', prompt_selectors)
         for i, selector in enumerate(prompt_selectors):
             try:
                 logger.debug(f"선택자 시도 {i+1}/{len(prompt_selectors)}: {selector}")
@@ -324,9 +672,11 @@ class ImageFXGenerator:
                 logger.debug(f"선택자 '{selector}' 시도 중 오류: {e}")
                 continue
         
+        self.selectors.record('imagefx', 'prompt_input', prompt_selectors, selector if prompt_input else None)
+        
         if not prompt_input:
             # 페이지 스크린샷 저장 (디버깅용)
-            screenshot_path = os.path.join(self.download_dir, f"debug_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+            screenshot_path = os.path.join(get_debug_dir('screenshots'), f"debug_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
             await page.screenshot(path=screenshot_path)
             logger.info(f"디버깅을 위해 스크린샷 저장: {screenshot_path}")
             
@@ -588,6 +938,7 @@ class ImageFXGenerator:
         ]
         
         generate_button = None
+        generate_selectors = self.selectors.rank('imagefx', 'generate_button', generate_selectors)
         for i, selector in enumerate(generate_selectors):
             try:
                 logger.debug(f"생성 버튼 선택자 시도 {i+1}: {selector}")
@@ -625,6 +976,8 @@ class ImageFXGenerator:
                 logger.debug(f"선택자 '{selector}' 시도 중 오류: {e}")
                 continue
         
+        self.selectors.record('imagefx', 'generate_button', generate_selectors, selector if generate_button else None)
+        
         if generate_button:
             try:
                 await generate_button.click()
@@ -642,8 +995,9 @@ class ImageFXGenerator:
         # 생성 시작 확인을 위한 충분한 대기
         await page.wait_for_timeout(10000)
 
-    async def _wait_and_download_image(self, page, prompt, aspect_ratio):
-        """생성 완료 대기 및 이미지 다운로드"""
+    async def _wait_and_download_image(self, page, prompt, aspect_ratio, download_dir=None):
+        """생성 완료 대기 및 이미지 다운로드 (download_dir: 다운로드 감시 디렉토리)"""
+        download_dir = download_dir or self.download_dir
         logger.info("🎨 이미지 생성 완료 대기 중...")
         
         # 생성 완료까지 최대 대기 시간 (10분)
@@ -656,6 +1010,12 @@ class ImageFXGenerator:
         
         for elapsed in range(0, max_wait_time, check_interval):
             try:
+                # 진행 상황 보고 (생성 완료 시점을 알 수 없으므로 보통 소요 시간 기준으로 85%까지)
+                report_progress(
+                    'image', 50 + 35 * min(1.0, elapsed / _TYPICAL_GENERATION_SECONDS),
+                    '이미지 생성 중...', elapsed=elapsed
+                )
+                
                 # 진행 상황 로그
                 if elapsed % 60 == 0 and elapsed > 0:
                     logger.info(f"⏳ 이미지 생성 대기 중... ({elapsed}/{max_wait_time}초)")
@@ -698,8 +1058,9 @@ class ImageFXGenerator:
                 
                 download_button = None
                 
-                # 1단계: 더보기 버튼 찾기 및 클릭
+                # 1단계: 더보기 버튼 찾기 및 클릭 (마지막으로 성공한 선택자 먼저)
                 more_button = None
+                more_button_selectors = self.selectors.rank('imagefx', 'more_button', more_button_selectors)
                 for i, selector in enumerate(more_button_selectors):
                     try:
                         logger.debug(f"더보기 버튼 선택자 시도 {i+1}/{len(more_button_selectors)}: {selector}")
@@ -724,6 +1085,7 @@ class ImageFXGenerator:
                                 
                                 more_button = element
                                 logger.info(f"✅ 더보기 버튼 발견: 선택자 '{selector}', 요소 {j+1}")
+                                add_event('more_button_found', selector=selector)
                                 break
                                 
                             except Exception as e:
@@ -737,6 +1099,8 @@ class ImageFXGenerator:
                         logger.debug(f"선택자 '{selector}' 시도 중 오류: {e}")
                         continue
                 
+                self.selectors.record('imagefx', 'more_button', more_button_selectors, selector if more_button else None)
+                
                 # 더보기 버튼을 찾았으면 클릭
                 if more_button:
                     try:
@@ -846,6 +1210,7 @@ class ImageFXGenerator:
                             
                             # 정확한 선택자들을 먼저 시도
                             download_found_precise = False
+                            precise_selectors = self.selectors.rank('imagefx', 'download_menu_precise', precise_selectors)
                             for i, selector in enumerate(precise_selectors):
                                 try:
                                     logger.info(f"🎯 정밀 선택자 시도 {i+1}/{len(precise_selectors)}: {selector}")
@@ -878,13 +1243,15 @@ class ImageFXGenerator:
                                             
                                             # 즉시 다운로드 시도
                                             logger.info(f"📥 정밀 다운로드 요소 클릭 시도...")
+                                            report_progress('image', 90, '이미지 다운로드 중...')
+                                            add_event('download_clicked', method='precise_element')
                                             
                                             # 스크롤 및 대기
                                             await element.scroll_into_view_if_needed()
                                             await page.wait_for_timeout(1000)
                                             
                                             # 다운로드 폴더의 기존 파일 목록 저장
-                                            existing_files = set(os.listdir(self.download_dir))
+                                            existing_files = set(os.listdir(download_dir))
                                             
                                             # 3단계 클릭 시도
                                             precise_clicked = False
@@ -929,13 +1296,13 @@ class ImageFXGenerator:
                                                     
                                                     # 새 파일 확인
                                                     try:
-                                                        current_files = set(os.listdir(self.download_dir))
+                                                        current_files = set(os.listdir(download_dir))
                                                         new_files = current_files - existing_files
                                                         
                                                         # 다운로드 중인 파일(임시 파일) 포함 대기
                                                         all_potential_files = []
                                                         for f in current_files:
-                                                            filepath = os.path.join(self.download_dir, f)
+                                                            filepath = os.path.join(download_dir, f)
                                                             if (os.path.exists(filepath) and 
                                                                 f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.crdownload', '.tmp')) and
                                                                 f not in existing_files):
@@ -952,7 +1319,7 @@ class ImageFXGenerator:
                                                             newest_time = 0
                                                             
                                                             for filename in new_files:
-                                                                filepath = os.path.join(self.download_dir, filename)
+                                                                filepath = os.path.join(download_dir, filename)
                                                                 if os.path.exists(filepath):
                                                                     # 다운로드 중인 파일 제외
                                                                     if filename.endswith('.crdownload') or filename.endswith('.tmp'):
@@ -965,10 +1332,11 @@ class ImageFXGenerator:
                                                                         newest_file = filename
                                                             
                                                             if newest_file:
-                                                                filepath = os.path.join(self.download_dir, newest_file)
+                                                                filepath = os.path.join(download_dir, newest_file)
                                                                 file_size = os.path.getsize(filepath)
                                                                 
                                                                 logger.info(f"📁 새 파일 발견: {newest_file} ({file_size:,} bytes)")
+                                                                add_event('file_detected', bytes=file_size)
                                                                 
                                                                 if file_size > 5000:  # 5KB 이상
                                                                     # 파일 이름 정리
@@ -977,7 +1345,7 @@ class ImageFXGenerator:
                                                                     if not ext:
                                                                         ext = '.jpg'
                                                                     final_filename = f"imagefx_{timestamp}{ext}"
-                                                                    final_filepath = os.path.join(self.download_dir, final_filename)
+                                                                    final_filepath = os.path.join(download_dir, final_filename)
                                                                     
                                                                     try:
                                                                         if filepath != final_filepath:
@@ -1029,6 +1397,11 @@ class ImageFXGenerator:
                                     logger.debug(f"정밀 선택자 '{selector}' 시도 중 오류: {e}")
                                     continue
                             
+                            self.selectors.record(
+                                'imagefx', 'download_menu_precise', precise_selectors,
+                                selector if download_found_precise else None
+                            )
+                            
                             # 정밀 선택자로 성공하면 일반 스캔 생략
                             if download_found_precise:
                                 logger.info("✅ 정밀 선택자로 다운로드 완료, 일반 스캔 생략")
@@ -1093,13 +1466,15 @@ class ImageFXGenerator:
                             if download_candidates:
                                 for candidate in download_candidates:
                                     logger.info(f"\n📥 다운로드 후보 클릭 시도: '{candidate['text']}'")
+                                    report_progress('image', 90, '이미지 다운로드 중...')
+                                    add_event('download_clicked', method='candidate', text=candidate['text'])
                                     
                                     try:
                                         # 다운로드 이벤트 리스너 설정
                                         if not download_promise:
                                             try:
                                                 # 파일 시스템 기반 다운로드 감지 사용
-                                                existing_files = set(os.listdir(self.download_dir))
+                                                existing_files = set(os.listdir(download_dir))
                                                 logger.info("파일 시스템 기반 다운로드 감지 설정 완료")
                                             except Exception as e:
                                                 logger.warning(f"다운로드 감지 설정 오류: {e}")
@@ -1153,7 +1528,7 @@ class ImageFXGenerator:
                                                     await page.wait_for_timeout(1000)
                                                     
                                                     # 새 파일 확인
-                                                    current_files = set(os.listdir(self.download_dir))
+                                                    current_files = set(os.listdir(download_dir))
                                                     new_files = current_files - existing_files
                                                     
                                                     if new_files:
@@ -1162,7 +1537,7 @@ class ImageFXGenerator:
                                                         newest_time = 0
                                                         
                                                         for filename in new_files:
-                                                            filepath = os.path.join(self.download_dir, filename)
+                                                            filepath = os.path.join(download_dir, filename)
                                                             if os.path.exists(filepath):
                                                                 file_time = os.path.getctime(filepath)
                                                                 if file_time > newest_time:
@@ -1170,7 +1545,7 @@ class ImageFXGenerator:
                                                                     newest_file = filename
                                                         
                                                         if newest_file:
-                                                            filepath = os.path.join(self.download_dir, newest_file)
+                                                            filepath = os.path.join(download_dir, newest_file)
                                                             file_size = os.path.getsize(filepath)
                                                             
                                                             if file_size > 5000:  # 5KB 이상
@@ -1180,7 +1555,7 @@ class ImageFXGenerator:
                                                                 if not ext:
                                                                     ext = '.jpg'
                                                                 final_filename = f"imagefx_{timestamp}{ext}"
-                                                                final_filepath = os.path.join(self.download_dir, final_filename)
+                                                                final_filepath = os.path.join(download_dir, final_filename)
                                                                 
                                                                 try:
                                                                     if filepath != final_filepath:
@@ -1233,6 +1608,7 @@ class ImageFXGenerator:
                     logger.debug("더보기 버튼을 찾지 못함, 직접 다운로드 버튼 검색...")
                     
                     # 더보기 버튼을 찾지 못한 경우 직접 다운로드 버튼 찾기
+                    download_menu_selectors = self.selectors.rank('imagefx', 'download_menu', download_menu_selectors)
                     for i, selector in enumerate(download_menu_selectors):
                         try:
                             logger.debug(f"다운로드 선택자 시도 {i+1}/{len(download_menu_selectors)}: {selector}")
@@ -1269,17 +1645,21 @@ class ImageFXGenerator:
                         except Exception as e:
                             logger.debug(f"선택자 '{selector}' 시도 중 오류: {e}")
                             continue
+                    
+                    self.selectors.record('imagefx', 'download_menu', download_menu_selectors, selector if download_button else None)
                 
                 # 다운로드 메뉴 아이템을 찾았으면 클릭 시도
                 if download_button:
                     logger.info("📥 다운로드 메뉴 아이템 클릭 시도...")
+                    report_progress('image', 90, '이미지 다운로드 중...')
+                    add_event('download_clicked', method='menu_item')
                     
                     try:
                         # 다운로드 이벤트 리스너 설정
                         if not download_promise:
                             try:
                                 # 파일 시스템 방식으로 대체
-                                existing_files_before = set(os.listdir(self.download_dir))
+                                existing_files_before = set(os.listdir(download_dir))
                                 logger.info("파일 시스템 기반 다운로드 감지 설정 완료")
                             except Exception as e:
                                 logger.warning(f"다운로드 감지 설정 오류: {e}")
@@ -1348,7 +1728,7 @@ class ImageFXGenerator:
                                 await page.wait_for_timeout(1000)
                                 
                                 # 새 파일 확인
-                                current_files = set(os.listdir(self.download_dir))
+                                current_files = set(os.listdir(download_dir))
                                 new_files = current_files - existing_files_before
                                 
                                 if new_files:
@@ -1357,7 +1737,7 @@ class ImageFXGenerator:
                                     newest_time = 0
                                     
                                     for new_filename in new_files:
-                                        new_filepath = os.path.join(self.download_dir, new_filename)
+                                        new_filepath = os.path.join(download_dir, new_filename)
                                         if os.path.exists(new_filepath):
                                             file_time = os.path.getctime(new_filepath)
                                             if file_time > newest_time:
@@ -1365,7 +1745,7 @@ class ImageFXGenerator:
                                                 newest_file = new_filename
                                     
                                     if newest_file:
-                                        file_path = os.path.join(self.download_dir, newest_file)
+                                        file_path = os.path.join(download_dir, newest_file)
                                         file_size = os.path.getsize(file_path)
                                         
                                         if file_size > 1000:  # 1KB 이상
@@ -1375,7 +1755,7 @@ class ImageFXGenerator:
                                             if not ext:
                                                 ext = '.jpg'
                                             filename = f"imagefx_{timestamp}{ext}"
-                                            filepath = os.path.join(self.download_dir, filename)
+                                            filepath = os.path.join(download_dir, filename)
                                             
                                             try:
                                                 if file_path != filepath:
@@ -1463,7 +1843,7 @@ class ImageFXGenerator:
         logger.warning("⏰ 이미지 생성 대기 시간 초과!")
         
         # 디버깅용 전체 페이지 스크린샷
-        screenshot_path = os.path.join(self.download_dir, f"timeout_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+        screenshot_path = os.path.join(get_debug_dir('screenshots'), f"timeout_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
         await page.screenshot(path=screenshot_path, full_page=True)
         logger.info(f"📸 타임아웃 디버깅 스크린샷 저장: {screenshot_path}")
         
@@ -1489,7 +1869,7 @@ class ImageFXGenerator:
                         # 스크린샷으로 폴백
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         filename = f"imagefx_fallback_{timestamp}.png"
-                        filepath = os.path.join(self.download_dir, filename)
+                        filepath = os.path.join(download_dir, filename)
                         
                         await img.screenshot(path=filepath)
                         
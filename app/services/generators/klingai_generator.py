@@ -6,32 +6,66 @@ import logging
 from datetime import datetime
 import time
 import base64
-
-# PyJWT를 안전하게 import
-try:
-    import jwt
-    JWT_AVAILABLE = True
-except ImportError:
-    JWT_AVAILABLE = False
-    print("⚠️ PyJWT가 설치되지 않았습니다. 'pip install PyJWT==2.8.0' 명령어로 설치해주세요.")
+import hashlib
+from ..job_store import find_remote_task, record_remote_task, REMOTE_SUBMITTED, REMOTE_COMPLETED, REMOTE_FAILED
+from ..progress_bus import report_progress
+from ..metrics import REMOTE_DOWNLOAD_SECONDS
 
 logger = logging.getLogger(__name__)
 
+_jwt_module = None
+
+
+def _load_jwt():
+    """PyJWT를 처음 사용할 때 import (설치되어 있지 않으면 None)"""
+    global _jwt_module
+    
+    if _jwt_module is None:
+        try:
+            import jwt
+            _jwt_module = jwt
+        except ImportError:
+            logger.warning("⚠️ PyJWT가 설치되지 않았습니다. 'pip install PyJWT==2.8.0' 명령어로 설치해주세요.")
+            return None
+    return _jwt_module
+
+
+def _mask_secret(value):
+    """로그에 남길 수 있도록 키의 앞 4자리만 표시"""
+    if not value:
+        return '미설정'
+    return f"{value[:4]}{'*' * 8} (길이 {len(value)})"
+
+# 작업 저장소에 원격 작업을 기록할 때 쓰는 백엔드 이름
+REMOTE_BACKEND = 'klingai_api'
+
+# 진행률 계산에 사용하는 보통의 원격 작업 처리 시간(초)
+_TYPICAL_PROCESSING_SECONDS = 180
+
+class KlingAITaskError(Exception):
+    """KlingAI 원격 작업 실패 (재시도해도 같은 작업은 복구되지 않음)"""
+    pass
+
 class KlingAIVideoGenerator:
     def __init__(self, api_key=None):
         self.api_key = api_key or os.getenv('KLINGAI_API_KEY')
         self.secret_key = os.getenv('KLINGAI_SECRET_KEY')
         
-        # 디버깅: API 키 로드 상태 확인
-        print(f"\n=== KlingAI API 키 디버깅 ===")
-        print(f"Access Key: {self.api_key}")
-        print(f"Secret Key: {self.secret_key}")
-        print(f"Access Key 길이: {len(self.api_key) if self.api_key else 0}")
-        print(f"Secret Key 길이: {len(self.secret_key) if self.secret_key else 0}")
-        print(f"==================================\n")
+        # API 키 로드 상태 확인 (키 값은 로그에 남기지 않음)
+        logger.info(f"KlingAI Access Key: {_mask_secret(self.api_key)}, Secret Key: {_mask_secret(self.secret_key)}")
+        
+        # 공식 API 엔드포인트 (문서 기준, 로컬 대체 서버로 테스트할 때 변경)
+        self.base_url = os.getenv('KLINGAI_API_BASE_URL', 'https://api-singapore.klingai.com').rstrip('/')
+        # 작업 상태 확인 간격과 최대 대기 시간(초)
+        self.poll_interval = float(os.getenv('KLINGAI_POLL_INTERVAL', 10))
+        self.max_wait_seconds = float(os.getenv('KLINGAI_MAX_WAIT_SECONDS', 600))
         
-        # 공식 API 엔드포인트 (문서 기준)
-        self.base_url = "https://api-singapore.klingai.com"
+        # 계정에서 동시에 실행할 수 있는 작업 수 (초과분은 스케줄러에서 대기)
+        self.max_concurrent_tasks = max(1, int(os.getenv('KLINGAI_MAX_CONCURRENT_TASKS', 3)))
+        # 분당 작업 제출 한도 (429를 받으면 자동으로 줄였다가 회복)
+        self.requests_per_minute = float(os.getenv('KLINGAI_RATE_PER_MINUTE', 10))
+        # 동영상 1개당 비용 (크레딧, 라우팅 시 VIDEO_ROUTING_COST_WEIGHT와 함께 사용)
+        self.cost_per_video = float(os.getenv('KLINGAI_API_COST', 0))
         self.download_dir = os.path.join(os.path.dirname(__file__), '../../../../uploads/videos')
         os.makedirs(self.download_dir, exist_ok=True)
         
@@ -39,7 +73,8 @@ class KlingAIVideoGenerator:
         """
         KlingAI JWT 토큰 생성 (공식 문서 기준)
         """
-        if not JWT_AVAILABLE:
+        jwt = _load_jwt()
+        if jwt is None:
             raise Exception("PyJWT 패키지가 설치되지 않았습니다. 'pip install PyJWT==2.8.0' 명령어로 설치해주세요.")
             
         if not self.api_key or not self.secret_key:
@@ -61,7 +96,7 @@ class KlingAIVideoGenerator:
         logger.info(f"JWT 토큰 생성 완료: {token[:20]}...")
         return token
         
-    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5):
+    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5, output_count=1):
         """
         KlingAI API를 사용하여 이미지에서 동영상을 생성합니다.
         
@@ -72,6 +107,7 @@ class KlingAIVideoGenerator:
             cfg_scale (float): Flexibility (0.0-1.0)
             mode (str): 생성 모드 (std, pro)
             duration (int): 동영상 길이 (5 또는 10초)
+            output_count (int): 통합 인터페이스 호환용 (API는 작업당 1개 생성)
             
         Returns:
             dict: 생성된 동영상 정보
@@ -88,7 +124,7 @@ class KlingAIVideoGenerator:
                 'error': 'KlingAI Secret Key가 설정되지 않았습니다. .env 파일에 KLINGAI_SECRET_KEY를 추가해주세요.'
             }
         
-        if not JWT_AVAILABLE:
+        if _load_jwt() is None:
             return {
                 'status': 'error',
                 'error': 'PyJWT 패키지가 설치되지 않았습니다. 명령프롬프트에서 "pip install PyJWT==2.8.0" 명령어로 설치해주세요.'
@@ -111,126 +147,62 @@ class KlingAIVideoGenerator:
         logger.info(f"인증 방식: JWT 토큰")
         logger.info(f"API 엔드포인트: {self.base_url}")
         
+        # 같은 작업에서 이미 제출한 요청이면(재시작 후 복구 등) 새로 제출하지 않고 이어서 확인
+        fingerprint = self._request_fingerprint(image_path, prompt, negative_prompt, cfg_scale, mode, duration)
+        existing_task = find_remote_task(REMOTE_BACKEND, fingerprint)
+        task_id = None
+        
         async with aiohttp.ClientSession() as session:
             try:
-                # 1. 이미지를 Base64로 인코딩
-                logger.info("이미지 Base64 인코딩 중...")
-                image_base64 = await self._encode_image_to_base64(image_path)
-                if not image_base64:
-                    raise Exception("이미지 인코딩 실패")
-                
-                # 2. 비디오 생성 작업 시작 (공식 문서 API 구조)
-                logger.info("이미지에서 비디오 생성 작업 시작...")
-                
-                # 문서에 따른 정확한 요청 데이터 구조
-                request_data = {
-                    "model_name": "kling-v1",  # 기본 모델
-                    "mode": mode,              # std 또는 pro
-                    "duration": str(duration), # 문자열로 전달
-                    "image": image_base64,     # Base64 인코딩된 이미지 (prefix 없이)
-                    "prompt": prompt,          # 동영상 프롬프트
-                    "cfg_scale": cfg_scale     # 유연성 설정
-                }
-                
-                # 네거티브 프롬프트 추가 (있는 경우)
-                if negative_prompt:
-                    request_data["negative_prompt"] = negative_prompt
-                
-                logger.info(f"요청 데이터: {json.dumps({**request_data, 'image': 'base64_encoded_image...'}, indent=2)}")
-                
-                # 3. Image to Video API 호출 (공식 문서 엔드포인트)
-                endpoint = f'{self.base_url}/v1/videos/image2video'
-                logger.info(f"API 호출: {endpoint}")
-                
-                async with session.post(
-                    endpoint,
-                    headers=headers,
-                    json=request_data
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"API 응답 상태: {response.status}")
-                    logger.info(f"API 응답 헤더: {dict(response.headers)}")
-                    logger.info(f"API 응답 내용: {response_text}")
-                    
-                    # 401 오류 시 상세 디버깅
-                    if response.status == 401:
-                        logger.error("=== 401 인증 실패 디버깅 ===")
-                        logger.error(f"API 키 상태: {'있음' if self.api_key else '없음'}")
-                        logger.error(f"Secret 키 상태: {'있음' if self.secret_key else '없음'}")
-                        logger.error(f"JWT 토큰: {jwt_token[:30]}...")
-                        logger.error("API 키가 올바르지 않거나 계정 문제일 수 있습니다.")
-                        logger.error("1. KlingAI 계정에서 API 키 재확인")
-                        logger.error("2. 계정 크레디트 잔액 확인")
-                        logger.error("3. API 키 권한 확인")
-                        logger.error("==================================")
-                        
-                        return {
-                            'status': 'error',
-                            'error': f'인증 실패 (401): API 키 또는 Secret Key가 올바르지 않습니다.',
-                            'debug_info': {
-                                'response_status': response.status,
-                                'response_text': response_text,
-                                'api_key_length': len(self.api_key) if self.api_key else 0,
-                                'secret_key_length': len(self.secret_key) if self.secret_key else 0
-                            }
-                        }
-                    
-                    if response.status != 200:
-                        error_detail = f"HTTP {response.status}: {response_text}"
-                        logger.error(f"API 오류: {error_detail}")
-                        return {
-                            'status': 'error',
-                            'error': f'API 호출 실패: {error_detail}',
-                            'debug_info': {
-                                'response_status': response.status,
-                                'response_text': response_text
-                            }
-                        }
-                    
-                    try:
-                        result = json.loads(response_text)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON 파싱 오류: {e}")
-                        return {
-                            'status': 'error',
-                            'error': f'API 응답 파싱 실패: {response_text}'
-                        }
-                    
-                    if result.get('code') != 0:
-                        error_msg = result.get('message', '알 수 없는 오류')
-                        logger.error(f"API 오류 코드: {result.get('code')} - {error_msg}")
-                        return {
-                            'status': 'error',
-                            'error': f'API 오류: {error_msg}',
-                            'debug_info': result
-                        }
-                    
-                    task_id = result['data']['task_id']
-                    logger.info(f"비디오 생성 작업 시작됨 - Task ID: {task_id}")
+                if existing_task and existing_task['status'] == REMOTE_SUBMITTED:
+                    task_id = existing_task['task_id']
+                    logger.info(f"기존 비디오 생성 작업 이어서 확인 - Task ID: {task_id}")
+                else:
+                    report_progress('video', 5, 'KlingAI 작업 제출 중...')
+                    submitted = await self._submit_task(
+                        session, headers, jwt_token, image_path, prompt, negative_prompt, cfg_scale, mode, duration
+                    )
+                    if submitted.get('status') != 'success':
+                        return submitted
+                    task_id = submitted['task_id']
+                    record_remote_task(REMOTE_BACKEND, fingerprint, task_id)
                 
                 # 4. 생성 상태 확인 및 대기
                 logger.info("비디오 생성 완료 대기 중...")
-                video_data = await self._wait_for_completion(session, task_id, headers)
+                video_data = await self._wait_for_completion(session, task_id, headers, max_wait=self.max_wait_seconds)
                 
                 if not video_data:
                     raise Exception("비디오 생성 실패")
                 
                 # 5. 동영상 다운로드
                 logger.info(f"동영상 다운로드 중: {video_data['video_url']}")
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
                 filename = f"klingai_{timestamp}.mp4"
                 filepath = os.path.join(self.download_dir, filename)
                 
+                download_started = time.monotonic()
                 async with session.get(video_data['video_url']) as video_response:
                     if video_response.status == 200:
+                        total_bytes = video_response.content_length
+                        received = 0
                         with open(filepath, 'wb') as f:
                             async for chunk in video_response.content.iter_chunked(8192):
                                 f.write(chunk)
+                                received += len(chunk)
+                                report_progress(
+                                    'download',
+                                    85 + 15 * received / total_bytes if total_bytes else None,
+                                    '동영상 다운로드 중...',
+                                    bytes=received,
+                                    total_bytes=total_bytes
+                                )
+                        REMOTE_DOWNLOAD_SECONDS.observe(time.monotonic() - download_started, backend=REMOTE_BACKEND)
                         logger.info(f"동영상 다운로드 완료: {filename}")
                     else:
                         raise Exception(f"동영상 다운로드 실패: {video_response.status}")
                 
                 logger.info(f"동영상 생성 완료: {filename}")
+                record_remote_task(REMOTE_BACKEND, fingerprint, task_id, REMOTE_COMPLETED)
                 
                 return {
                     'status': 'success',
@@ -244,13 +216,143 @@ class KlingAIVideoGenerator:
                     'generator': 'klingai'
                 }
                 
+            except KlingAITaskError as e:
+                # 원격 작업 자체가 실패한 경우에만 재시도 시 새로 제출
+                logger.error(f"동영상 생성 중 오류 발생: {str(e)}")
+                record_remote_task(REMOTE_BACKEND, fingerprint, task_id, REMOTE_FAILED)
+                return {
+                    'status': 'error',
+                    'error': str(e),
+                    'task_id': task_id
+                }
             except Exception as e:
                 logger.error(f"동영상 생성 중 오류 발생: {str(e)}")
                 return {
                     'status': 'error',
-                    'error': str(e)
+                    'error': str(e),
+                    'task_id': task_id
                 }
     
+    def _request_fingerprint(self, image_path, prompt, negative_prompt, cfg_scale, mode, duration):
+        """같은 요청인지 판별하기 위한 키"""
+        payload = json.dumps(
+            [os.path.abspath(image_path), prompt, negative_prompt, cfg_scale, mode, str(duration)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def _submit_task(self, session, headers, jwt_token, image_path, prompt, negative_prompt, cfg_scale, mode, duration):
+        """
+        비디오 생성 작업 제출
+        
+        Returns:
+            dict: 성공 시 {'status': 'success', 'task_id'}, 실패 시 오류 결과
+        """
+        # 1. 이미지를 Base64로 인코딩
+        logger.info("이미지 Base64 인코딩 중...")
+        image_base64 = await self._encode_image_to_base64(image_path)
+        if not image_base64:
+            raise Exception("이미지 인코딩 실패")
+        
+        # 2. 비디오 생성 작업 시작 (공식 문서 API 구조)
+        logger.info("이미지에서 비디오 생성 작업 시작...")
+        
+        # 문서에 따른 정확한 요청 데이터 구조
+        request_data = {
+            "model_name": "kling-v1",  # 기본 모델
+            "mode": mode,              # std 또는 pro
+            "duration": str(duration), # 문자열로 전달
+            "image": image_base64,     # Base64 인코딩된 이미지 (prefix 없이)
+            "prompt": prompt,          # 동영상 프롬프트
+            "cfg_scale": cfg_scale     # 유연성 설정
+        }
+        
+        # 네거티브 프롬프트 추가 (있는 경우)
+        if negative_prompt:
+            request_data["negative_prompt"] = negative_prompt
+        
+        logger.info(f"요청 데이터: {json.dumps({**request_data, 'image': 'base64_encoded_image...'}, indent=2)}")
+        
+        # 3. Image to Video API 호출 (공식 문서 엔드포인트)
+        endpoint = f'{self.base_url}/v1/videos/image2video'
+        logger.info(f"API 호출: {endpoint}")
+        
+        async with session.post(
+            endpoint,
+            headers=headers,
+            json=request_data
+        ) as response:
+            response_text = await response.text()
+            logger.info(f"API 응답 상태: {response.status}")
+            logger.info(f"API 응답 헤더: {dict(response.headers)}")
+            logger.info(f"API 응답 내용: {response_text}")
+            
+            # 401 오류 시 상세 디버깅
+            if response.status == 401:
+                logger.error("=== 401 인증 실패 디버깅 ===")
+                logger.error(f"API 키 상태: {'있음' if self.api_key else '없음'}")
+                logger.error(f"Secret 키 상태: {'있음' if self.secret_key else '없음'}")
+                logger.error(f"JWT 토큰: {jwt_token[:30]}...")
+                logger.error("API 키가 올바르지 않거나 계정 문제일 수 있습니다.")
+                logger.error("1. KlingAI 계정에서 API 키 재확인")
+                logger.error("2. 계정 크레디트 잔액 확인")
+                logger.error("3. API 키 권한 확인")
+                logger.error("==================================")
+                
+                return {
+                    'status': 'error',
+                    'error': f'인증 실패 (401): API 키 또는 Secret Key가 올바르지 않습니다.',
+                    'debug_info': {
+                        'response_status': response.status,
+                        'response_text': response_text,
+                        'api_key_length': len(self.api_key) if self.api_key else 0,
+                        'secret_key_length': len(self.secret_key) if self.secret_key else 0
+                    }
+                }
+            
+            if response.status != 200:
+                error_detail = f"HTTP {response.status}: {response_text}"
+                logger.error(f"API 오류: {error_detail}")
+                return {
+                    'status': 'error',
+                    'error': f'API 호출 실패: {error_detail}',
+                    'rate_limited': response.status == 429,
+                    'retry_after': self._parse_retry_after(response.headers.get('Retry-After')),
+                    'debug_info': {
+                        'response_status': response.status,
+                        'response_text': response_text
+                    }
+                }
+            
+            try:
+                result = json.loads(response_text)
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON 파싱 오류: {e}")
+                return {
+                    'status': 'error',
+                    'error': f'API 응답 파싱 실패: {response_text}'
+                }
+            
+            if result.get('code') != 0:
+                error_msg = result.get('message', '알 수 없는 오류')
+                logger.error(f"API 오류 코드: {result.get('code')} - {error_msg}")
+                return {
+                    'status': 'error',
+                    'error': f'API 오류: {error_msg}',
+                    'debug_info': result
+                }
+            
+            task_id = result['data']['task_id']
+            logger.info(f"비디오 생성 작업 시작됨 - Task ID: {task_id}")
+            return {'status': 'success', 'task_id': task_id}
+        
+    def _parse_retry_after(self, value):
+        """Retry-After 헤더(초)를 숫자로 변환"""
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+    
     async def _encode_image_to_base64(self, image_path):
         """
         이미지를 Base64로 인코딩합니다. (공식 문서 기준)
@@ -293,7 +395,7 @@ class KlingAIVideoGenerator:
             dict: 생성된 동영상 정보
         """
         start_time = time.time()
-        check_interval = 10  # 10초마다 확인
+        check_interval = self.poll_interval
         
         # 공식 문서 기준 상태 확인 엔드포인트
         status_endpoint = f'{self.base_url}/v1/videos/image2video/{task_id}'
@@ -331,6 +433,19 @@ class KlingAIVideoGenerator:
                     
                     logger.info(f"작업 상태: {status}")
                     
+                    # 진행 상황 보고 (처리 완료 시점을 알 수 없으므로 보통 처리 시간 기준으로 80%까지)
+                    elapsed = time.time() - start_time
+                    if status == 'submitted':
+                        percent = 10
+                    elif status == 'processing':
+                        percent = 10 + 70 * min(1.0, elapsed / _TYPICAL_PROCESSING_SECONDS)
+                    else:
+                        percent = 85 if status == 'succeed' else None
+                    report_progress(
+                        'video', percent, f"KlingAI 작업 상태: {status}",
+                        task_id=task_id, task_status=status, elapsed=int(elapsed)
+                    )
+                    
                     if status == 'succeed':
                         # 성공 - 비디오 URL 추출 (공식 문서 응답 구조)
                         task_result = task_data.get('task_result', {})
@@ -339,7 +454,7 @@ class KlingAIVideoGenerator:
                         if videos and len(videos) > 0:
                             video_info = videos[0]
                             video_url = video_info.get('url')
-                            video_duration = video_info.get('duration', str(duration))
+                            video_duration = video_info.get('duration')
                             
                             if video_url:
                                 logger.info(f"비디오 생성 성공! URL: {video_url}")
@@ -351,12 +466,12 @@ class KlingAIVideoGenerator:
                         
                         # 비디오 URL을 찾을 수 없는 경우
                         logger.error(f"비디오 URL을 찾을 수 없습니다. task_result: {json.dumps(task_result, indent=2)}")
-                        raise Exception("생성 완료되었지만 비디오 URL을 찾을 수 없습니다")
+                        raise KlingAITaskError("생성 완료되었지만 비디오 URL을 찾을 수 없습니다")
                         
                     elif status == 'failed':
                         error_msg = task_data.get('task_status_msg', '알 수 없는 오류')
                         logger.error(f"비디오 생성 실패: {error_msg}")
-                        raise Exception(f"동영상 생성 실패: {error_msg}")
+                        raise KlingAITaskError(f"동영상 생성 실패: {error_msg}")
                     
                     elif status in ['submitted', 'processing']:
                         # 아직 처리 중
@@ -368,6 +483,8 @@ class KlingAIVideoGenerator:
                         logger.warning(f"알 수 없는 상태: {status}")
                         await asyncio.sleep(check_interval)
                         
+            except KlingAITaskError:
+                raise
             except Exception as e:
                 logger.error(f"상태 확인 중 오류: {str(e)}")
                 # 네트워크 오류 등은 재시도
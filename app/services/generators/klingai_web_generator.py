@@ -3,10 +3,13 @@ import asyncio
 import logging
 from datetime import datetime
 import time
-from playwright.async_api import async_playwright
 import requests
 from urllib.parse import urljoin, urlparse
 import aiofiles
+from ..tracing import span, mark_error, set_attribute
+from .selector_cache import get_selector_cache
+from .resource_policy import ResourcePolicy
+from .session_recorder import SessionRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +21,26 @@ class KlingAIWebGenerator:
     def __init__(self):
         self.download_dir = os.path.join(os.path.dirname(__file__), '../../../../uploads/videos')
         os.makedirs(self.download_dir, exist_ok=True)
-        self.base_url = "https://klingai.com"
+        # 기록한 세션 재생이나 로컬 대체 서버 사용 시 변경
+        self.base_url = os.getenv('KLINGAI_WEB_URL', 'https://klingai.com').rstrip('/')
         self.headless = os.getenv('KLINGAI_WEB_HEADLESS', 'false').lower() == 'true'
+        # 페이지 이동 완료 기준 (networkidle은 추적/폴링 요청 때문에 오래 걸림)
+        self.wait_until = os.getenv('KLINGAI_WEB_WAIT_UNTIL', 'domcontentloaded')
+        
+        # 선택자 순위 캐시 (지난번에 찾은 버튼을 DOM 전체 탐색 없이 바로 클릭)
+        self.selectors = get_selector_cache()
+        # 세션 기록(HAR + DOM 스냅샷)/재생
+        self.recorder = SessionRecorder.from_env('klingai_web')
+        # 설정을 마친 뒤 수동 생성을 위해 브라우저를 열어 둘 시간(초)
+        self.manual_wait_seconds = float(os.getenv('KLINGAI_WEB_MANUAL_WAIT_SECONDS', 120))
+        
+        # 동시에 띄울 브라우저 수 (초과분은 스케줄러에서 대기)
+        self.max_concurrent_tasks = max(1, int(os.getenv('KLINGAI_WEB_MAX_CONCURRENT', 1)))
+        self.requests_per_minute = float(os.getenv('KLINGAI_WEB_RATE_PER_MINUTE', 4))
+        # 동영상 1개당 비용 (크레딧, 라우팅 시 VIDEO_ROUTING_COST_WEIGHT와 함께 사용)
+        self.cost_per_video = float(os.getenv('KLINGAI_WEB_COST', 0))
+        # 생성 설정까지만 하고 동영상 파일은 만들지 않음 (지연 시간 기반 라우팅/헤지 대상에서 제외)
+        self.produces_video = False
         
         # 로그인 정보 (환경변수에서)
         self.email = os.getenv('KLINGAI_EMAIL')
@@ -38,34 +59,56 @@ class KlingAIWebGenerator:
                 'error': 'KlingAI 웹 로그인 정보가 설정되지 않았습니다. .env에 KLINGAI_EMAIL, KLINGAI_PASSWORD를 추가하세요.'
             }
         
+        with span('klingai_web.generate_video', mode=mode, duration=duration, prompt_length=len(prompt)):
+            result = await self._generate_video_in_browser(image_path, prompt, negative_prompt, mode, duration, output_count)
+            if result.get('status') != 'success':
+                mark_error(result.get('error', '알 수 없는 오류'))
+            return result
+    
+    async def _generate_video_in_browser(self, image_path, prompt, negative_prompt, mode, duration, output_count):
+        """브라우저를 띄워 단계별로 설정 진행 (단계마다 trace span 기록)"""
         try:
+            from playwright.async_api import async_playwright
+            
             async with async_playwright() as p:
-                # 브라우저 실행
-                browser = await p.chromium.launch(
-                    headless=self.headless,
-                    args=[
-                        '--no-sandbox', 
-                        '--disable-setuid-sandbox',
-                        '--disable-web-security',
-                        '--disable-features=VizDisplayCompositor'
-                    ]
-                )
-                
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                )
-                
-                page = await context.new_page()
-                
+                with span('klingai_web.launch_browser', headless=self.headless):
+                    # 브라우저 실행
+                    browser = await p.chromium.launch(
+                        headless=self.headless,
+                        args=[
+                            '--no-sandbox', 
+                            '--disable-setuid-sandbox',
+                            '--disable-web-security',
+                            '--disable-features=VizDisplayCompositor'
+                        ]
+                    )
+                    
+                    session_options = self.recorder.launch_options('web')
+                    context = await browser.new_context(
+                        viewport={'width': 1920, 'height': 1080},
+                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                        service_workers='block',  # 서비스 워커가 요청 차단 정책을 우회하지 않도록
+                        **session_options
+                    )
+                    
+                    # 글꼴/미디어/추적 스크립트 요청 차단
+                    policy = ResourcePolicy.from_env('klingai_web')
+                    await policy.install(context)
+                    # 재생 모드의 HAR 라우팅은 차단 정책보다 나중에 등록해야 먼저 적용됨
+                    await self.recorder.attach(context, session_options)
+                    
+                    page = await context.new_page()
+                    
                 # 브라우저 콘솔 로그 출력
                 page.on('console', lambda msg: logger.info(f"🌐 브라우저: {msg.text}"))
                 
                 try:
-                    # 1. KlingAI 메인 페이지로 이동
-                    logger.info("🌐 KlingAI 웹사이트 접속 중...")
-                    await page.goto(f"{self.base_url}/global/", wait_until='networkidle')
-                    await page.wait_for_timeout(5000)
+                    with span('klingai_web.navigate'):
+                        # 1. KlingAI 메인 페이지로 이동
+                        logger.info("🌐 KlingAI 웹사이트 접속 중...")
+                        await page.goto(f"{self.base_url}/global/", wait_until=self.wait_until)
+                        await self._wait_for_app_ready(page)
+                    await self.recorder.snapshot(page, 'navigate')
                     
                     # 현재 페이지 정보 출력
                     current_url = page.url
@@ -75,35 +118,48 @@ class KlingAIWebGenerator:
                     
                     # 2. 로그인 확인 및 로그인
                     logger.info("🔐 로그인 상태 확인...")
-                    login_success = await self._handle_login(page)
-                    if not login_success:
-                        raise Exception("로그인 실패")
+                    with span('klingai_web.login'):
+                        login_success = await self._handle_login(page)
+                        if not login_success:
+                            raise Exception("로그인 실패")
+                    await self.recorder.snapshot(page, 'login')
                     
                     # 3. Create 버튼 찾기 및 클릭 (개선된 방법)
                     logger.info("🎬 Create 버튼 찾기 시작...")
-                    create_success = await self._find_and_click_create_button(page)
-                    if not create_success:
-                        raise Exception("Create 버튼을 찾을 수 없습니다")
+                    with span('klingai_web.create_button'):
+                        create_success = await self._find_and_click_create_button(page)
+                        if not create_success:
+                            raise Exception("Create 버튼을 찾을 수 없습니다")
+                    await self.recorder.snapshot(page, 'create_button')
                     
                     # 4. Video 옵션 선택 (개선된 방법)
                     logger.info("📹 Video 옵션 선택...")
-                    video_success = await self._select_video_option(page)
-                    if not video_success:
-                        raise Exception("Video 옵션을 찾을 수 없습니다")
+                    with span('klingai_web.video_option'):
+                        video_success = await self._select_video_option(page)
+                        if not video_success:
+                            raise Exception("Video 옵션을 찾을 수 없습니다")
+                    await self.recorder.snapshot(page, 'video_option')
                     
                     # 5. Image to Video 탭 선택 확인
                     logger.info("📹 Image to Video 탭 확인...")
-                    await self._select_image_to_video_tab(page)
+                    with span('klingai_web.image_to_video_tab'):
+                        await self._select_image_to_video_tab(page)
+                    await self.recorder.snapshot(page, 'image_to_video_tab')
                     
                     # 6. 이미지 업로드
                     logger.info("📸 이미지 업로드 중...")
-                    upload_success = await self._upload_image_to_kling(page, image_path)
-                    if not upload_success:
-                        logger.warning("⚠️ 이미지 업로드 실패, 수동으로 업로드해주세요.")
+                    with span('klingai_web.upload_image'):
+                        upload_success = await self._upload_image_to_kling(page, image_path)
+                        if not upload_success:
+                            logger.warning("⚠️ 이미지 업로드 실패, 수동으로 업로드해주세요.")
+                            mark_error('이미지 업로드 실패')
+                    await self.recorder.snapshot(page, 'upload_image')
                     
                     # 7. 프롬프트 입력
                     logger.info("✏️ 프롬프트 설정 중...")
-                    await self._set_kling_prompts(page, prompt, negative_prompt)
+                    with span('klingai_web.set_prompts'):
+                        await self._set_kling_prompts(page, prompt, negative_prompt)
+                    await self.recorder.snapshot(page, 'set_prompts')
                     
                     # 🛑 Generate 버튼은 누르지 않음 - 설정까지만 진행
                     logger.info("⏸️ 모든 설정 완료! Generate 버튼을 누르지 않고 대기...")
@@ -111,8 +167,9 @@ class KlingAIWebGenerator:
                     logger.info("🎬 수동으로 Generate 버튼을 눌러 비디오를 생성할 수 있습니다.")
                     
                     # 브라우저를 열어둔 상태로 대기
-                    logger.info("⏳ 120초 동안 브라우저를 열어둡니다...")
-                    await page.wait_for_timeout(120000)  # 2분 대기
+                    logger.info(f"⏳ {self.manual_wait_seconds:.0f}초 동안 브라우저를 열어둡니다...")
+                    with span('klingai_web.manual_wait'):
+                        await page.wait_for_timeout(self.manual_wait_seconds * 1000)
                     
                     # 성공 응답 반환
                     return {
@@ -129,7 +186,14 @@ class KlingAIWebGenerator:
                         'note': 'Generate 버튼을 누르지 않고 설정까지만 완료됨'
                     }
                     
+                except Exception:
+                    await self.recorder.snapshot(page, 'error')
+                    raise
+                    
                 finally:
+                    set_attribute('requests_blocked', policy.stats()['blocked'])
+                    # 기록 중인 HAR는 컨텍스트를 닫을 때 저장됨
+                    await context.close()
                     await browser.close()
                     logger.info("🔄 브라우저가 닫혔습니다.")
                     
@@ -196,10 +260,9 @@ class KlingAIWebGenerator:
         try:
             current_url = page.url
             
-            # 충분한 대기 시간
+            # Create 텍스트가 렌더링될 때까지 대기 (networkidle 대신)
             logger.info("⏳ 페이지 로딩 완료 대기...")
-            await page.wait_for_load_state('networkidle')
-            await page.wait_for_timeout(5000)
+            await self._wait_for_app_ready(page, text='create')
             
             # 페이지 내용 확인
             page_text = await page.text_content('body')
@@ -210,8 +273,13 @@ class KlingAIWebGenerator:
             
             logger.info("🎯 Create 버튼 찾기...")
             
-            # JavaScript로 정확한 Create 버튼 찾기
-            create_success = await page.evaluate("""
+            # 지난번에 성공한 선택자로 먼저 시도
+            learned_selectors = self.selectors.known('klingai_web', 'create_button')
+            create_selector = await self._click_learned_selector(page, learned_selectors)
+            self.selectors.record('klingai_web', 'create_button', learned_selectors, create_selector)
+            
+            # 실패하면 JavaScript로 DOM 전체에서 Create 버튼 찾기 (찾은 요소의 태그/텍스트 반환)
+            create_success = create_selector or await page.evaluate("""
                 () => {
                     console.log('🎯 Create 버튼 찾기 시작...');
                     
@@ -229,7 +297,7 @@ class KlingAIWebGenerator:
                             el.scrollIntoView({ behavior: 'smooth', block: 'center' });
                             el.click();
                             console.log('Create 버튼 클릭 완료');
-                            return true;
+                            return { tag: el.tagName.toLowerCase(), text: text };
                         }
                     }
                     
@@ -246,7 +314,7 @@ class KlingAIWebGenerator:
                             el.scrollIntoView({ behavior: 'smooth', block: 'center' });
                             el.click();
                             console.log('Create 포함 버튼 클릭 완료');
-                            return true;
+                            return { tag: el.tagName.toLowerCase(), text: text };
                         }
                     }
                     
@@ -255,6 +323,11 @@ class KlingAIWebGenerator:
                 }
             """)
             
+            if isinstance(create_success, dict):
+                # 다음 실행부터는 이 선택자를 먼저 시도
+                found_selector = self._text_selector(create_success['tag'], create_success['text'])
+                self.selectors.record('klingai_web', 'create_button', learned_selectors + [found_selector], found_selector)
+            
             if create_success:
                 logger.info("✅ Create 버튼 클릭 성공!")
                 await page.wait_for_timeout(5000)
@@ -289,6 +362,47 @@ class KlingAIWebGenerator:
             logger.error(f"Create 버튼 처리 중 오류: {str(e)}")
             return False
     
+    async def _wait_for_app_ready(self, page, text=None, timeout=15000):
+        """
+        페이지 앱이 렌더링될 때까지 대기
+        
+        버튼/링크가 그려지고 (text가 있으면 본문에 해당 텍스트가 나타나면) 바로 진행합니다.
+        시간이 초과되어도 예외 없이 계속 진행합니다.
+        """
+        try:
+            await page.wait_for_function(
+                """(text) => {
+                    if (!document.body || document.querySelectorAll('button, a').length < 3) return false;
+                    return !text || document.body.innerText.toLowerCase().includes(text);
+                }""",
+                arg=text,
+                timeout=timeout
+            )
+            await page.wait_for_timeout(1000)
+        except Exception:
+            logger.warning(f"⚠️ 페이지 렌더링 대기 시간 초과 ({timeout / 1000:.0f}초), 계속 진행")
+    
+    @staticmethod
+    def _text_selector(tag, text):
+        """태그와 정확한 텍스트로 Playwright 선택자 생성"""
+        escaped = text.replace('\\', '\\\\').replace('"', '\\"')
+        return f'{tag}:text-is("{escaped}")'
+    
+    async def _click_learned_selector(self, page, selectors):
+        """저장된 선택자 중 보이는 요소를 찾아 클릭하고, 클릭한 선택자 반환 (없으면 None)"""
+        for selector in selectors:
+            try:
+                element = page.locator(selector).first
+                if not await element.is_visible():
+                    continue
+                await element.scroll_into_view_if_needed()
+                await element.click(timeout=5000)
+                logger.info(f"✅ 저장된 선택자로 클릭: {selector}")
+                return selector
+            except Exception as e:
+                logger.debug(f"저장된 선택자 '{selector}' 클릭 실패: {e}")
+        return None
+    
     async def _select_video_option(self, page):
         """Video 옵션 선택 - 개선된 방법"""
         try:
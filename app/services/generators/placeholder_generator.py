@@ -1,10 +1,53 @@
 import os
+import threading
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 비율별 이미지 크기
+SIZES = {
+    "9:16": (720, 1280),
+    "16:9": (1280, 720),
+    "1:1": (1024, 1024),
+    "4:3": (1024, 768),
+    "3:4": (768, 1024)
+}
+
+TITLE = "AI Generated Placeholder"
+
+
+@lru_cache(maxsize=None)
+def _load_fonts():
+    """제목/본문 폰트 (TrueType 파일은 프로세스당 한 번만 로드)"""
+    try:
+        # 시스템 폰트 사용 시도
+        return ImageFont.truetype("arial.ttf", 48), ImageFont.truetype("arial.ttf", 24)
+    except OSError:
+        # 기본 폰트 사용
+        return ImageFont.load_default(), ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def _text_width(text, font):
+    """텍스트 너비 (줄바꿈 계산에서 같은 단어 조합을 반복 측정하므로 메모이즈)"""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+
+def _gradient_background(width, height):
+    """
+    세로 그라데이션 배경 (행마다 draw.line을 호출하던 방식과 같은 색)
+
+    행별 밝기를 1픽셀 너비 열로 만든 뒤 가로로 늘려 한 번에 채웁니다.
+    """
+    column = Image.frombytes('L', (1, height), bytes(int(60 + (i / height) * 40) for i in range(height)))
+    gray = column.resize((width, height), Image.Resampling.NEAREST)
+    return Image.merge('RGB', (gray, gray, gray.point(lambda value: value + 10)))
+
+
 class PlaceholderGenerator:
     """
     개발/테스트용 플레이스홀더 이미지 생성기
@@ -13,6 +56,36 @@ class PlaceholderGenerator:
     def __init__(self):
         self.download_dir = os.path.join(os.path.dirname(__file__), '../../../../uploads/images')
         os.makedirs(self.download_dir, exist_ok=True)
+        # PNG 압축 수준 (0-9, 낮을수록 빠르고 파일이 큼)
+        self.compress_level = int(os.getenv('PLACEHOLDER_PNG_COMPRESS_LEVEL', '1'))
+        # 비율별 정적 레이어 (배경 + 제목 + 크기 정보), 요청마다 복사해서 사용
+        self._layers = {}
+        self._layers_lock = threading.Lock()
+    
+    def _static_layer(self, aspect_ratio):
+        """프롬프트/시각과 무관한 부분을 비율별로 한 번만 그린 이미지"""
+        layer = self._layers.get(aspect_ratio)
+        if layer is not None:
+            return layer
+        
+        width, height = SIZES.get(aspect_ratio, (1024, 1024))
+        title_font, text_font = _load_fonts()
+        
+        layer = _gradient_background(width, height)
+        draw = ImageDraw.Draw(layer)
+        
+        # 제목
+        draw.text(((width - _text_width(TITLE, title_font)) // 2, height // 4), TITLE, font=title_font, fill=(255, 255, 255))
+        
+        # 하단에 정보 추가
+        info_text = f"Size: {width}x{height} | Ratio: {aspect_ratio}"
+        draw.text(((width - _text_width(info_text, text_font)) // 2, height - 60), info_text, font=text_font, fill=(150, 150, 150))
+        
+        # 임의의 비율 문자열로 캐시가 커지지 않도록 알려진 비율만 저장
+        if aspect_ratio not in SIZES:
+            return layer
+        with self._layers_lock:
+            return self._layers.setdefault(aspect_ratio, layer)
     
     async def generate_image(self, prompt, aspect_ratio="9:16"):
         """
@@ -26,42 +99,10 @@ class PlaceholderGenerator:
             dict: 생성된 이미지 정보
         """
         try:
-            # 비율에 따른 이미지 크기 설정
-            sizes = {
-                "9:16": (720, 1280),
-                "16:9": (1280, 720),
-                "1:1": (1024, 1024),
-                "4:3": (1024, 768),
-                "3:4": (768, 1024)
-            }
-            
-            width, height = sizes.get(aspect_ratio, (1024, 1024))
-            
-            # 이미지 생성
-            image = Image.new('RGB', (width, height), color=(60, 60, 60))
+            image = self._static_layer(aspect_ratio).copy()
+            width, height = image.size
             draw = ImageDraw.Draw(image)
-            
-            # 배경 그라데이션 효과
-            for i in range(height):
-                color = int(60 + (i / height) * 40)
-                draw.line([(0, i), (width, i)], fill=(color, color, color + 10))
-            
-            # 텍스트 추가
-            try:
-                # 시스템 폰트 사용 시도
-                title_font = ImageFont.truetype("arial.ttf", 48)
-                text_font = ImageFont.truetype("arial.ttf", 24)
-            except:
-                # 기본 폰트 사용
-                title_font = ImageFont.load_default()
-                text_font = ImageFont.load_default()
-            
-            # 제목
-            title = "AI Generated Placeholder"
-            title_bbox = draw.textbbox((0, 0), title, font=title_font)
-            title_width = title_bbox[2] - title_bbox[0]
-            title_x = (width - title_width) // 2
-            draw.text((title_x, height // 4), title, font=title_font, fill=(255, 255, 255))
+            _, text_font = _load_fonts()
             
             # 프롬프트 표시 (줄바꿈 처리)
             prompt_lines = []
@@ -71,8 +112,7 @@ class PlaceholderGenerator:
             
             for word in words:
                 test_line = f"{current_line} {word}".strip()
-                bbox = draw.textbbox((0, 0), test_line, font=text_font)
-                if bbox[2] - bbox[0] <= max_width:
+                if _text_width(test_line, text_font) <= max_width:
                     current_line = test_line
                 else:
                     if current_line:
@@ -85,30 +125,20 @@ class PlaceholderGenerator:
             # 프롬프트 텍스트 그리기
             y_offset = height // 2
             for line in prompt_lines[:5]:  # 최대 5줄까지만 표시
-                bbox = draw.textbbox((0, 0), line, font=text_font)
-                line_width = bbox[2] - bbox[0]
-                x = (width - line_width) // 2
+                x = (width - _text_width(line, text_font)) // 2
                 draw.text((x, y_offset), line, font=text_font, fill=(200, 200, 200))
                 y_offset += 30
             
-            # 하단에 정보 추가
-            info_text = f"Size: {width}x{height} | Ratio: {aspect_ratio}"
-            info_bbox = draw.textbbox((0, 0), info_text, font=text_font)
-            info_width = info_bbox[2] - info_bbox[0]
-            draw.text(((width - info_width) // 2, height - 60), info_text, font=text_font, fill=(150, 150, 150))
-            
             # 타임스탬프
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            ts_bbox = draw.textbbox((0, 0), timestamp, font=text_font)
-            ts_width = ts_bbox[2] - ts_bbox[0]
-            draw.text(((width - ts_width) // 2, height - 30), timestamp, font=text_font, fill=(150, 150, 150))
+            draw.text(((width - _text_width(timestamp, text_font)) // 2, height - 30), timestamp, font=text_font, fill=(150, 150, 150))
             
             # 파일 저장
-            timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             filename = f"placeholder_{timestamp_file}.png"
             filepath = os.path.join(self.download_dir, filename)
             
-            image.save(filepath, 'PNG')
+            image.save(filepath, 'PNG', compress_level=self.compress_level)
             
             logger.info(f"플레이스홀더 이미지 생성 완료: {filename}")
             
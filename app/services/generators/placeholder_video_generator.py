@@ -3,6 +3,7 @@ from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
 import logging
 import shutil
+from ..retention_service import get_debug_dir
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,7 @@ class PlaceholderVideoGenerator:
         self.download_dir = os.path.join(os.path.dirname(__file__), '../../../../uploads/videos')
         os.makedirs(self.download_dir, exist_ok=True)
     
-    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5):
+    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5, output_count=1):
         """
         플레이스홀더 비디오를 생성합니다 (실제로는 GIF 애니메이션)
         
@@ -26,6 +27,7 @@ class PlaceholderVideoGenerator:
             cfg_scale (float): Creativity Scale
             mode (str): 생성 모드
             duration (int): 동영상 길이
+            output_count (int): 통합 인터페이스 호환용 (항상 1개 생성)
             
         Returns:
             dict: 생성된 동영상 정보
@@ -92,7 +94,7 @@ class PlaceholderVideoGenerator:
                 frames.append(frame)
             
             # GIF로 저장
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             filename = f"test_video_{timestamp}.gif"
             filepath = os.path.join(self.download_dir, filename)
             
@@ -110,8 +112,8 @@ class PlaceholderVideoGenerator:
             mp4_filename = filename.replace('.gif', '_test.mp4')
             mp4_filepath = filepath.replace('.gif', '_test.mp4')
             
-            # 참고용 텍스트 파일 생성
-            info_path = filepath.replace('.gif', '_info.txt')
+            # 참고용 텍스트 파일 생성 (미디어 폴더가 아닌 디버그 트리에 저장)
+            info_path = os.path.join(get_debug_dir('placeholder_info'), filename.replace('.gif', '_info.txt'))
             with open(info_path, 'w', encoding='utf-8') as f:
                 f.write(f"Test Video Information\n")
                 f.write(f"===================\n")
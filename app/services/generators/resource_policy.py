@@ -0,0 +1,139 @@
+import os
+import threading
+import logging
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# 결과물과 관계없는 광고/분석/추적 도메인 (하위 도메인 포함)
+DEFAULT_BLOCKED_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'connect.facebook.net',
+    'hotjar.com',
+    'clarity.ms',
+    'sentry.io',
+    'segment.io',
+    'mixpanel.com',
+    'amplitude.com',
+    'tiktok.com',
+    'analytics.tiktok.com',
+)
+
+# 사이트별 자체 도메인 (BROWSER_BLOCK_THIRD_PARTY=true일 때 이 도메인만 허용)
+FIRST_PARTY_DOMAINS = {
+    'imagefx': (
+        'withgoogle.com', 'google.com', 'googleapis.com', 'gstatic.com',
+        'googleusercontent.com', 'labs.google'
+    ),
+    'klingai_web': (
+        'klingai.com', 'kling.ai', 'klingai.kuaishou.com', 'kuaishou.com', 'kwai.net', 'kwaicdn.com'
+    )
+}
+
+# 글꼴과 동영상/오디오는 자동화에 필요 없으므로 기본 차단 (이미지는 결과 확인에 쓰이므로 허용)
+DEFAULT_BLOCKED_TYPES = 'font,media'
+
+
+def _split_env(name, default=''):
+    return [item.strip().lower() for item in os.getenv(name, default).split(',') if item.strip()]
+
+
+def _matches(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class ResourcePolicy:
+    """
+    브라우저 요청 차단 정책
+
+    page.route로 불필요한 리소스 종류(글꼴, 미디어 등)와 추적 도메인 요청을 중단해
+    페이지 로드 시간과 브라우저당 메모리를 줄입니다.
+    """
+
+    def __init__(self, site, blocked_types=(), blocked_domains=(), first_party_domains=None, enabled=True):
+        self.site = site
+        self.enabled = enabled
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        # None이면 제3자 도메인을 차단하지 않음
+        self.first_party_domains = tuple(first_party_domains) if first_party_domains is not None else None
+        self.blocked_count = 0
+        self.allowed_count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, site):
+        """
+        환경변수로 정책 생성
+
+        BROWSER_REQUEST_BLOCKING: 차단 사용 여부 (기본 true)
+        BROWSER_BLOCK_RESOURCE_TYPES: 차단할 리소스 종류 (기본 font,media / image, stylesheet 등 추가 가능)
+        BROWSER_BLOCK_DOMAINS: 기본 추적 도메인 외에 추가로 차단할 도메인
+        BROWSER_BLOCK_THIRD_PARTY: true면 사이트 자체 도메인 외의 요청을 모두 차단
+        """
+        enabled = os.getenv('BROWSER_REQUEST_BLOCKING', 'true').lower() == 'true'
+        strict = os.getenv('BROWSER_BLOCK_THIRD_PARTY', 'false').lower() == 'true'
+        return cls(
+            site,
+            blocked_types=_split_env('BROWSER_BLOCK_RESOURCE_TYPES', DEFAULT_BLOCKED_TYPES),
+            blocked_domains=DEFAULT_BLOCKED_DOMAINS + tuple(_split_env('BROWSER_BLOCK_DOMAINS')),
+            first_party_domains=FIRST_PARTY_DOMAINS.get(site, ()) if strict else None,
+            enabled=enabled
+        )
+
+    def should_block(self, url, resource_type):
+        """차단 사유 반환 (허용이면 None)"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return None
+
+        # 페이지 자체(문서)는 항상 허용 - 로그인 리다이렉트 등
+        if resource_type == 'document':
+            return None
+
+        if resource_type in self.blocked_types:
+            return f'type:{resource_type}'
+
+        host = (parsed.hostname or '').lower()
+        if _matches(host, self.blocked_domains):
+            return f'domain:{host}'
+        if self.first_party_domains is not None and not _matches(host, self.first_party_domains):
+            return f'third_party:{host}'
+        return None
+
+    async def install(self, target):
+        """BrowserContext 또는 Page에 라우팅 규칙 등록"""
+        if not self.enabled:
+            return
+        await target.route('**/*', self._handle)
+        logger.info(
+            f"🚫 요청 차단 정책 적용 ({self.site}): 리소스 {sorted(self.blocked_types) or '-'}, "
+            f"제3자 도메인 {'차단' if self.first_party_domains is not None else '추적 도메인만 차단'}"
+        )
+
+    async def _handle(self, route):
+        request = route.request
+        reason = self.should_block(request.url, request.resource_type)
+        with self._lock:
+            if reason:
+                self.blocked_count += 1
+            else:
+                self.allowed_count += 1
+
+        try:
+            if reason:
+                await route.abort('blockedbyclient')
+            else:
+                await route.continue_()
+        except Exception as e:
+            # 페이지가 닫히는 중이면 라우팅 처리 실패는 무시
+            logger.debug(f"요청 라우팅 처리 실패 ({request.url[:80]}): {e}")
+
+    def stats(self):
+        with self._lock:
+            return {'blocked': self.blocked_count, 'allowed': self.allowed_count}
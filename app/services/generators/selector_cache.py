@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import threading
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorCache:
+    """
+    사이트별 선택자 순위 캐시
+
+    후보 선택자 목록을 매번 처음부터 시도하지 않도록, 마지막으로 성공한 선택자를 먼저 시도하고
+    그보다 앞에서 실패한 선택자는 뒤로 미룹니다. 순위는 JSON 파일에 저장되어 재시작 후에도 유지됩니다.
+
+    항목별 기록: {'hits': 성공 횟수, 'misses': 마지막 성공 이후 연속 실패 횟수, 'last_hit': 마지막 성공 시각}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"선택자 캐시를 읽지 못했습니다 ({self.path}): {e}")
+            return {}
+
+    def _save(self):
+        """임시 파일에 쓴 뒤 교체 (여러 워커가 동시에 저장해도 파일이 깨지지 않도록)"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"선택자 캐시 저장 실패: {e}")
+
+    def rank(self, site, key, selectors):
+        """
+        선택자를 시도할 순서로 정렬
+
+        마지막 성공 이후 실패가 없는 선택자(최근 성공 순) → 기록 없는 선택자(원래 순서) →
+        실패가 누적된 선택자(실패가 적고 성공이 많은 순) 순서로 반환합니다.
+        """
+        with self._lock:
+            stats = self._data.get(site, {}).get(key, {})
+
+        def sort_key(item):
+            index, selector = item
+            entry = stats.get(selector)
+            if not entry:
+                return (1, 0, 0, index)
+            if entry['hits'] and not entry['misses']:
+                return (0, 0, -entry['last_hit'], index)
+            return (2, entry['misses'], -entry['hits'], index)
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=sort_key)]
+
+    def known(self, site, key):
+        """한 번 이상 성공한 적 있는 선택자 (시도할 순서대로)"""
+        with self._lock:
+            stats = self._data.get(site, {}).get(key, {})
+            selectors = [selector for selector, entry in stats.items() if entry['hits']]
+        return self.rank(site, key, selectors)
+
+    def record(self, site, key, tried, winner):
+        """
+        탐색 결과 기록
+
+        Args:
+            tried (list): rank()가 반환한 시도 순서
+            winner (str): 요소를 찾은 선택자 (None이면 아무것도 기록하지 않음 -
+                아직 요소가 나타나지 않은 경우까지 실패로 세지 않도록)
+        """
+        if winner is None:
+            return
+
+        with self._lock:
+            stats = self._data.setdefault(site, {}).setdefault(key, {})
+            for selector in tried:
+                entry = stats.setdefault(selector, {'hits': 0, 'misses': 0, 'last_hit': 0})
+                if selector == winner:
+                    entry['hits'] += 1
+                    entry['misses'] = 0
+                    entry['last_hit'] = time.time()
+                    break
+                entry['misses'] += 1
+
+            if tried and tried[0] != winner:
+                logger.info(f"🔀 선택자 순위 갱신 ({site}/{key}): '{winner}' 우선 시도")
+            self._save()
+
+    def to_dict(self):
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_selector_cache(path=None):
+    """파일 경로별 공용 선택자 캐시 반환"""
+    path = path or Config.SELECTOR_CACHE_PATH
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = SelectorCache(path)
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,130 @@
+import os
+import re
+import json
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+HAR_FILENAME = 'session.har'
+MANIFEST_FILENAME = 'manifest.json'
+SNAPSHOT_DIRNAME = 'snapshots'
+
+
+def _safe_name(value):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', value).strip('_') or 'step'
+
+
+class SessionRecorder:
+    """
+    브라우저 세션 기록/재생
+
+    기록 모드(BROWSER_RECORD_DIR): 브라우저 컨텍스트마다 <BROWSER_RECORD_DIR>/<site>/<시각>-<label>/ 폴더에
+    네트워크 요청 전체(session.har)와 단계별 DOM 스냅샷(snapshots/*.html, manifest.json)을 저장합니다.
+
+    재생 모드(<SITE>_REPLAY_SESSION, 예: IMAGEFX_REPLAY_SESSION): 기록한 세션 폴더의 HAR로 모든 요청에
+    응답하므로 실제 사이트에 접속하지 않고 같은 자동화 흐름을 반복 실행할 수 있습니다 (지연 측정, 선택자 변경 확인).
+    HAR에 없는 요청은 BROWSER_REPLAY_NOT_FOUND에 따라 차단(abort, 기본)하거나 네트워크로 보냅니다(fallback).
+    """
+
+    def __init__(self, site, record_dir=None, replay_session=None, not_found='abort'):
+        self.site = site
+        self.record_dir = record_dir or None
+        self.replay_session = replay_session or None
+        self.not_found = not_found
+        self._lock = threading.Lock()
+        self._sessions = {}  # 기록 중인 컨텍스트 → 세션 폴더
+
+        if self.record_dir and self.replay_session:
+            logger.warning(f"세션 기록과 재생이 함께 지정되어 재생만 사용합니다 ({site})")
+            self.record_dir = None
+
+    @classmethod
+    def from_env(cls, site):
+        return cls(
+            site,
+            record_dir=os.getenv('BROWSER_RECORD_DIR', ''),
+            replay_session=os.getenv(f'{site.upper()}_REPLAY_SESSION', ''),
+            not_found=os.getenv('BROWSER_REPLAY_NOT_FOUND', 'abort')
+        )
+
+    @property
+    def mode(self):
+        if self.replay_session:
+            return 'replay'
+        if self.record_dir:
+            return 'record'
+        return None
+
+    def launch_options(self, label):
+        """
+        브라우저 컨텍스트 생성 옵션 (기록 모드면 새 세션 폴더를 만들고 HAR 기록 경로 지정)
+
+        Args:
+            label (str): 세션 폴더 이름에 붙일 구분자 (예: 'slot0')
+        """
+        if self.mode != 'record':
+            return {}
+
+        session_dir = os.path.join(self.record_dir, self.site, f"{time.strftime('%Y%m%d-%H%M%S')}-{_safe_name(label)}")
+        os.makedirs(os.path.join(session_dir, SNAPSHOT_DIRNAME), exist_ok=True)
+        self._write_manifest(session_dir, {
+            'site': self.site,
+            'label': label,
+            'created_at': time.time(),
+            'har': HAR_FILENAME,
+            'snapshots': []
+        })
+        logger.info(f"⏺️ 브라우저 세션 기록 시작 ({self.site}): {session_dir}")
+        # HAR는 컨텍스트를 닫을 때 파일로 저장됨
+        return {'record_har_path': os.path.join(session_dir, HAR_FILENAME), 'record_har_content': 'embed'}
+
+    async def attach(self, context, options):
+        """
+        생성한 컨텍스트에 기록/재생 설정 적용
+
+        Args:
+            options (dict): 같은 컨텍스트를 만들 때 사용한 launch_options() 반환값
+        """
+        if self.mode == 'replay':
+            har_path = os.path.join(self.replay_session, HAR_FILENAME)
+            await context.route_from_har(har_path, not_found=self.not_found)
+            logger.info(f"⏯️ 기록된 세션으로 재생 ({self.site}): {self.replay_session}")
+        elif options.get('record_har_path'):
+            self._sessions[context] = os.path.dirname(options['record_har_path'])
+            context.on('close', lambda _: self._sessions.pop(context, None))
+
+    async def snapshot(self, page, step):
+        """기록 모드에서 현재 DOM을 단계 이름으로 저장 (실패해도 생성은 계속)"""
+        session_dir = self._sessions.get(page.context)
+        if session_dir is None:
+            return
+
+        try:
+            html = await page.content()
+            with self._lock:
+                manifest = self._read_manifest(session_dir)
+                index = len(manifest['snapshots']) + 1
+                filename = f"{index:03d}_{_safe_name(step)}.html"
+                with open(os.path.join(session_dir, SNAPSHOT_DIRNAME, filename), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                manifest['snapshots'].append({
+                    'step': step,
+                    'file': f"{SNAPSHOT_DIRNAME}/{filename}",
+                    'url': page.url,
+                    'time': time.time()
+                })
+                self._write_manifest(session_dir, manifest)
+        except Exception as e:
+            logger.debug(f"DOM 스냅샷 저장 실패 ({step}): {e}")
+
+    @staticmethod
+    def _read_manifest(session_dir):
+        with open(os.path.join(session_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_manifest(session_dir, manifest):
+        with open(os.path.join(session_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
@@ -1,6 +1,5 @@
 import os
 import asyncio
-from playwright.async_api import async_playwright
 from datetime import datetime
 import logging
 
@@ -19,6 +18,8 @@ class SimpleImageFXGenerator:
         try:
             logger.info(f"이미지 생성 시작: {prompt}")
             
+            from playwright.async_api import async_playwright
+            
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=False)
                 page = await browser.new_page()
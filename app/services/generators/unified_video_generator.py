@@ -1,4 +1,5 @@
 import os
+import time
 import asyncio
 import logging
 from enum import Enum
@@ -7,7 +8,12 @@ from typing import Optional, Dict, Any
 # 다양한 생성기 import
 from .klingai_generator import KlingAIVideoGenerator
 from .klingai_web_generator import KlingAIWebGenerator
+from .browser_worker_pool import isolate
 from .placeholder_video_generator import PlaceholderVideoGenerator
+from .backend_guard import AdaptiveTokenBucket, CircuitBreaker, is_rate_limited
+from .backend_stats import BackendStats, DEFAULT_LATENCY_SECONDS
+from ..progress_bus import report_progress
+from ..metrics import GENERATE_VIDEO_SECONDS, GENERATION_FAILURES, VIDEO_FALLBACKS
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +32,243 @@ class UnifiedVideoGenerator:
     def __init__(self, generator_type: VideoGeneratorType = VideoGeneratorType.AUTO):
         self.generator_type = generator_type
         self.generators = {}
+        
+        # 생성기별 동시 실행 제한 함수 (MediaService가 스케줄러의 run_with_limit을 연결)
+        self.concurrency_limiter = None
+        
         self._initialize_generators()
+        self._initialize_guards()
+        self._initialize_stats()
         self._select_default_generator()
     
+    def get_concurrency_limits(self):
+        """생성기별 동시 실행 가능 작업 수 (리소스 이름 → 제한)"""
+        return {
+            gen_type.value: getattr(generator, 'max_concurrent_tasks', None)
+            for gen_type, generator in self.generators.items()
+        }
+    
+    def _initialize_guards(self):
+        """생성기별 요청 속도 제한(토큰 버킷)과 서킷 브레이커 설정 (플레이스홀더 제외)"""
+        self.rate_limiters = {}
+        self.circuit_breakers = {}
+        
+        failure_threshold = int(os.getenv('VIDEO_CIRCUIT_FAILURE_THRESHOLD', 3))
+        recovery_seconds = float(os.getenv('VIDEO_CIRCUIT_RECOVERY_SECONDS', 60))
+        
+        for gen_type, generator in self.generators.items():
+            if gen_type == VideoGeneratorType.PLACEHOLDER:
+                continue
+            
+            rate = getattr(generator, 'requests_per_minute', None)
+            if rate:
+                self.rate_limiters[gen_type] = AdaptiveTokenBucket(rate)
+            self.circuit_breakers[gen_type] = CircuitBreaker(
+                gen_type.value,
+                failure_threshold=failure_threshold,
+                recovery_seconds=recovery_seconds
+            )
+    
+    def _initialize_stats(self):
+        """생성기별 최근 실행 통계와 라우팅 설정"""
+        self.backend_stats = {
+            gen_type: BackendStats(gen_type.value, concurrency=getattr(generator, 'max_concurrent_tasks', 1))
+            for gen_type, generator in self.generators.items()
+        }
+        
+        # 자동 선택 모드에서만 요청마다 예상 완료 시간이 가장 짧은 생성기로 라우팅
+        forced = os.getenv('VIDEO_GENERATOR_TYPE', 'auto').lower() not in ('', 'auto')
+        self.adaptive_routing = (
+            self.generator_type == VideoGeneratorType.AUTO
+            and not forced
+            and os.getenv('VIDEO_ROUTING', 'adaptive').lower() == 'adaptive'
+        )
+        # 생성 비용 1단위를 몇 초의 지연으로 환산할지 (0이면 지연 시간만 고려)
+        self.routing_cost_weight = float(os.getenv('VIDEO_ROUTING_COST_WEIGHT', 0))
+        
+        # 헤지 요청 (요청별 선택, 동시에 실행할 수 있는 헤지 수 제한)
+        self.max_concurrent_hedges = int(os.getenv('VIDEO_MAX_CONCURRENT_HEDGES', 2))
+        self.active_hedges = 0
+        self.hedge_stats = {'started': 0, 'won': 0, 'skipped': 0}
+    
+    def _expected_completion(self, gen_type):
+        """생성기의 예상 완료 시간(초)"""
+        return self.backend_stats[gen_type].expected_completion_seconds(
+            cost=getattr(self.generators[gen_type], 'cost_per_video', 0),
+            cost_weight=self.routing_cost_weight
+        )
+    
+    def _produces_video(self, gen_type):
+        """생성기가 실제 동영상 파일을 만드는지 (웹 생성기는 설정까지만 완료)"""
+        return getattr(self.generators[gen_type], 'produces_video', True)
+    
+    def _rank_backends(self, exclude=None):
+        """
+        사용 가능한 생성기를 예상 완료 시간 순으로 정렬
+        
+        동영상 파일을 만들지 않는 생성기(웹 생성기)는 소요 시간이 짧아 보여도 결과가 없으므로
+        예상 완료 시간으로 비교하지 않고 그 뒤에 둡니다.
+        플레이스홀더는 테스트용이므로 실제 생성기가 모두 불가능할 때만 마지막에 포함합니다.
+        """
+        candidates = [
+            gen_type for gen_type in self.generators
+            if gen_type != VideoGeneratorType.PLACEHOLDER and gen_type != exclude and self._is_available(gen_type)
+        ]
+        ranked = sorted(
+            (gen_type for gen_type in candidates if self._produces_video(gen_type)),
+            key=self._expected_completion
+        )
+        ranked.extend(gen_type for gen_type in candidates if not self._produces_video(gen_type))
+        
+        if VideoGeneratorType.PLACEHOLDER in self.generators and exclude != VideoGeneratorType.PLACEHOLDER:
+            ranked.append(VideoGeneratorType.PLACEHOLDER)
+        return ranked
+    
+    def _hedge_delay(self, gen_type):
+        """헤지를 시작하기까지 기다릴 시간 (주 생성기의 p90 소요 시간)"""
+        stats = self.backend_stats[gen_type].snapshot()
+        return stats['p90_seconds'] or DEFAULT_LATENCY_SECONDS.get(gen_type.value, 300.0)
+    
+    async def _generate_hedged(self, primary, **kwargs):
+        """
+        헤지 요청으로 비디오 생성
+        
+        주 생성기가 p90 소요 시간 안에 끝나지 않으면 다른 생성기로 같은 요청을 동시에 보내고,
+        먼저 성공한 결과를 사용하며 나머지는 취소합니다.
+        
+        Returns:
+            tuple: (결과를 낸 생성기, 결과)
+        """
+        primary_task = asyncio.ensure_future(self._run_generator(primary, **kwargs))
+        
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self._hedge_delay(primary))
+        except asyncio.CancelledError:
+            # asyncio.wait는 대기 중인 작업을 취소하지 않으므로 직접 취소
+            primary_task.cancel()
+            raise
+        if done:
+            return primary, primary_task.result()
+        
+        # 헤지는 실제 동영상 파일을 만드는 생성기로만 (설정만 하는 웹 생성기의 성공이 이기면 결과가 없음)
+        secondary = next(
+            (
+                gen_type for gen_type in self._rank_backends(exclude=primary)
+                if gen_type != VideoGeneratorType.PLACEHOLDER and self._produces_video(gen_type)
+            ),
+            None
+        )
+        if secondary is None or self.active_hedges >= self.max_concurrent_hedges:
+            self.hedge_stats['skipped'] += 1
+            return primary, await primary_task
+        
+        logger.info(f"🪁 {primary.value} 생성기가 p90 시간을 넘겨 {secondary.value} 생성기로 헤지 요청 시작")
+        self.active_hedges += 1
+        self.hedge_stats['started'] += 1
+        report_progress('video', None, f"{self._get_generator_display_name(secondary)}로 헤지 요청 시작", backend=secondary.value)
+        
+        hedge_task = asyncio.ensure_future(self._run_generator(secondary, **kwargs))
+        backends = {primary_task: primary, hedge_task: secondary}
+        pending = set(backends)
+        last = None
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        result = {'status': 'error', 'error': str(task.exception())}
+                    else:
+                        result = task.result()
+                    last = (backends[task], result)
+                    
+                    if result.get('status') == 'success' and os.path.exists(result.get('filepath') or ''):
+                        result['hedged'] = True
+                        if backends[task] == secondary:
+                            self.hedge_stats['won'] += 1
+                        logger.info(f"🏁 헤지 요청 완료: {backends[task].value} 생성기 결과 사용")
+                        return last
+            
+            return last
+        finally:
+            self.active_hedges -= 1
+            for task in pending:
+                task.cancel()
+    
+    def _is_available(self, gen_type):
+        """생성기가 초기화되어 있고 서킷이 열려 있지 않은지 확인"""
+        if gen_type not in self.generators:
+            return False
+        breaker = self.circuit_breakers.get(gen_type)
+        return breaker is None or breaker.is_available()
+    
+    async def _run_generator(self, gen_type, **kwargs):
+        """생성기 실행 (동시 실행 제한이 설정되어 있으면 슬롯 확보 후 실행)"""
+        stats = self.backend_stats[gen_type]
+        
+        # 대기 중인 요청도 예상 완료 시간에 반영되도록 슬롯 확보 전부터 집계
+        stats.begin()
+        try:
+            if self.concurrency_limiter is None:
+                return await self._run_guarded(gen_type, **kwargs)
+            
+            return await self.concurrency_limiter(
+                lambda: self._run_guarded(gen_type, **kwargs),
+                resource=gen_type.value
+            )
+        finally:
+            stats.end()
+    
+    async def _run_guarded(self, gen_type, **kwargs):
+        """서킷 브레이커와 토큰 버킷을 거쳐 생성기 실행 후 결과 기록"""
+        generator = self.generators[gen_type]
+        breaker = self.circuit_breakers.get(gen_type)
+        bucket = self.rate_limiters.get(gen_type)
+        
+        if breaker:
+            breaker.before_request()
+        
+        started = None
+        try:
+            if bucket:
+                await bucket.acquire()
+            started = time.monotonic()
+            report_progress('video', 0, f"{self._get_generator_display_name(gen_type)}로 비디오 생성 시작", backend=gen_type.value)
+            result = await generator.generate_video(**kwargs)
+        except asyncio.CancelledError:
+            if breaker:
+                breaker.on_cancel()
+            raise
+        except Exception:
+            if breaker:
+                breaker.on_failure()
+            if started is not None:
+                self.backend_stats[gen_type].record(False, time.monotonic() - started)
+                GENERATE_VIDEO_SECONDS.observe(time.monotonic() - started, backend=gen_type.value, status='error')
+            GENERATION_FAILURES.inc(operation='video', backend=gen_type.value)
+            raise
+        
+        elapsed = time.monotonic() - started
+        self.backend_stats[gen_type].record(result.get('status') == 'success', elapsed)
+        GENERATE_VIDEO_SECONDS.observe(elapsed, backend=gen_type.value, status=result.get('status', 'error'))
+        if result.get('status') != 'success':
+            GENERATION_FAILURES.inc(operation='video', backend=gen_type.value)
+        
+        rate_limited = is_rate_limited(result)
+        if result.get('status') == 'success':
+            report_progress('video', 100, '비디오 생성 완료', backend=gen_type.value)
+            if breaker:
+                breaker.on_success()
+            if bucket:
+                bucket.on_success()
+        else:
+            if breaker:
+                breaker.on_failure(rate_limited=rate_limited, retry_after=result.get('retry_after'))
+            if bucket and rate_limited:
+                bucket.on_rate_limited()
+        
+        return result
+    
     def _initialize_generators(self):
         """사용 가능한 생성기들 초기화"""
         
@@ -49,7 +289,7 @@ class UnifiedVideoGenerator:
         # KlingAI 웹 생성기 (Playwright)
         if klingai_email and klingai_password:
             try:
-                self.generators[VideoGeneratorType.KLINGAI_WEB] = KlingAIWebGenerator()
+                self.generators[VideoGeneratorType.KLINGAI_WEB] = isolate('klingai_web', KlingAIWebGenerator())
                 logger.info("✅ KlingAI 웹 생성기 초기화 완료")
             except Exception as e:
                 logger.warning(f"KlingAI 웹 생성기 초기화 실패: {e}")
@@ -107,7 +347,8 @@ class UnifiedVideoGenerator:
                            duration: int = 5,
                            output_count: int = 1,
                            generator_type: Optional[VideoGeneratorType] = None,
-                           fallback: bool = True) -> Dict[str, Any]:
+                           fallback: bool = True,
+                           hedge: bool = False) -> Dict[str, Any]:
         """
         비디오 생성 (통합 인터페이스)
         
@@ -121,16 +362,17 @@ class UnifiedVideoGenerator:
             output_count: 출력 개수 (1-4, 웹 생성기에서만 사용)
             generator_type: 사용할 생성기 타입 (None이면 기본값 사용)
             fallback: 실패 시 다른 생성기로 자동 전환 여부
+            hedge: p90 시간 안에 끝나지 않으면 다른 생성기로 동시에 요청 (중복 비용 발생, fallback 필요)
             
         Returns:
             생성 결과 딕셔너리
         """
         
-        # 사용할 생성기 결정
-        target_generator = generator_type or self.default_generator
+        # 사용할 생성기 결정 (지정하지 않았으면 예상 완료 시간 기준으로 선택)
+        target_generator = generator_type or self._select_backend()
         
-        # 생성기 사용 가능 여부 확인
-        if target_generator not in self.generators:
+        # 생성기 사용 가능 여부 확인 (서킷이 열린 생성기는 시도하지 않음)
+        if not self._is_available(target_generator):
             if fallback:
                 logger.warning(f"{target_generator.value} 생성기를 사용할 수 없습니다. 대안 생성기를 찾는 중...")
                 target_generator = self._find_alternative_generator(target_generator)
@@ -142,26 +384,29 @@ class UnifiedVideoGenerator:
             else:
                 return {
                     'status': 'error',
-                    'error': f'{target_generator.value} 생성기를 사용할 수 없습니다.'
+                    'error': f'{target_generator.value} 생성기를 사용할 수 없습니다.',
+                    'circuit': self._circuit_state(target_generator)
                 }
         
-        generator = self.generators[target_generator]
-        
         try:
             logger.info(f"🎬 {target_generator.value} 생성기로 비디오 생성 시작")
             logger.info(f"   이미지: {os.path.basename(image_path)}")
             logger.info(f"   프롬프트: {prompt[:100]}...")
             
             # 비디오 생성 실행
-            result = await generator.generate_video(
-                image_path=image_path,
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                cfg_scale=cfg_scale,
-                mode=mode,
-                duration=duration,
-                output_count=output_count
-            )
+            generator_kwargs = {
+                'image_path': image_path,
+                'prompt': prompt,
+                'negative_prompt': negative_prompt,
+                'cfg_scale': cfg_scale,
+                'mode': mode,
+                'duration': duration,
+                'output_count': output_count
+            }
+            if hedge and fallback:
+                target_generator, result = await self._generate_hedged(target_generator, **generator_kwargs)
+            else:
+                result = await self._run_generator(target_generator, **generator_kwargs)
             
             # 결과에 생성기 정보 추가
             if result.get('status') == 'success':
@@ -201,7 +446,9 @@ class UnifiedVideoGenerator:
         # 대안 생성기 우선순위
         fallback_order = []
         
-        if failed_generator == VideoGeneratorType.KLINGAI_API:
+        if self.adaptive_routing:
+            fallback_order = self._rank_backends(exclude=failed_generator)
+        elif failed_generator == VideoGeneratorType.KLINGAI_API:
             fallback_order = [VideoGeneratorType.KLINGAI_WEB, VideoGeneratorType.PLACEHOLDER]
         elif failed_generator == VideoGeneratorType.KLINGAI_WEB:
             fallback_order = [VideoGeneratorType.KLINGAI_API, VideoGeneratorType.PLACEHOLDER]
@@ -209,11 +456,12 @@ class UnifiedVideoGenerator:
             fallback_order = [VideoGeneratorType.PLACEHOLDER]
         
         for fallback_type in fallback_order:
-            if fallback_type in self.generators:
+            if self._is_available(fallback_type):
                 logger.info(f"🔄 대안 생성기 시도: {fallback_type.value}")
                 
                 try:
-                    result = await self.generators[fallback_type].generate_video(
+                    result = await self._run_generator(
+                        fallback_type,
                         image_path=image_path,
                         prompt=prompt,
                         negative_prompt=negative_prompt,
@@ -227,6 +475,7 @@ class UnifiedVideoGenerator:
                         result['generator_type'] = fallback_type.value
                         result['generator_name'] = self._get_generator_display_name(fallback_type)
                         result['fallback_from'] = failed_generator.value
+                        VIDEO_FALLBACKS.inc(from_backend=failed_generator.value, to_backend=fallback_type.value)
                         logger.info(f"✅ 대안 생성기 {fallback_type.value} 성공")
                         return result
                         
@@ -239,6 +488,22 @@ class UnifiedVideoGenerator:
             'error': '모든 생성기가 실패했습니다.'
         }
     
+    def _select_backend(self):
+        """요청별 생성기 선택"""
+        if not self.adaptive_routing:
+            return self.default_generator
+        
+        ranked = self._rank_backends()
+        if not ranked:
+            return self.default_generator
+        
+        if ranked[0] != self.default_generator:
+            logger.info(
+                f"📈 예상 완료 시간 기준 라우팅: {ranked[0].value} "
+                f"({self._expected_completion(ranked[0]):.0f}초 예상)"
+            )
+        return ranked[0]
+    
     def _find_alternative_generator(self, target_generator):
         """대안 생성기 찾기"""
         alternatives = [
@@ -248,11 +513,15 @@ class UnifiedVideoGenerator:
         ]
         
         for alt in alternatives:
-            if alt != target_generator and alt in self.generators:
+            if alt != target_generator and self._is_available(alt):
                 return alt
         
         return None
     
+    def _circuit_state(self, gen_type):
+        breaker = self.circuit_breakers.get(gen_type)
+        return breaker.to_dict() if breaker else None
+    
     def _get_generator_display_name(self, generator_type):
         """생성기 표시 이름"""
         names = {
@@ -268,7 +537,7 @@ class UnifiedVideoGenerator:
             {
                 'type': gen_type.value,
                 'name': self._get_generator_display_name(gen_type),
-                'available': True
+                'available': self._is_available(gen_type)
             }
             for gen_type in self.generators.keys()
         ]
@@ -277,15 +546,26 @@ class UnifiedVideoGenerator:
         """생성기 상태 보고서"""
         report = {
             'default_generator': self.default_generator.value,
+            'adaptive_routing': self.adaptive_routing,
+            'hedging': {
+                'active': self.active_hedges,
+                'max_concurrent': self.max_concurrent_hedges,
+                **self.hedge_stats
+            },
             'available_generators': len(self.generators),
             'generators': {}
         }
         
         for gen_type, generator in self.generators.items():
+            bucket = self.rate_limiters.get(gen_type)
             report['generators'][gen_type.value] = {
                 'name': self._get_generator_display_name(gen_type),
                 'class': generator.__class__.__name__,
-                'available': True
+                'available': self._is_available(gen_type),
+                'circuit': self._circuit_state(gen_type),
+                'rate_limit': bucket.to_dict() if bucket else None,
+                'stats': self.backend_stats[gen_type].snapshot(),
+                'expected_completion_seconds': round(self._expected_completion(gen_type), 1)
             }
         
         return report
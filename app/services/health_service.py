@@ -0,0 +1,197 @@
+import os
+import time
+import shutil
+import subprocess
+import threading
+import urllib.request
+import urllib.error
+import logging
+from .job_store import get_job_store, JOB_QUEUED, JOB_RUNNING
+from .generators.unified_video_generator import VideoGeneratorType
+
+logger = logging.getLogger(__name__)
+
+
+class HealthService:
+    """
+    준비 상태(readiness) 검사
+
+    생성기 초기화, 브라우저 풀 여유, KlingAI API 연결, FFmpeg, 작업 대기열 길이, 디스크 여유 공간을 확인합니다.
+    검사 결과는 항목별로 캐시되므로 로드 밸런서가 자주 호출해도 비용이 거의 들지 않습니다.
+    critical 항목이 하나라도 실패하면 준비되지 않은 것으로 보고합니다.
+    """
+
+    def __init__(self, upload_folder, ffmpeg_path='ffmpeg', min_free_disk_mb=1024, max_queue_depth=50,
+                 cache_seconds=5, klingai_probe_seconds=60, ffmpeg_probe_seconds=300):
+        self.upload_folder = upload_folder
+        self.ffmpeg_path = ffmpeg_path
+        self.min_free_disk_mb = min_free_disk_mb
+        self.max_queue_depth = max_queue_depth
+        self.cache_seconds = cache_seconds
+        self.klingai_probe_seconds = klingai_probe_seconds
+        self.ffmpeg_probe_seconds = ffmpeg_probe_seconds
+        self.started_at = time.time()
+        self._cache = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _cached(self, name, ttl, probe):
+        """ttl초 동안 검사 결과 재사용 (같은 항목은 한 번에 하나만 검사)"""
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            cached = self._cache.get(name)
+            now = time.time()
+            if cached and now - cached[0] < ttl:
+                return cached[1]
+
+            try:
+                result = probe()
+            except Exception as e:
+                logger.warning(f"헬스 검사 오류 ({name}): {e}")
+                result = {'ok': False, 'error': str(e)}
+
+            result['checked_at'] = now
+            self._cache[name] = (now, result)
+            return result
+
+    def liveness(self):
+        return {
+            'status': 'alive',
+            'uptime_seconds': round(time.time() - self.started_at, 1)
+        }
+
+    def readiness(self, media_service):
+        """
+        준비 상태 검사
+
+        Args:
+            media_service: 초기화된 MediaService (warm-up 전이면 None)
+
+        Returns:
+            dict: {'ready': bool, 'checks': {항목: {'ok', 'critical', ...}}}
+        """
+        probes = [
+            # (항목, 캐시 시간, 검사 함수, critical 여부)
+            ('browser_pool', self.cache_seconds, lambda: self._probe_browser_pool(media_service), False),
+            ('klingai_api', self.klingai_probe_seconds, lambda: self._probe_klingai(media_service), False),
+            ('ffmpeg', self.ffmpeg_probe_seconds, self._probe_ffmpeg, True),
+            ('job_queue', self.cache_seconds, lambda: self._probe_job_queue(media_service), True),
+            ('disk', self.cache_seconds, self._probe_disk, True)
+        ]
+
+        checks = {'media_service': {'ok': media_service is not None, 'critical': True}}
+        for name, ttl, probe, critical in probes:
+            checks[name] = {**self._cached(name, ttl, probe), 'critical': critical}
+
+        return {
+            'ready': all(check['ok'] for check in checks.values() if check['critical']),
+            'checks': checks
+        }
+
+    def _probe_browser_pool(self, media_service):
+        """브라우저 풀 크기와 실행/대기 중인 작업 수"""
+        if media_service is None:
+            return {'ok': False, 'error': '생성기 초기화 전입니다.'}
+
+        stats = media_service.scheduler.get_stats()
+        limit = stats['limits'].get('browser')
+        usage = stats['resources'].get('browser', {})
+        running = usage.get('running', 0)
+
+        result = {
+            'ok': True,
+            'size': limit,
+            'running': running,
+            'queued': usage.get('queued', 0),
+            'available': max(0, limit - running) if limit else None
+        }
+        # ImageFX는 브라우저 하나에서 탭 여러 개를 사용할 수 있음
+        if hasattr(media_service.image_generator, 'pool_stats'):
+            pool = media_service.image_generator.pool_stats()
+            result.update(open_browsers=pool['open_contexts'], pages_per_browser=pool['pages_per_context'])
+            if 'worker_processes' in pool:
+                result['worker_processes'] = pool['worker_processes']
+        return result
+
+    def _probe_klingai(self, media_service):
+        """KlingAI API 서버 연결 확인 (HTTP 응답이 오면 상태 코드와 관계없이 연결된 것으로 판단)"""
+        generator = None
+        if media_service is not None:
+            generator = media_service.video_generator.generators.get(VideoGeneratorType.KLINGAI_API)
+        if generator is None:
+            return {'ok': True, 'configured': False}
+
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(generator.base_url, timeout=3) as response:
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError) as e:
+            return {'ok': False, 'configured': True, 'error': str(e)}
+
+        return {
+            'ok': True,
+            'configured': True,
+            'http_status': status,
+            'latency_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+
+    def _probe_ffmpeg(self):
+        path = shutil.which(self.ffmpeg_path)
+        if not path:
+            return {'ok': False, 'error': f'{self.ffmpeg_path}를 찾을 수 없습니다.'}
+
+        completed = subprocess.run([path, '-version'], capture_output=True, timeout=5)
+        first_line = completed.stdout.decode('utf-8', errors='ignore').splitlines()[:1]
+        return {
+            'ok': completed.returncode == 0,
+            'path': path,
+            'version': first_line[0] if first_line else None
+        }
+
+    def _probe_job_queue(self, media_service):
+        """저장된 대기/실행 작업 수와 스케줄러 대기열 길이"""
+        counts = get_job_store().count_by_status()
+        scheduler_queued = 0
+        if media_service is not None:
+            scheduler_queued = sum(
+                usage.get('queued', 0) for usage in media_service.scheduler.get_stats()['resources'].values()
+            )
+
+        depth = counts.get(JOB_QUEUED, 0) + scheduler_queued
+        return {
+            'ok': depth <= self.max_queue_depth,
+            'depth': depth,
+            'max_depth': self.max_queue_depth,
+            'jobs_queued': counts.get(JOB_QUEUED, 0),
+            'jobs_running': counts.get(JOB_RUNNING, 0),
+            'scheduler_queued': scheduler_queued
+        }
+
+    def _probe_disk(self):
+        os.makedirs(self.upload_folder, exist_ok=True)
+        usage = shutil.disk_usage(self.upload_folder)
+        free_mb = usage.free / (1024 * 1024)
+        return {
+            'ok': free_mb >= self.min_free_disk_mb,
+            'free_mb': round(free_mb, 1),
+            'min_free_mb': self.min_free_disk_mb,
+            'used_percent': round(usage.used / usage.total * 100, 1) if usage.total else None
+        }
+
+
+def init_health(app):
+    """Flask 앱에 헬스 검사 서비스 등록"""
+    service = HealthService(
+        app.config['UPLOAD_FOLDER'],
+        ffmpeg_path=app.config.get('FFMPEG_PATH', 'ffmpeg'),
+        min_free_disk_mb=app.config.get('HEALTH_MIN_FREE_DISK_MB', 1024),
+        max_queue_depth=app.config.get('HEALTH_MAX_QUEUE_DEPTH', 50),
+        cache_seconds=app.config.get('HEALTH_CACHE_SECONDS', 5),
+        klingai_probe_seconds=app.config.get('HEALTH_KLINGAI_PROBE_SECONDS', 60)
+    )
+    app.extensions['health'] = service
+    return service
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import contextvars
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+UNFINISHED_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# 원격 작업(KlingAI task 등) 상태
+REMOTE_SUBMITTED = 'submitted'
+REMOTE_COMPLETED = 'completed'
+REMOTE_FAILED = 'failed'
+
+# 현재 실행 중인 작업 ID (생성기가 원격 작업 ID를 기록할 때 사용)
+current_job_id = contextvars.ContextVar('current_job_id', default=None)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    priority TEXT NOT NULL DEFAULT 'batch',
+    tenant TEXT,
+    traces TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS remote_tasks (
+    job_id TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, backend, fingerprint)
+);
+"""
+
+# 이전 버전 스키마에 없던 jobs 컬럼 (컬럼 이름, 정의)
+_ADDED_COLUMNS = [
+    ('priority', "TEXT NOT NULL DEFAULT 'batch'"),
+    ('tenant', 'TEXT'),
+    ('traces', 'TEXT')
+]
+
+
+class JobStore:
+    """
+    SQLite 기반 작업 저장소
+
+    작업 입력, 상태, 결과와 작업 중에 제출된 원격 작업 ID를 기록합니다.
+    프로세스가 재시작되어도 미완료 작업을 다시 실행하고 진행 중인 원격 작업을 이어서 확인할 수 있습니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.JOB_STORE_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # 요청 스레드와 스케줄러 스레드가 함께 사용하므로 연결 하나를 잠금으로 보호
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+            for name, definition in _ADDED_COLUMNS:
+                if name not in columns:
+                    self._conn.execute(f'ALTER TABLE jobs ADD COLUMN {name} {definition}')
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _to_dict(self, row):
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['traces'] = json.loads(job['traces']) if job['traces'] else []
+        return job
+
+    def create(self, kind, params, priority='batch', tenant=None):
+        """작업 등록 후 ID 반환"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            'INSERT INTO jobs (id, kind, status, params, priority, tenant, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, JOB_QUEUED, json.dumps(params, ensure_ascii=False), priority, tenant, now, now)
+        )
+        return job_id
+
+    def get(self, job_id):
+        rows = self._execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        if not rows:
+            return None
+
+        job = self._to_dict(rows[0])
+        job['remote_tasks'] = [
+            dict(row) for row in self._execute(
+                'SELECT backend, task_id, status, created_at, updated_at FROM remote_tasks WHERE job_id = ?',
+                (job_id,)
+            )
+        ]
+        return job
+
+    def list(self, status=None, limit=50):
+        if status:
+            rows = self._execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?', (status, limit)
+            )
+        else:
+            rows = self._execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+        return [self._to_dict(row) for row in rows]
+
+    def count_by_status(self):
+        """상태별 작업 수"""
+        rows = self._execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status')
+        return {row['status']: row['count'] for row in rows}
+
+    def list_unfinished(self):
+        """미완료 작업 목록 (등록 순서)"""
+        placeholders = ', '.join('?' for _ in UNFINISHED_STATUSES)
+        rows = self._execute(
+            f'SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at',
+            UNFINISHED_STATUSES
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def mark_running(self, job_id):
+        self._execute(
+            'UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?',
+            (JOB_RUNNING, time.time(), job_id)
+        )
+
+    def mark_queued(self, job_id):
+        self._execute(
+            'UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?', (JOB_QUEUED, time.time(), job_id)
+        )
+
+    def finish(self, job_id, result):
+        """작업 결과 기록 (result['status']로 성공/실패 판단)"""
+        succeeded = result.get('status') == 'success'
+        self._execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?',
+            (
+                JOB_SUCCEEDED if succeeded else JOB_FAILED,
+                json.dumps(result, ensure_ascii=False, default=str),
+                None if succeeded else result.get('error', '알 수 없는 오류'),
+                time.time(),
+                job_id
+            )
+        )
+
+    def append_trace(self, job_id, trace):
+        """작업에 단계별 실행 시간 trace 추가 (재시도/워크플로우 단계마다 하나씩 쌓임)"""
+        with self._lock:
+            rows = self._conn.execute('SELECT traces FROM jobs WHERE id = ?', (job_id,)).fetchall()
+            if not rows:
+                return
+            traces = json.loads(rows[0]['traces']) if rows[0]['traces'] else []
+            traces.append(trace)
+            self._conn.execute(
+                'UPDATE jobs SET traces = ? WHERE id = ?',
+                (json.dumps(traces, ensure_ascii=False, default=str), job_id)
+            )
+
+    def get_remote_task(self, job_id, backend, fingerprint):
+        rows = self._execute(
+            'SELECT * FROM remote_tasks WHERE job_id = ? AND backend = ? AND fingerprint = ?',
+            (job_id, backend, fingerprint)
+        )
+        return dict(rows[0]) if rows else None
+
+    def set_remote_task(self, job_id, backend, fingerprint, task_id, status):
+        now = time.time()
+        self._execute(
+            'INSERT INTO remote_tasks (job_id, backend, fingerprint, task_id, status, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (job_id, backend, fingerprint) DO UPDATE SET '
+            'task_id = excluded.task_id, status = excluded.status, updated_at = excluded.updated_at',
+            (job_id, backend, fingerprint, task_id, status, now, now)
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """프로세스 공용 작업 저장소 반환"""
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+        return _store
+
+
+def find_remote_task(backend, fingerprint):
+    """
+    현재 작업에서 같은 요청으로 이미 제출한 원격 작업 조회
+
+    작업 컨텍스트 밖에서 호출되면 None을 반환합니다.
+    """
+    job_id = current_job_id.get()
+    if job_id is None:
+        return None
+    return get_job_store().get_remote_task(job_id, backend, fingerprint)
+
+
+def record_remote_task(backend, fingerprint, task_id, status=REMOTE_SUBMITTED):
+    """현재 작업에 원격 작업 ID와 상태 기록 (작업 컨텍스트 밖이면 무시)"""
+    job_id = current_job_id.get()
+    if job_id is None:
+        return
+
+    try:
+        get_job_store().set_remote_task(job_id, backend, fingerprint, task_id, status)
+    except sqlite3.Error as e:
+        logger.warning(f"원격 작업 기록 실패 ({backend} {task_id}): {e}")
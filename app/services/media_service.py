@@ -1,25 +1,83 @@
 import os
+import time
 import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from .generators.imagefx_generator import ImageFXGenerator
 from .generators.placeholder_generator import PlaceholderGenerator
+from .generators.browser_worker_pool import isolate
 from .generators.unified_video_generator import UnifiedVideoGenerator, VideoGeneratorType
 from .video_editor import VideoEditor
+from .generation_scheduler import get_scheduler, scheduling_context, PRIORITY_BATCH
+from .workflow_pipeline import WorkflowPipeline
+from .workflow_engine import WorkflowEngine
+from .job_store import get_job_store, current_job_id, UNFINISHED_STATUSES, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from .progress_bus import get_progress_bus
+from .metrics import registry, GENERATE_IMAGE_SECONDS, GENERATION_FAILURES, SCHEDULER_QUEUE_DEPTH, SCHEDULER_RUNNING, ACTIVE_BROWSERS
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 작업 저장소로 실행할 수 있는 작업 종류 (dag: WorkflowEngine 정의를 그대로 실행)
+JOB_KINDS = ('image', 'video', 'workflow', 'dag')
+
+# 처음 사용할 때 import되는 무거운 의존성 (warm-up에서 미리 로드)
+WARMUP_MODULES = ('playwright.async_api', 'ffmpeg', 'jwt')
+
 class MediaService:
     def __init__(self):
+        # 이미지 생성기, 비디오 생성기, 편집기는 서로 독립적이므로 동시에 초기화
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='media-init') as executor:
+            image_future = executor.submit(self._create_image_generator)
+            video_future = executor.submit(self._create_video_generator)
+            editor_future = executor.submit(VideoEditor)
+            
+            self.image_generator = image_future.result()
+            self.video_generator = video_future.result()
+            self.video_editor = editor_future.result()
+        
+        # 생성 작업 스케줄러 (브라우저 풀 크기 x 브라우저당 탭 수만큼만 동시에 실행)
+        self.scheduler = get_scheduler()
+        self.scheduler.set_limit('browser', getattr(
+            self.image_generator, 'max_concurrent_tasks', getattr(self.image_generator, 'pool_size', None)
+        ))
+        
+        # 생성기별 동시 실행 제한 (KlingAI 계정의 동시 작업 할당량 등)
+        for resource, limit in self.video_generator.get_concurrency_limits().items():
+            self.scheduler.set_limit(resource, limit)
+        self.video_generator.concurrency_limiter = self.scheduler.run_with_limit
+        
+        # FFmpeg 편집 동시 실행 제한 (워크플로우 파이프라인과 DAG 편집 단계 공용)
+        self.scheduler.set_limit('ffmpeg', max(1, int(os.environ.get('FFMPEG_MAX_CONCURRENT', 2))))
+        
+        # 상태 보고서 출력
+        status_report = self.video_generator.get_status_report()
+        logger.info(f"✅ 통합 비디오 생성기 초기화 완료")
+        logger.info(f"   기본 생성기: {status_report['default_generator']}")
+        logger.info(f"   사용 가능한 생성기: {status_report['available_generators']}개")
+        
+        for gen_name, gen_info in status_report['generators'].items():
+            logger.info(f"   - {gen_info['name']} ({gen_name})")
+        
+        # 작업 상태와 원격 작업 ID를 기록하는 저장소
+        self.jobs = get_job_store()
+        
+        # /metrics 수집 시 스케줄러 대기열과 실행 중인 브라우저 수 갱신
+        registry.add_collector(self._collect_metrics)
+    
+    def _create_image_generator(self):
         # 환경변수로 이미지 생성기 선택
         use_placeholder = os.environ.get('USE_PLACEHOLDER_GENERATOR', 'false').lower() == 'true'
         
         if use_placeholder:
             logger.info("플레이스홀더 이미지 생성기를 사용합니다.")
-            self.image_generator = PlaceholderGenerator()
-        else:
-            logger.info("ImageFX 생성기를 사용합니다.")
-            self.image_generator = ImageFXGenerator()
+            return PlaceholderGenerator()
         
+        logger.info("ImageFX 생성기를 사용합니다.")
+        # BROWSER_PROCESS_ISOLATION=true이면 브라우저 자동화를 워커 프로세스에서 실행
+        return isolate('imagefx', ImageFXGenerator())
+    
+    def _create_video_generator(self):
         # 통합 비디오 생성기 사용
         logger.info("🎬 통합 비디오 생성기 초기화 중...")
         
@@ -34,27 +92,147 @@ class MediaService:
         else:
             generator_type = VideoGeneratorType.AUTO
         
-        self.video_generator = UnifiedVideoGenerator(generator_type)
+        return UnifiedVideoGenerator(generator_type)
+    
+    def warm_up(self):
+        """
+        무거운 의존성(Playwright, FFmpeg, PyJWT)을 동시에 미리 import
         
-        # 상태 보고서 출력
-        status_report = self.video_generator.get_status_report()
-        logger.info(f"✅ 통합 비디오 생성기 초기화 완료")
-        logger.info(f"   기본 생성기: {status_report['default_generator']}")
-        logger.info(f"   사용 가능한 생성기: {status_report['available_generators']}개")
+        Returns:
+            dict: {모듈 이름: {'loaded': bool, 'seconds': float, 'error': str}}
+        """
+        def load(name):
+            started = time.monotonic()
+            try:
+                importlib.import_module(name)
+                return {'loaded': True, 'seconds': round(time.monotonic() - started, 3)}
+            except ImportError as e:
+                logger.warning(f"warm-up 모듈 로드 실패 ({name}): {e}")
+                return {'loaded': False, 'seconds': round(time.monotonic() - started, 3), 'error': str(e)}
         
-        for gen_name, gen_info in status_report['generators'].items():
-            logger.info(f"   - {gen_info['name']} ({gen_name})")
+        with ThreadPoolExecutor(max_workers=len(WARMUP_MODULES), thread_name_prefix='media-warmup') as executor:
+            return dict(zip(WARMUP_MODULES, executor.map(load, WARMUP_MODULES)))
+        
+    async def generate_image(self, prompt, aspect_ratio="9:16", all_variants=False):
+        """
+        이미지 생성
+        
+        all_variants가 True이면 한 번의 브라우저 세션에서 나온 후보 이미지를 모두 저장합니다
+        (지원하지 않는 생성기는 한 장만 생성하고 결과의 'variants'에 담음).
+        """
+        generator = getattr(self.image_generator, 'generator_name', None) or type(self.image_generator).__name__
+        started = time.monotonic()
+        status = 'error'
+        try:
+            if all_variants and getattr(self.image_generator, 'supports_variants', False):
+                result = await self.image_generator.generate_image(prompt, aspect_ratio, all_variants=True)
+            else:
+                result = await self.image_generator.generate_image(prompt, aspect_ratio)
+                if all_variants and result.get('status') == 'success':
+                    result['variants'] = [
+                        {key: result.get(key) for key in ('filename', 'filepath', 'file_size')}
+                    ]
+            status = result.get('status', 'error')
+            return result
+        finally:
+            GENERATE_IMAGE_SECONDS.observe(time.monotonic() - started, generator=generator, status=status)
+            if status != 'success':
+                GENERATION_FAILURES.inc(operation='image', backend=generator)
+    
+    def _collect_metrics(self):
+        resources = self.scheduler.get_stats()['resources']
+        for resource, usage in resources.items():
+            SCHEDULER_QUEUE_DEPTH.set(usage.get('queued', 0), resource=resource)
+            SCHEDULER_RUNNING.set(usage.get('running', 0), resource=resource)
+        
+        # 브라우저를 띄우는 리소스: ImageFX 풀(탭 여러 개가 브라우저 하나를 공유할 수 있음)과 KlingAI 웹 생성기
+        if hasattr(self.image_generator, 'pool_stats'):
+            image_browsers = self.image_generator.pool_stats()['open_contexts']
+        else:
+            image_browsers = resources.get('browser', {}).get('running', 0)
+        ACTIVE_BROWSERS.set(image_browsers + resources.get('klingai_web', {}).get('running', 0))
+    
+    async def generate_images_batch(self, items, max_parallel=2):
+        """
+        여러 프롬프트로 이미지 일괄 생성
+        
+        Args:
+            items (list): [{'prompt': str, 'aspect_ratio': str}, ...]
+            max_parallel (int): 이 배치에서 동시에 실행할 최대 작업 수
+            
+        Yields:
+            dict: 완료되는 순서대로 {'index': 항목 번호, 'result': 생성 결과}
+        """
+        async def worker(item):
+            return await self.scheduler.run_with_limit(
+                lambda: self.generate_image(
+                    item['prompt'], item.get('aspect_ratio', '9:16'), item.get('all_variants', False)
+                ),
+                resource='browser'
+            )
+        
+        async for completed in self._iterate_batch(items, worker, max_parallel):
+            yield completed
+    
+    async def generate_videos_batch(self, items, generator_type=None, fallback=True, max_parallel=None, hedge=False):
+        """
+        여러 이미지로 동영상 일괄 생성
+        
+        동시 실행 수는 생성기별 할당량(예: KLINGAI_MAX_CONCURRENT_TASKS)으로 제한되고,
+        초과분은 스케줄러에서 대기합니다.
+        
+        Args:
+            items (list): [{'image_path', 'prompt', 'negative_prompt', 'cfg_scale', 'mode', 'duration'}, ...]
+            generator_type (VideoGeneratorType): 사용할 생성기 (None이면 기본 생성기)
+            fallback (bool): 실패 시 다른 생성기로 자동 전환 여부
+            max_parallel (int): 이 배치에서 동시에 실행할 최대 작업 수 (None이면 할당량만 적용)
+            hedge (bool): 느린 요청을 다른 생성기로 동시에 보내는 헤지 요청 사용 여부
             
-        self.video_editor = VideoEditor()
+        Yields:
+            dict: 완료되는 순서대로 {'index': 항목 번호, 'result': 생성 결과}
+        """
+        async def worker(item):
+            # 항목마다 작업으로 기록해 재시작 시 제출된 KlingAI 작업을 이어서 확인
+            return await self.run_tracked('video', {
+                'image_path': item['image_path'],
+                'prompt': item.get('prompt', ''),
+                'negative_prompt': item.get('negative_prompt', ''),
+                'cfg_scale': item.get('cfg_scale', 0.5),
+                'mode': item.get('mode', 'std'),
+                'duration': item.get('duration', 5),
+                'generator_type': generator_type.value if generator_type else None,
+                'fallback': fallback,
+                'hedge': hedge
+            })
+        
+        async for completed in self._iterate_batch(items, worker, max_parallel or len(items)):
+            yield completed
+    
+    async def _iterate_batch(self, items, worker, max_parallel):
+        """항목별 작업을 최대 max_parallel개씩 실행하고 완료 순서대로 결과 반환"""
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+        
+        async def run_item(index, item):
+            async with semaphore:
+                try:
+                    result = await worker(item)
+                except Exception as e:
+                    logger.error(f"배치 작업 오류 (#{index}): {str(e)}")
+                    result = {'status': 'error', 'error': str(e)}
+                return {'index': index, 'result': result}
         
-    async def generate_image(self, prompt, aspect_ratio="9:16"):
-        """이미지 생성"""
-        return await self.image_generator.generate_image(prompt, aspect_ratio)
+        tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(items)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
     
-    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5):
+    async def generate_video(self, image_path, prompt, negative_prompt="", cfg_scale=0.5, mode="std", duration=5, hedge=False):
         """동영상 생성"""
         return await self.video_generator.generate_video(
-            image_path, prompt, negative_prompt, cfg_scale, mode, duration
+            image_path, prompt, negative_prompt, cfg_scale, mode, duration, hedge=hedge
         )
     
     def edit_video(self, video_path, edit_options):
@@ -64,7 +242,7 @@ class MediaService:
         Args:
             video_path (str): 편집할 동영상 경로
             edit_options (dict): 편집 옵션
-                - action: 'add_subtitles', 'trim', 'merge', 'add_watermark'
+                - action: 'add_subtitles', 'trim', 'merge', 'add_watermark', 'thumbnail'
                 - params: 각 액션에 필요한 파라미터
         
         Returns:
@@ -81,62 +259,68 @@ class MediaService:
             return self.video_editor.merge_videos([video_path] + params.get('additional_videos', []))
         elif action == 'add_watermark':
             return self.video_editor.add_watermark(video_path, **params)
+        elif action == 'thumbnail':
+            return self.video_editor.extract_thumbnail(video_path, **params)
         else:
             return {
                 'status': 'error',
                 'error': f'알 수 없는 편집 작업: {action}'
             }
     
-    async def complete_workflow(self, prompt, video_prompt, video_options=None, edit_options=None):
+    async def complete_workflow(self, prompt, video_prompt, video_options=None, edit_options=None, workflow_id=None):
         """
         전체 워크플로우 실행 (이미지 생성 -> 동영상 생성 -> 편집)
         
+        WorkflowEngine의 DAG로 실행되므로 같은 workflow_id로 다시 요청하면
+        이미 완료된 단계는 건너뛰고 실패한 단계부터 재개합니다.
+        
         Args:
             prompt (str): 이미지 생성 프롬프트
             video_prompt (str): 동영상 생성 프롬프트
             video_options (dict): 동영상 생성 옵션
             edit_options (dict): 편집 옵션
+            workflow_id (str): 재개할 워크플로우 ID (없으면 새로 발급)
             
         Returns:
             dict: 전체 워크플로우 결과
         """
         try:
-            # 1. 이미지 생성
-            logger.info("이미지 생성 시작...")
-            image_result = await self.generate_image(prompt)
-            if image_result['status'] != 'success':
-                return image_result
+            steps = {
+                'image': {'action': 'generate_image', 'params': {'prompt': prompt}},
+                'video': {
+                    'action': 'generate_video',
+                    'inputs': {'image_path': 'image'},
+                    'params': {**(video_options or {}), 'prompt': video_prompt}
+                }
+            }
+            if edit_options:
+                steps['edited_video'] = {
+                    'action': 'edit',
+                    'inputs': {'video_path': 'video'},
+                    'params': edit_options
+                }
             
-            # 2. 동영상 생성
-            logger.info("동영상 생성 시작...")
-            video_options = video_options or {}
-            video_result = await self.generate_video(
-                image_result['filepath'],
-                video_prompt,
-                **video_options
-            )
-            if video_result['status'] != 'success':
-                return video_result
+            logger.info("워크플로우 실행 시작...")
+            engine = WorkflowEngine(self)
+            report = await engine.run({'workflow_id': workflow_id, 'steps': steps})
             
-            # 3. 동영상 편집 (옵션)
-            if edit_options:
-                logger.info("동영상 편집 시작...")
-                edit_result = self.edit_video(video_result['filepath'], edit_options)
-                if edit_result['status'] != 'success':
-                    return edit_result
-                
+            if report['status'] != 'success':
+                # 건너뛴 단계가 아닌 실제로 실패한 단계의 오류 반환
+                failed_step = next(
+                    step_id for step_id in report['failed_steps']
+                    if report['steps'][step_id]['status'] == 'error'
+                )
                 return {
-                    'status': 'success',
-                    'image': image_result,
-                    'video': video_result,
-                    'edited_video': edit_result
+                    'status': 'error',
+                    'error': report['steps'][failed_step].get('error', '알 수 없는 오류'),
+                    'workflow_id': report['workflow_id'],
+                    'failed_step': failed_step
                 }
             
-            return {
-                'status': 'success',
-                'image': image_result,
-                'video': video_result
-            }
+            result = {'status': 'success', 'workflow_id': report['workflow_id']}
+            for step_id in steps:
+                result[step_id] = report['steps'][step_id]['result']
+            return result
             
         except Exception as e:
             logger.error(f"워크플로우 실행 중 오류: {str(e)}")
@@ -144,3 +328,162 @@ class MediaService:
                 'status': 'error',
                 'error': str(e)
             }
+    
+    async def complete_workflows(self, items, stage_workers=None):
+        """
+        여러 항목의 워크플로우를 파이프라인으로 실행
+        
+        Args:
+            items (list): complete_workflow 인자와 같은 구성의 항목 목록
+                - image_prompt, video_prompt, aspect_ratio, video_options, edit_options
+            stage_workers (dict): 단계별 워커 수 {'image': 1, 'video': 3, 'edit': 2}
+            
+        Yields:
+            dict: 완료되는 순서대로 항목별 워크플로우 결과
+        """
+        pipeline = WorkflowPipeline(self, stage_workers)
+        logger.info(f"파이프라인 워크플로우 시작: {len(items)}개 항목, 단계별 워커 {pipeline.workers}")
+        
+        async for result in pipeline.run(items):
+            yield result
+    
+    def submit_job(self, kind, params, priority=PRIORITY_BATCH, tenant=None):
+        """
+        작업 저장소에 등록한 뒤 백그라운드에서 실행
+        
+        Args:
+            kind (str): 'image', 'video', 'workflow'
+            params (dict): 작업 입력
+                - image: prompt, aspect_ratio
+                - video: image_path, prompt, negative_prompt, cfg_scale, mode, duration, output_count, generator_type, fallback, hedge
+                - workflow: image_prompt, video_prompt, video_options, edit_options
+                - dag: WorkflowEngine 워크플로우 정의 (workflow_id, steps)
+            priority (str): 스케줄링 우선순위 ('interactive', 'batch')
+            tenant (str): 공정 큐잉 단위 (API 키 또는 사용자)
+            
+        Returns:
+            str: 작업 ID
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        
+        job_id = self.jobs.create(kind, params, priority, tenant)
+        self.scheduler.submit(lambda: self.run_job(job_id), priority=priority, tenant=tenant)
+        logger.info(f"📥 작업 등록: {job_id} ({kind})")
+        return job_id
+    
+    async def run_tracked(self, kind, params):
+        """
+        작업 저장소에 등록하고 바로 실행 (결과를 기다리는 동기 API와 배치용)
+        
+        submit_job과 같이 기록되므로 실행 중에 서버가 재시작되면 복구 시 다시 실행되고,
+        제출된 원격 작업(KlingAI task)은 새로 제출하지 않고 이어서 확인합니다.
+        우선순위와 테넌트는 현재 스케줄링 컨텍스트를 따릅니다.
+        
+        Returns:
+            dict: 작업 결과 (job_id 포함)
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        
+        context = scheduling_context.get()
+        job_id = self.jobs.create(kind, params, context['priority'], context['tenant'])
+        result = await self.run_job(job_id)
+        return {**result, 'job_id': job_id}
+    
+    async def run_job(self, job_id):
+        """저장된 작업 실행 후 결과 기록"""
+        job = self.jobs.get(job_id)
+        if job is None or job['status'] not in UNFINISHED_STATUSES:
+            return job and job['result']
+        
+        self.jobs.mark_running(job_id)
+        progress_bus = get_progress_bus()
+        progress_bus.publish(job_id, 'status', {'status': JOB_RUNNING, 'kind': job['kind']})
+        
+        # 생성기가 원격 작업 ID와 진행 상황을 이 작업에 기록할 수 있도록 컨텍스트 설정
+        token = current_job_id.set(job_id)
+        try:
+            result = await self._execute_job(job_id, job['kind'], job['params'])
+        except Exception as e:
+            logger.error(f"작업 실행 중 오류 ({job_id}): {str(e)}")
+            result = {'status': 'error', 'error': str(e)}
+        finally:
+            current_job_id.reset(token)
+        
+        self.jobs.finish(job_id, result)
+        progress_bus.publish(job_id, 'done', {
+            'status': JOB_SUCCEEDED if result.get('status') == 'success' else JOB_FAILED,
+            'result': result
+        })
+        logger.info(f"📤 작업 완료: {job_id} ({result.get('status')})")
+        return result
+    
+    async def _execute_job(self, job_id, kind, params):
+        if kind == 'image':
+            return await self.scheduler.run_with_limit(
+                lambda: self.generate_image(
+                    params['prompt'], params.get('aspect_ratio', '9:16'), params.get('all_variants', False)
+                ),
+                resource='browser'
+            )
+        
+        if kind == 'video':
+            generator_type = params.get('generator_type')
+            return await self.video_generator.generate_video(
+                image_path=params['image_path'],
+                prompt=params.get('prompt', ''),
+                negative_prompt=params.get('negative_prompt', ''),
+                cfg_scale=params.get('cfg_scale', 0.5),
+                mode=params.get('mode', 'std'),
+                duration=params.get('duration', 5),
+                output_count=params.get('output_count', 1),
+                generator_type=VideoGeneratorType(generator_type) if generator_type else None,
+                fallback=params.get('fallback', True),
+                hedge=params.get('hedge', False)
+            )
+        
+        # 워크플로우는 작업 ID를 workflow_id로 사용하므로 재실행 시 완료된 단계부터 재개
+        if kind == 'dag':
+            return await WorkflowEngine(self).run({**params, 'workflow_id': params.get('workflow_id') or f"job-{job_id}"})
+        
+        return await self.complete_workflow(
+            params['image_prompt'],
+            params['video_prompt'],
+            params.get('video_options'),
+            params.get('edit_options'),
+            workflow_id=f"job-{job_id}"
+        )
+    
+    def recover_jobs(self, max_attempts=3):
+        """
+        재시작 전에 끝나지 않은 작업 다시 실행
+        
+        진행 중이던 KlingAI 작업은 기록된 task ID로 이어서 확인하고,
+        워크플로우는 단계 캐시로 완료된 단계를 건너뜁니다.
+        
+        Returns:
+            int: 다시 실행한 작업 수
+        """
+        recovered = 0
+        
+        for job in self.jobs.list_unfinished():
+            if job['attempts'] >= max_attempts:
+                self.jobs.finish(job['id'], {
+                    'status': 'error',
+                    'error': f"최대 재시도 횟수({max_attempts}회)를 초과했습니다."
+                })
+                continue
+            
+            self.jobs.mark_queued(job['id'])
+            self.scheduler.submit(
+                lambda job_id=job['id']: self.run_job(job_id),
+                priority=job['priority'],
+                tenant=job['tenant']
+            )
+            recovered += 1
+        
+        if recovered:
+            logger.info(f"♻️ 미완료 작업 {recovered}개 복구")
+        
+        return recovered
@@ -0,0 +1,246 @@
+import time
+import bisect
+import functools
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 생성/편집 작업용 히스토그램 구간(초) (1초 미만 ~ 수십 분)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 180, 300, 600, 1200)
+
+# HTTP 요청용 히스토그램 구간(초)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"{self.name}: 알 수 없는 레이블 {sorted(unknown)}")
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            for key in sorted(self._values):
+                lines.extend(self._render_sample(key, self._values[key]))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """누적 카운터"""
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """현재 값 (수집 시점에 collector가 갱신)"""
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """소요 시간 분포 (누적 구간별 개수, 합계, 개수)"""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._values[key] = state
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def _render_sample(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['counts']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+        lines.append(f"{self.name}_bucket{labels} {state['count']}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Prometheus 텍스트 형식(0.0.4) 메트릭 레지스트리
+
+    게이지처럼 수집 시점에 계산하는 값은 add_collector로 등록한 함수가 render 직전에 갱신합니다.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, *args, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"메트릭 수집 오류: {e}")
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+GENERATE_IMAGE_SECONDS = registry.histogram(
+    'imageauto_generate_image_seconds', '이미지 생성 소요 시간', ('generator', 'status')
+)
+GENERATE_VIDEO_SECONDS = registry.histogram(
+    'imageauto_generate_video_seconds', '생성기별 동영상 생성 소요 시간', ('backend', 'status')
+)
+EDIT_SECONDS = registry.histogram(
+    'imageauto_edit_seconds', '동영상 편집 작업별 소요 시간', ('action', 'status')
+)
+REMOTE_DOWNLOAD_SECONDS = registry.histogram(
+    'imageauto_remote_download_seconds', '생성 결과 파일 다운로드 소요 시간', ('backend',)
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'imageauto_http_request_seconds', 'HTTP 요청 처리 시간 (업로드/다운로드 포함)',
+    ('endpoint', 'method', 'status'), buckets=HTTP_BUCKETS
+)
+GENERATION_FAILURES = registry.counter(
+    'imageauto_generation_failures_total', '생성/편집 실패 수', ('operation', 'backend')
+)
+VIDEO_FALLBACKS = registry.counter(
+    'imageauto_video_fallbacks_total', '대안 생성기로 전환한 횟수', ('from_backend', 'to_backend')
+)
+SCHEDULER_QUEUE_DEPTH = registry.gauge(
+    'imageauto_scheduler_queue_depth', '리소스별 대기 중인 작업 수', ('resource',)
+)
+SCHEDULER_RUNNING = registry.gauge(
+    'imageauto_scheduler_running', '리소스별 실행 중인 작업 수', ('resource',)
+)
+ACTIVE_BROWSERS = registry.gauge(
+    'imageauto_active_browsers', '실행 중인 브라우저 수 (ImageFX 풀 + KlingAI 웹)'
+)
+
+
+def observe_edit(action):
+    """VideoEditor 메서드의 소요 시간과 실패를 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            status = 'error'
+            try:
+                result = func(*args, **kwargs)
+                status = result.get('status', 'error')
+                return result
+            finally:
+                EDIT_SECONDS.observe(time.monotonic() - started, action=action, status=status)
+                if status != 'success':
+                    GENERATION_FAILURES.inc(operation='edit', backend=action)
+        return wrapper
+    return decorator
+
+
+def init_metrics(app):
+    """Flask 앱에 HTTP 요청 시간 측정 훅 등록"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.monotonic()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('metrics_started', None)
+        # 스트리밍 응답(SSE, NDJSON, 파일 전송)은 응답 헤더를 만들 때까지의 시간만 측정됨
+        if started is not None:
+            HTTP_REQUEST_SECONDS.observe(
+                time.monotonic() - started,
+                endpoint=request.endpoint or 'unknown',
+                method=request.method,
+                status=response.status_code
+            )
+        return response
+
+    return registry
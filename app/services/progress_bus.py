@@ -0,0 +1,123 @@
+import time
+import queue
+import threading
+import logging
+from collections import deque
+from .job_store import current_job_id
+
+logger = logging.getLogger(__name__)
+
+# 같은 단계의 진행 이벤트를 보내는 최소 간격(초) (다운로드 바이트처럼 잦은 신호 제한)
+_MIN_INTERVAL = 0.25
+
+
+class ProgressBus:
+    """
+    작업별 진행 상황 이벤트 버스
+
+    생성기/편집기가 보낸 진행 이벤트를 작업 ID별로 최근 history_size개까지 보관하고,
+    구독 중인 SSE 연결(요청 스레드)에 전달합니다.
+    늦게 연결하거나 재연결한 클라이언트는 Last-Event-ID 이후 이벤트를 다시 받습니다.
+    """
+
+    def __init__(self, history_size=200, ttl_seconds=3600):
+        self.history_size = history_size
+        self.ttl_seconds = ttl_seconds
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def _channel(self, job_id):
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = {
+                'seq': 0,
+                'events': deque(maxlen=self.history_size),
+                'subscribers': set(),
+                'last_sent': {},
+                'updated': time.time()
+            }
+            self._channels[job_id] = channel
+        return channel
+
+    def publish(self, job_id, event_type, data, throttle_key=None):
+        """이벤트 발행 (throttle_key가 같은 이벤트는 _MIN_INTERVAL마다 한 번만)"""
+        with self._lock:
+            channel = self._channel(job_id)
+            now = time.time()
+
+            if throttle_key is not None:
+                if now - channel['last_sent'].get(throttle_key, 0) < _MIN_INTERVAL:
+                    return None
+                channel['last_sent'][throttle_key] = now
+
+            channel['seq'] += 1
+            event = {'id': channel['seq'], 'type': event_type, 'data': {**data, 'timestamp': now}}
+            channel['events'].append(event)
+            channel['updated'] = now
+            subscribers = list(channel['subscribers'])
+
+        for subscriber in subscribers:
+            subscriber.put(event)
+        return event
+
+    def subscribe(self, job_id, last_event_id=0):
+        """
+        구독 시작
+
+        Returns:
+            tuple: (last_event_id 이후에 발행된 이벤트 목록, 새 이벤트를 받을 queue.Queue)
+        """
+        subscriber = queue.Queue()
+        with self._lock:
+            self._prune()
+            channel = self._channel(job_id)
+            replay = [event for event in channel['events'] if event['id'] > last_event_id]
+            channel['subscribers'].add(subscriber)
+        return replay, subscriber
+
+    def unsubscribe(self, job_id, subscriber):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel:
+                channel['subscribers'].discard(subscriber)
+
+    def _prune(self):
+        """구독자가 없고 오래된 채널 정리"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, channel in self._channels.items()
+            if not channel['subscribers'] and channel['updated'] < cutoff
+        ]
+        for job_id in expired:
+            del self._channels[job_id]
+
+
+_bus = ProgressBus()
+
+
+def get_progress_bus():
+    """프로세스 공용 진행 이벤트 버스 반환"""
+    return _bus
+
+
+def report_progress(stage, percent=None, message=None, **extra):
+    """
+    현재 작업의 진행 상황 보고 (작업 컨텍스트 밖이면 무시)
+
+    Args:
+        stage (str): 'image', 'video', 'download', 'edit' 등 단계 이름
+        percent (float): 단계 진행률 (0~100, 모르면 None)
+        message (str): 사용자에게 보여줄 메시지
+        extra: 단계별 추가 정보 (task_status, bytes, total_bytes 등)
+    """
+    job_id = current_job_id.get()
+    if job_id is None:
+        return
+
+    data = {'stage': stage, 'message': message, **extra}
+    if percent is not None:
+        data['percent'] = round(max(0.0, min(100.0, percent)), 1)
+
+    # 메시지가 바뀌는 이벤트는 항상 보내고, 같은 메시지의 수치 갱신만 간격을 둠
+    throttle_key = (stage, message) if percent is not None and 0 < percent < 100 else None
+    _bus.publish(job_id, 'progress', data, throttle_key=throttle_key)
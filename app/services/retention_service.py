@@ -0,0 +1,331 @@
+import os
+import time
+import fnmatch
+import shutil
+import threading
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 미디어 폴더 카테고리 (UPLOAD_FOLDER 하위)
+MEDIA_CATEGORIES = ('images', 'videos', 'edited')
+
+# 디버그 산출물 카테고리 (DEBUG_FOLDER 하위)
+DEBUG_CATEGORIES = ('screenshots', 'placeholder_info', 'subtitles')
+
+# 예전 버전이 미디어 폴더에 남긴 디버그 산출물 (원본 폴더, 파일 패턴, 이동할 카테고리)
+LEGACY_ARTIFACT_RULES = [
+    ('images', 'debug_screenshot_*.png', 'screenshots'),
+    ('images', 'timeout_debug_*.png', 'screenshots'),
+    ('videos', '*_info.txt', 'placeholder_info'),
+    ('edited', 'subtitles_*.srt', 'subtitles')
+]
+
+
+def get_debug_dir(category):
+    """디버그 산출물 카테고리별 디렉토리 반환 (없으면 생성)"""
+    if category not in DEBUG_CATEGORIES:
+        raise ValueError(f"알 수 없는 디버그 카테고리: {category}")
+
+    path = os.path.join(Config.DEBUG_FOLDER, category)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class RetentionPolicy:
+    """
+    카테고리별 보존 정책
+
+    - max_age_days: 마지막 접근 이후 이 기간이 지난 파일 삭제
+    - max_size_mb: 카테고리 전체 용량이 이 값을 넘으면 가장 오래 접근하지 않은 파일부터 삭제 (LRU)
+    """
+
+    def __init__(self, name, directory, max_age_days=None, max_size_mb=None, patterns=('*',)):
+        self.name = name
+        self.directory = directory
+        self.max_age_days = max_age_days or None
+        self.max_size_mb = max_size_mb or None
+        self.patterns = patterns
+
+    def matches(self, filename):
+        """정책 대상 파일인지 확인 (.gitkeep 등 숨김 파일 제외)"""
+        if filename.startswith('.'):
+            return False
+        return any(fnmatch.fnmatch(filename, pattern) for pattern in self.patterns)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'directory': self.directory,
+            'max_age_days': self.max_age_days,
+            'max_size_mb': self.max_size_mb
+        }
+
+
+def build_default_policies(upload_folder, debug_folder, policy_config=None, workflow_cache_folder=None):
+    """설정값으로 카테고리별 기본 정책 생성"""
+    policy_config = policy_config or {}
+    policies = []
+
+    for category in MEDIA_CATEGORIES:
+        options = policy_config.get(category, {})
+        policies.append(RetentionPolicy(
+            category,
+            os.path.join(upload_folder, category),
+            max_age_days=options.get('max_age_days'),
+            max_size_mb=options.get('max_size_mb')
+        ))
+
+    for category in DEBUG_CATEGORIES:
+        options = policy_config.get(category, {})
+        policies.append(RetentionPolicy(
+            category,
+            os.path.join(debug_folder, category),
+            max_age_days=options.get('max_age_days'),
+            max_size_mb=options.get('max_size_mb')
+        ))
+
+    # DAG 워크플로우 단계 결과 캐시 (기록 중인 .tmp 파일 제외)
+    if workflow_cache_folder:
+        options = policy_config.get('workflow_cache', {})
+        policies.append(RetentionPolicy(
+            'workflow_cache',
+            workflow_cache_folder,
+            max_age_days=options.get('max_age_days'),
+            max_size_mb=options.get('max_size_mb'),
+            patterns=('*.json',)
+        ))
+
+    return policies
+
+
+class RetentionService:
+    """업로드/디버그 폴더의 보존 정책 적용 서비스"""
+
+    def __init__(self, upload_folder, debug_folder, policies=None):
+        self.upload_folder = upload_folder
+        self.debug_folder = debug_folder
+        self.policies = policies or build_default_policies(upload_folder, debug_folder)
+
+        # 파일 atime을 직접 갱신할 수 없을 때(권한 등) 쓰는 접근 시각 기록
+        self._access_times = {}
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self.last_report = None
+
+    def record_access(self, path):
+        """
+        파일 접근 기록 (파일 서빙 시 호출)
+
+        접근 시각을 파일 atime에 직접 기록하므로 noatime 마운트나 서버 재시작 후에도 LRU 순서가 유지됩니다.
+        """
+        now = time.time()
+        try:
+            os.utime(path, (now, os.stat(path).st_mtime))
+            return
+        except OSError:
+            pass
+
+        with self._lock:
+            self._access_times[os.path.abspath(path)] = now
+
+    def _last_access(self, path, stat):
+        """마지막 접근 시각 (기록된 접근, atime, mtime 중 가장 최근 값)"""
+        with self._lock:
+            recorded = self._access_times.get(os.path.abspath(path), 0)
+        return max(recorded, stat.st_atime, stat.st_mtime)
+
+    def _forget(self, path):
+        with self._lock:
+            self._access_times.pop(os.path.abspath(path), None)
+
+    def migrate_legacy_artifacts(self):
+        """미디어 폴더에 섞여 있는 디버그 산출물을 디버그 트리로 이동"""
+        moved = 0
+
+        for subfolder, pattern, category in LEGACY_ARTIFACT_RULES:
+            source_dir = os.path.join(self.upload_folder, subfolder)
+            if not os.path.isdir(source_dir):
+                continue
+
+            target_dir = os.path.join(self.debug_folder, category)
+
+            for entry in os.scandir(source_dir):
+                if not entry.is_file() or not fnmatch.fnmatch(entry.name, pattern):
+                    continue
+
+                try:
+                    os.makedirs(target_dir, exist_ok=True)
+                    shutil.move(entry.path, os.path.join(target_dir, entry.name))
+                    moved += 1
+                except OSError as e:
+                    logger.warning(f"디버그 산출물 이동 실패: {entry.path} ({e})")
+
+        if moved:
+            logger.info(f"🧹 미디어 폴더의 디버그 산출물 {moved}개를 {self.debug_folder}로 이동")
+
+        return moved
+
+    def _scan(self, policy):
+        """정책 대상 파일 목록 (경로, 크기, 마지막 접근 시각)"""
+        files = []
+
+        if not os.path.isdir(policy.directory):
+            return files
+
+        for entry in os.scandir(policy.directory):
+            try:
+                if not entry.is_file() or not policy.matches(entry.name):
+                    continue
+                stat = entry.stat()
+                files.append({
+                    'path': entry.path,
+                    'size': stat.st_size,
+                    'last_access': self._last_access(entry.path, stat)
+                })
+            except OSError:
+                continue
+
+        return files
+
+    def _delete(self, path):
+        try:
+            os.remove(path)
+            self._forget(path)
+            return True
+        except FileNotFoundError:
+            self._forget(path)
+            return False
+        except OSError as e:
+            logger.warning(f"파일 삭제 실패: {path} ({e})")
+            return False
+
+    def apply_policy(self, policy, now=None):
+        """단일 정책 적용 (나이 제한 → 용량 제한 순서)"""
+        now = now or time.time()
+        files = self._scan(policy)
+
+        report = {
+            'category': policy.name,
+            'scanned': len(files),
+            'deleted_by_age': 0,
+            'deleted_by_quota': 0,
+            'freed_bytes': 0,
+            'remaining_bytes': 0
+        }
+
+        # 1. 나이 제한
+        if policy.max_age_days:
+            cutoff = now - policy.max_age_days * 86400
+            kept = []
+            for info in files:
+                if info['last_access'] < cutoff and self._delete(info['path']):
+                    report['deleted_by_age'] += 1
+                    report['freed_bytes'] += info['size']
+                else:
+                    kept.append(info)
+            files = kept
+
+        # 2. 용량 제한 (LRU)
+        total_size = sum(info['size'] for info in files)
+        if policy.max_size_mb:
+            quota = policy.max_size_mb * 1024 * 1024
+            if total_size > quota:
+                files.sort(key=lambda x: x['last_access'])
+                for info in files:
+                    if total_size <= quota:
+                        break
+                    if self._delete(info['path']):
+                        report['deleted_by_quota'] += 1
+                        report['freed_bytes'] += info['size']
+                        total_size -= info['size']
+
+        report['remaining_bytes'] = total_size
+        return report
+
+    def sweep(self):
+        """전체 카테고리 정리"""
+        with self._sweep_lock:
+            started = time.time()
+            migrated = self.migrate_legacy_artifacts()
+
+            categories = []
+            for policy in self.policies:
+                try:
+                    categories.append(self.apply_policy(policy, now=started))
+                except Exception as e:
+                    logger.error(f"보존 정책 적용 오류 ({policy.name}): {str(e)}")
+                    categories.append({'category': policy.name, 'error': str(e)})
+
+            deleted = sum(c.get('deleted_by_age', 0) + c.get('deleted_by_quota', 0) for c in categories)
+            freed = sum(c.get('freed_bytes', 0) for c in categories)
+
+            self.last_report = {
+                'started_at': started,
+                'elapsed_seconds': round(time.time() - started, 3),
+                'migrated': migrated,
+                'deleted': deleted,
+                'freed_bytes': freed,
+                'categories': categories
+            }
+
+            if deleted or migrated:
+                logger.info(f"🧹 보존 정책 정리 완료: {deleted}개 삭제, {freed:,} bytes 확보")
+
+            return self.last_report
+
+    def get_status(self):
+        return {
+            'policies': [policy.to_dict() for policy in self.policies],
+            'last_report': self.last_report
+        }
+
+
+class RetentionDaemon(threading.Thread):
+    """보존 정책을 주기적으로 적용하는 백그라운드 스레드"""
+
+    def __init__(self, service, interval_seconds=3600):
+        super().__init__(name='retention-daemon', daemon=True)
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+
+    def run(self):
+        logger.info(f"🧹 보존 정책 데몬 시작 (주기: {self.interval_seconds}초)")
+
+        while not self._stop_event.is_set():
+            try:
+                self.service.sweep()
+            except Exception as e:
+                logger.error(f"보존 정책 정리 중 오류: {str(e)}")
+
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def init_retention(app):
+    """Flask 앱에 보존 정책 서비스 등록 및 데몬 시작"""
+    service = RetentionService(
+        app.config['UPLOAD_FOLDER'],
+        app.config['DEBUG_FOLDER'],
+        build_default_policies(
+            app.config['UPLOAD_FOLDER'],
+            app.config['DEBUG_FOLDER'],
+            app.config.get('RETENTION_POLICIES'),
+            app.config.get('WORKFLOW_CACHE_FOLDER')
+        )
+    )
+    app.extensions['retention'] = service
+
+    # 디버그 리로더의 감시 프로세스에서는 데몬을 띄우지 않음
+    is_reloader_parent = app.config.get('DEBUG') and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+    if app.config.get('RETENTION_ENABLED') and not is_reloader_parent:
+        daemon = RetentionDaemon(service, app.config.get('RETENTION_INTERVAL_SECONDS', 3600))
+        daemon.start()
+        app.extensions['retention_daemon'] = daemon
+
+    return service
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+import logging
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+from .job_store import current_job_id, get_job_store
+
+logger = logging.getLogger(__name__)
+
+# 현재 실행 중인 (trace, span)
+_current = contextvars.ContextVar('current_span', default=None)
+
+_recent_traces = deque(maxlen=Config.TRACE_BUFFER_SIZE)
+_export_lock = threading.Lock()
+
+
+def _new_span(trace, name, parent, attributes):
+    return {
+        'trace_id': trace['trace_id'],
+        'span_id': uuid.uuid4().hex[:16],
+        'parent_span_id': parent['span_id'] if parent else None,
+        'name': name,
+        'start_time': time.time(),
+        'end_time': None,
+        'duration_ms': None,
+        'attributes': dict(attributes),
+        'events': [],
+        'status': 'ok',
+        'error': None
+    }
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    단계 실행 구간 기록
+
+    진행 중인 span이 없으면 새 trace의 루트 span이 되며, 루트 span이 끝나면 trace가 완성되어
+    현재 작업 기록(jobs.traces), 최근 trace 목록, 내보내기 파일(TRACE_EXPORT_PATH)에 저장됩니다.
+
+    사용 예:
+        with span('imagefx.input_prompt', prompt_length=len(prompt)):
+            await self._input_prompt(page, prompt)
+    """
+    if not Config.TRACING_ENABLED:
+        yield None
+        return
+
+    current = _current.get()
+    if current is None:
+        trace = {'trace_id': uuid.uuid4().hex, 'name': name, 'job_id': current_job_id.get(), 'spans': []}
+        parent = None
+    else:
+        trace, parent = current
+
+    record = _new_span(trace, name, parent, attributes)
+    token = _current.set((trace, record))
+    try:
+        yield record
+    except BaseException as e:
+        record['status'] = 'error'
+        record['error'] = str(e) or type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        record['end_time'] = time.time()
+        record['duration_ms'] = round((record['end_time'] - record['start_time']) * 1000, 1)
+        trace['spans'].append(record)
+        if parent is None:
+            _finish_trace(trace, record)
+
+
+def set_attribute(key, value):
+    """현재 span에 속성 추가 (span 밖이면 무시)"""
+    current = _current.get()
+    if current is not None:
+        current[1]['attributes'][key] = value
+
+
+def add_event(name, **attributes):
+    """현재 span에 시점 이벤트 추가 (예: 다운로드 버튼 발견)"""
+    current = _current.get()
+    if current is not None:
+        current[1]['events'].append({'name': name, 'time': time.time(), 'attributes': attributes})
+
+
+def mark_error(message):
+    """예외 없이 실패한 단계 표시 (오류 결과 dict를 반환하는 경우)"""
+    current = _current.get()
+    if current is not None:
+        current[1]['status'] = 'error'
+        current[1]['error'] = message
+
+
+def summarize(trace):
+    """단계 이름별 소요 시간 합계 (느린 순)"""
+    totals = {}
+    for record in trace['spans']:
+        if record['parent_span_id'] is None:
+            continue
+        entry = totals.setdefault(record['name'], {'name': record['name'], 'count': 0, 'total_ms': 0.0})
+        entry['count'] += 1
+        entry['total_ms'] = round(entry['total_ms'] + record['duration_ms'], 1)
+    return sorted(totals.values(), key=lambda entry: entry['total_ms'], reverse=True)
+
+
+def _finish_trace(trace, root):
+    trace['spans'].sort(key=lambda record: record['start_time'])
+    trace['duration_ms'] = root['duration_ms']
+    trace['status'] = root['status']
+    trace['summary'] = summarize(trace)
+
+    _recent_traces.append(trace)
+
+    if trace['job_id']:
+        try:
+            get_job_store().append_trace(trace['job_id'], trace)
+        except Exception as e:
+            logger.warning(f"trace 저장 실패 ({trace['job_id']}): {e}")
+
+    if Config.TRACE_EXPORT_PATH:
+        _export(trace)
+
+    slowest = ', '.join(f"{entry['name']} {entry['total_ms'] / 1000:.1f}s" for entry in trace['summary'][:3])
+    logger.info(f"🧭 trace 완료: {trace['name']} {trace['duration_ms'] / 1000:.1f}초 (느린 단계: {slowest or '-'})")
+
+
+def _export(trace):
+    """OTLP/JSON 한 줄씩 파일에 추가 (OpenTelemetry Collector의 file 수신기 형식)"""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(Config.TRACE_EXPORT_PATH)), exist_ok=True)
+        line = json.dumps(to_otlp([trace]), ensure_ascii=False)
+        with _export_lock:
+            with open(Config.TRACE_EXPORT_PATH, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+    except OSError as e:
+        logger.warning(f"trace 내보내기 실패: {e}")
+
+
+def recent_traces(limit=20):
+    """최근 완료된 trace 목록 (최신순)"""
+    return list(_recent_traces)[-limit:][::-1]
+
+
+def find_trace(trace_id):
+    return next((trace for trace in _recent_traces if trace['trace_id'] == trace_id), None)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _nanos(seconds):
+    return str(int(seconds * 1_000_000_000))
+
+
+def to_otlp(traces):
+    """trace 목록을 OTLP/JSON(ExportTraceServiceRequest) 형식으로 변환"""
+    spans = []
+    for trace in traces:
+        for record in trace['spans']:
+            otlp_span = {
+                'traceId': record['trace_id'],
+                'spanId': record['span_id'],
+                'name': record['name'],
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': _nanos(record['start_time']),
+                'endTimeUnixNano': _nanos(record['end_time']),
+                'attributes': _otlp_attributes({**record['attributes'], 'job.id': trace.get('job_id')}),
+                'events': [
+                    {
+                        'timeUnixNano': _nanos(event['time']),
+                        'name': event['name'],
+                        'attributes': _otlp_attributes(event['attributes'])
+                    }
+                    for event in record['events']
+                ],
+                # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+                'status': {'code': 2, 'message': record['error']} if record['status'] == 'error' else {'code': 1}
+            }
+            if record['parent_span_id']:
+                otlp_span['parentSpanId'] = record['parent_span_id']
+            spans.append(otlp_span)
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': 'imageauto'})},
+            'scopeSpans': [{'scope': {'name': 'imageauto.tracing'}, 'spans': spans}]
+        }]
+    }
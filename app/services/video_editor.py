@@ -1,16 +1,27 @@
 import os
-import ffmpeg
 import logging
 from datetime import datetime
 import subprocess
+from .retention_service import get_debug_dir
+from .progress_bus import report_progress
+from .metrics import observe_edit
 
 logger = logging.getLogger(__name__)
 
+
+# ffmpeg-python은 앱 시작 시간을 줄이기 위해 편집 기능을 처음 사용할 때 import합니다.
+def _ffmpeg():
+    """ffmpeg-python 모듈 (각 편집 메서드의 try 안에서 호출하므로 설치되지 않았으면 오류 결과로 반환됨)"""
+    import ffmpeg
+    return ffmpeg
+
+
 class VideoEditor:
     def __init__(self):
         self.output_dir = os.path.join(os.path.dirname(__file__), '../../../../uploads/edited')
         os.makedirs(self.output_dir, exist_ok=True)
         
+    @observe_edit('add_subtitles')
     def add_subtitles(self, video_path, subtitles, font_size=24, font_color='white', position='bottom'):
         """
         동영상에 자막을 추가합니다.
@@ -26,10 +37,11 @@ class VideoEditor:
             dict: 편집된 동영상 정보
         """
         try:
-            # SRT 파일 생성
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ffmpeg = _ffmpeg()
+            # SRT 파일 생성 (중간 파일은 디버그 트리에 저장, 보존 정책으로 정리됨)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             srt_filename = f"subtitles_{timestamp}.srt"
-            srt_path = os.path.join(self.output_dir, srt_filename)
+            srt_path = os.path.join(get_debug_dir('subtitles'), srt_filename)
             
             with open(srt_path, 'w', encoding='utf-8') as f:
                 for idx, subtitle in enumerate(subtitles, 1):
@@ -52,12 +64,13 @@ class VideoEditor:
             subtitle_filter = f"subtitles={srt_path}:force_style='FontSize={font_size},PrimaryColour=&H{self._color_to_hex(font_color)}&,Alignment=2'"
             
             # FFmpeg 실행
-            (
+            self._run_ffmpeg(
                 ffmpeg
                 .input(video_path)
                 .output(output_path, vf=subtitle_filter, codec='libx264', audio_codec='aac')
-                .overwrite_output()
-                .run()
+                .overwrite_output(),
+                self._probe_duration(video_path),
+                '자막 추가'
             )
             
             return {
@@ -74,6 +87,7 @@ class VideoEditor:
                 'error': str(e)
             }
     
+    @observe_edit('trim')
     def trim_video(self, video_path, start_time, end_time):
         """
         동영상을 자릅니다.
@@ -87,16 +101,18 @@ class VideoEditor:
             dict: 편집된 동영상 정보
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ffmpeg = _ffmpeg()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             output_filename = f"trimmed_{timestamp}.mp4"
             output_path = os.path.join(self.output_dir, output_filename)
             
-            (
+            self._run_ffmpeg(
                 ffmpeg
                 .input(video_path, ss=start_time, t=end_time-start_time)
                 .output(output_path, codec='copy')
-                .overwrite_output()
-                .run()
+                .overwrite_output(),
+                end_time - start_time,
+                '동영상 자르기'
             )
             
             return {
@@ -113,6 +129,7 @@ class VideoEditor:
                 'error': str(e)
             }
     
+    @observe_edit('merge')
     def merge_videos(self, video_paths):
         """
         여러 동영상을 하나로 합칩니다.
@@ -124,7 +141,8 @@ class VideoEditor:
             dict: 편집된 동영상 정보
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ffmpeg = _ffmpeg()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             output_filename = f"merged_{timestamp}.mp4"
             output_path = os.path.join(self.output_dir, output_filename)
             
@@ -132,12 +150,14 @@ class VideoEditor:
             inputs = [ffmpeg.input(path) for path in video_paths]
             
             # 동영상 합치기
-            (
+            durations = [self._probe_duration(path) for path in video_paths]
+            self._run_ffmpeg(
                 ffmpeg
                 .concat(*inputs, v=1, a=1)
                 .output(output_path, codec='libx264', audio_codec='aac')
-                .overwrite_output()
-                .run()
+                .overwrite_output(),
+                sum(durations) if all(durations) else None,
+                '동영상 합치기'
             )
             
             return {
@@ -154,6 +174,7 @@ class VideoEditor:
                 'error': str(e)
             }
     
+    @observe_edit('add_watermark')
     def add_watermark(self, video_path, watermark_path, position='bottom-right', opacity=0.5):
         """
         동영상에 워터마크를 추가합니다.
@@ -168,7 +189,8 @@ class VideoEditor:
             dict: 편집된 동영상 정보
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ffmpeg = _ffmpeg()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             output_filename = f"watermarked_{timestamp}.mp4"
             output_path = os.path.join(self.output_dir, output_filename)
             
@@ -184,7 +206,7 @@ class VideoEditor:
             overlay_position = positions.get(position, positions['bottom-right'])
             
             # FFmpeg 실행
-            (
+            self._run_ffmpeg(
                 ffmpeg
                 .input(video_path)
                 .overlay(
@@ -193,8 +215,9 @@ class VideoEditor:
                     **{'enable': f'between(t,0,20)', 'alpha': opacity}
                 )
                 .output(output_path, codec='libx264', audio_codec='aac')
-                .overwrite_output()
-                .run()
+                .overwrite_output(),
+                self._probe_duration(video_path),
+                '워터마크 추가'
             )
             
             return {
@@ -211,6 +234,88 @@ class VideoEditor:
                 'error': str(e)
             }
     
+    @observe_edit('thumbnail')
+    def extract_thumbnail(self, video_path, time=1.0, width=None):
+        """
+        동영상에서 썸네일 이미지를 추출합니다.
+        
+        Args:
+            video_path (str): 입력 동영상 경로
+            time (float): 추출할 프레임 위치 (초)
+            width (int): 썸네일 너비 (None이면 원본 크기, 높이는 비율 유지)
+            
+        Returns:
+            dict: 추출된 썸네일 정보
+        """
+        try:
+            ffmpeg = _ffmpeg()
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            output_filename = f"thumbnail_{timestamp}.jpg"
+            output_path = os.path.join(self.output_dir, output_filename)
+            
+            stream = ffmpeg.input(video_path, ss=time)
+            if width:
+                stream = stream.filter('scale', width, -2)
+            
+            (
+                stream
+                .output(output_path, vframes=1)
+                .overwrite_output()
+                .run()
+            )
+            
+            return {
+                'status': 'success',
+                'filename': output_filename,
+                'filepath': output_path,
+                'time': time
+            }
+            
+        except Exception as e:
+            logger.error(f"썸네일 추출 중 오류 발생: {str(e)}")
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def _run_ffmpeg(self, stream, total_seconds, label):
+        """
+        FFmpeg 실행 (진행률 보고)
+        
+        -progress 출력의 out_time을 전체 길이와 비교해 진행률을 보고합니다.
+        """
+        ffmpeg = _ffmpeg()
+        
+        report_progress('edit', 0, f"{label} 중...")
+        
+        process = (
+            stream
+            .global_args('-progress', 'pipe:1', '-nostats')
+            .run_async(pipe_stdout=True)
+        )
+        
+        for raw_line in process.stdout:
+            key, _, value = raw_line.decode('utf-8', errors='ignore').strip().partition('=')
+            if key != 'out_time_us' or not value.isdigit():
+                continue
+            
+            out_seconds = int(value) / 1_000_000
+            percent = out_seconds / total_seconds * 100 if total_seconds else None
+            report_progress('edit', percent, f"{label} 중...", out_time=round(out_seconds, 2))
+        
+        if process.wait() != 0:
+            raise ffmpeg.Error('ffmpeg', None, None)
+        
+        report_progress('edit', 100, f"{label} 완료")
+    
+    def _probe_duration(self, path):
+        """동영상 길이(초) (확인할 수 없으면 None)"""
+        try:
+            ffmpeg = _ffmpeg()
+            return float(ffmpeg.probe(path)['format']['duration'])
+        except Exception:
+            return None
+    
     def _seconds_to_srt_time(self, seconds):
         """초를 SRT 시간 형식으로 변환"""
         hours = int(seconds // 3600)
@@ -0,0 +1,264 @@
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+import logging
+import contextvars
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 단계 액션별 입력(다른 단계 결과 참조)과 파라미터 정의
+STEP_ACTIONS = {
+    'generate_image': {'inputs': (), 'async': True},
+    'generate_video': {'inputs': ('image_path',), 'async': True},
+    'trim': {'inputs': ('video_path',), 'async': False},
+    'merge': {'inputs': ('video_paths',), 'async': False},
+    'subtitle': {'inputs': ('video_path',), 'async': False},
+    'watermark': {'inputs': ('video_path', 'watermark_path'), 'async': False},
+    'thumbnail': {'inputs': ('video_path',), 'async': False},
+    # 기존 edit_options 형식({'action', 'params'})을 그대로 쓰는 편집 단계
+    'edit': {'inputs': ('video_path',), 'async': False}
+}
+
+
+class WorkflowValidationError(ValueError):
+    """워크플로우 정의 오류"""
+    pass
+
+
+class StepResultCache:
+    """
+    단계 결과 캐시
+
+    단계의 액션, 파라미터, 입력 파일 경로로 만든 키마다 결과를 JSON 파일로 저장합니다.
+    결과 파일이 보존 정책 등으로 삭제되었으면 캐시 미스로 처리합니다.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or Config.WORKFLOW_CACHE_FOLDER
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"단계 캐시 읽기 실패: {path} ({e})")
+            return None
+
+        if result.get('filepath') and not os.path.exists(result['filepath']):
+            return None
+        return result
+
+    def set(self, key, result):
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+class WorkflowEngine:
+    """
+    DAG 워크플로우 실행기
+
+    워크플로우 정의 예시:
+        {
+            "workflow_id": "campaign-01",
+            "steps": {
+                "image": {"action": "generate_image", "params": {"prompt": "..."}},
+                "zoom": {"action": "generate_video", "inputs": {"image_path": "image"}, "params": {"prompt": "zoom in"}},
+                "pan": {"action": "generate_video", "inputs": {"image_path": "image"}, "params": {"prompt": "pan left"}},
+                "merged": {"action": "merge", "inputs": {"video_paths": ["zoom", "pan"]}},
+                "thumb": {"action": "thumbnail", "inputs": {"video_path": "merged"}, "params": {"time": 1}}
+            }
+        }
+
+    inputs의 값은 다른 단계 ID이며 실행 시 해당 단계 결과의 filepath로 바뀝니다.
+    같은 workflow_id로 다시 실행하면 완료된 단계는 캐시에서 복원되고 실패한 단계부터 재개됩니다.
+    """
+
+    def __init__(self, media_service, cache=None):
+        self.media_service = media_service
+        self.cache = cache or StepResultCache()
+
+    def validate(self, workflow):
+        """정의 검증 후 위상 정렬된 단계 ID 목록 반환"""
+        steps = workflow.get('steps') if isinstance(workflow, dict) else None
+        if not isinstance(steps, dict) or not steps:
+            raise WorkflowValidationError('steps 정의가 필요합니다.')
+
+        dependencies = {}
+        for step_id, step in steps.items():
+            if not isinstance(step, dict) or step.get('action') not in STEP_ACTIONS:
+                raise WorkflowValidationError(f"'{step_id}' 단계의 action이 올바르지 않습니다.")
+
+            allowed_inputs = STEP_ACTIONS[step['action']]['inputs']
+            deps = set()
+            for name, ref in (step.get('inputs') or {}).items():
+                if name not in allowed_inputs:
+                    raise WorkflowValidationError(f"'{step_id}' 단계에서 지원하지 않는 입력입니다: {name}")
+                for dep in (ref if isinstance(ref, list) else [ref]):
+                    if dep not in steps:
+                        raise WorkflowValidationError(f"'{step_id}' 단계가 존재하지 않는 단계를 참조합니다: {dep}")
+                    deps.add(dep)
+            dependencies[step_id] = deps
+
+        # 위상 정렬 (순환 참조 검사)
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(step_id):
+            if step_id in visited:
+                return
+            if step_id in visiting:
+                raise WorkflowValidationError(f"순환 참조가 있습니다: {step_id}")
+            visiting.add(step_id)
+            for dep in sorted(dependencies[step_id]):
+                visit(dep)
+            visiting.discard(step_id)
+            visited.add(step_id)
+            order.append(step_id)
+
+        for step_id in steps:
+            visit(step_id)
+
+        return order
+
+    def _cache_key(self, namespace, step, inputs):
+        payload = json.dumps({
+            'namespace': namespace,
+            'action': step['action'],
+            'params': step.get('params') or {},
+            'inputs': inputs
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def run(self, workflow):
+        """
+        워크플로우 실행
+
+        Returns:
+            dict: {'status', 'workflow_id', 'steps': {단계 ID: {'status', 'cached', 'result' 또는 'error'}}}
+        """
+        order = self.validate(workflow)
+        steps = workflow['steps']
+        workflow_id = workflow.get('workflow_id') or uuid.uuid4().hex
+        # 발급한 ID는 실패해서 재개할 때만 다시 쓰이므로, 단계 결과를 모아 두었다가 실패한 경우에만 저장
+        persistent = bool(workflow.get('workflow_id'))
+        unsaved = {}
+
+        tasks = {}
+        report = {}
+        # 같은 키의 단계는 한 번만 실행 (키 → 실행 중인 태스크)
+        inflight = {}
+
+        async def run_step(step_id):
+            step = steps[step_id]
+
+            # 선행 단계 완료 대기
+            resolved_inputs = {}
+            for name, ref in (step.get('inputs') or {}).items():
+                refs = ref if isinstance(ref, list) else [ref]
+                upstream = [await tasks[dep] for dep in refs]
+                if any(result is None for result in upstream):
+                    report[step_id] = {'status': 'skipped', 'error': '선행 단계가 실패했습니다.'}
+                    return None
+                paths = [result['filepath'] for result in upstream]
+                resolved_inputs[name] = paths if isinstance(ref, list) else paths[0]
+
+            key = self._cache_key(workflow_id, step, resolved_inputs)
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"♻️ 워크플로우 단계 캐시 사용: {step_id} ({step['action']})")
+                report[step_id] = {'status': 'success', 'cached': True, 'cache_key': key, 'result': cached}
+                return cached
+
+            if key not in inflight:
+                inflight[key] = asyncio.ensure_future(self._execute(step, resolved_inputs))
+            try:
+                result = await inflight[key]
+            except Exception as e:
+                logger.error(f"워크플로우 단계 오류 ({step_id}): {str(e)}")
+                result = {'status': 'error', 'error': str(e)}
+
+            if result.get('status') != 'success':
+                report[step_id] = {'status': 'error', 'cached': False, 'error': result.get('error', '알 수 없는 오류')}
+                return None
+
+            if persistent:
+                self.cache.set(key, result)
+            else:
+                unsaved[key] = result
+            report[step_id] = {'status': 'success', 'cached': False, 'cache_key': key, 'result': result}
+            return result
+
+        for step_id in order:
+            tasks[step_id] = asyncio.ensure_future(run_step(step_id))
+
+        await asyncio.gather(*tasks.values())
+
+        failed = [step_id for step_id in order if report[step_id]['status'] != 'success']
+        if failed:
+            for key, result in unsaved.items():
+                self.cache.set(key, result)
+        return {
+            'status': 'error' if failed else 'success',
+            'workflow_id': workflow_id,
+            'failed_steps': failed,
+            'steps': {step_id: report[step_id] for step_id in order}
+        }
+
+    async def _execute(self, step, inputs):
+        """단계 액션 실행"""
+        action = step['action']
+        params = dict(step.get('params') or {})
+        media_service = self.media_service
+        editor = media_service.video_editor
+
+        if action == 'generate_image':
+            return await media_service.scheduler.run_with_limit(
+                lambda: media_service.generate_image(
+                    params['prompt'], params.get('aspect_ratio', '9:16'), params.get('all_variants', False)
+                ),
+                resource='browser'
+            )
+
+        if action == 'generate_video':
+            prompt = params.pop('prompt', '')
+            return await media_service.generate_video(inputs['image_path'], prompt, **params)
+
+        # 워터마크 이미지는 다른 단계 결과 또는 파라미터의 파일 경로
+        watermark_path = params.pop('watermark_path', None)
+        if action == 'watermark':
+            watermark_path = inputs.get('watermark_path') or watermark_path
+            if not watermark_path:
+                return {'status': 'error', 'error': 'watermark_path가 필요합니다.'}
+
+        # 편집 단계는 동기 FFmpeg 작업이므로 스레드 풀에서 실행
+        # (진행률 보고에 쓰이는 작업 컨텍스트를 스레드로 전달)
+        handlers = {
+            'trim': lambda: editor.trim_video(inputs['video_path'], **params),
+            'merge': lambda: editor.merge_videos(inputs['video_paths']),
+            'subtitle': lambda: editor.add_subtitles(inputs['video_path'], **params),
+            'watermark': lambda: editor.add_watermark(inputs['video_path'], watermark_path, **params),
+            'thumbnail': lambda: editor.extract_thumbnail(inputs['video_path'], **params),
+            'edit': lambda: media_service.edit_video(inputs['video_path'], params)
+        }
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await media_service.scheduler.run_with_limit(
+            lambda: loop.run_in_executor(None, context.run, handlers[action]),
+            resource='ffmpeg'
+        )
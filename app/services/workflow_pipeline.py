@@ -0,0 +1,149 @@
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 파이프라인 단계 순서
+STAGES = ('image', 'video', 'edit')
+
+# 큐 종료 표시
+_STOP = object()
+
+
+class WorkflowPipeline:
+    """
+    다중 항목 워크플로우 파이프라인 (이미지 생성 → 동영상 생성 → 편집)
+
+    단계마다 독립적인 워커 풀이 있고 단계 사이는 큐로 연결됩니다.
+    항목 k의 동영상이 렌더링되는 동안 항목 k+1의 이미지 생성과 항목 k-1의 편집이
+    동시에 진행되므로 전체 처리량은 단계 합이 아니라 가장 느린 단계에 의해 결정됩니다.
+    """
+
+    def __init__(self, media_service, workers=None):
+        self.media_service = media_service
+        workers = workers or {}
+        self.workers = {stage: max(1, int(workers.get(stage, 1))) for stage in STAGES}
+
+    async def run(self, items):
+        """
+        파이프라인 실행
+
+        Args:
+            items (list): [{'image_prompt', 'video_prompt', 'aspect_ratio', 'video_options', 'edit_options'}, ...]
+
+        Yields:
+            dict: 완료(또는 실패)되는 순서대로 항목별 결과
+        """
+        queues = {stage: asyncio.Queue() for stage in STAGES}
+        results = asyncio.Queue()
+
+        async def stage_worker(stage, next_stage):
+            while True:
+                job = await queues[stage].get()
+                if job is _STOP:
+                    return
+
+                started = time.time()
+                try:
+                    ok = await self._run_stage(stage, job)
+                except Exception as e:
+                    logger.error(f"파이프라인 {stage} 단계 오류 (#{job['index']}): {str(e)}")
+                    job['error'] = str(e)
+                    ok = False
+                job['timings'][stage] = round(time.time() - started, 3)
+
+                if not ok:
+                    job['status'] = 'error'
+                    job['failed_stage'] = stage
+                    await results.put(job)
+                elif next_stage and (next_stage != 'edit' or job['edit_options']):
+                    await queues[next_stage].put(job)
+                else:
+                    job['status'] = 'success'
+                    await results.put(job)
+
+        async def run_stage_pool(index):
+            stage = STAGES[index]
+            next_stage = STAGES[index + 1] if index + 1 < len(STAGES) else None
+
+            await asyncio.gather(*[
+                stage_worker(stage, next_stage) for _ in range(self.workers[stage])
+            ])
+
+            # 이 단계의 워커가 모두 끝나면 다음 단계에 종료 신호 전달
+            if next_stage:
+                for _ in range(self.workers[next_stage]):
+                    await queues[next_stage].put(_STOP)
+
+        for index, item in enumerate(items):
+            await queues['image'].put({
+                'index': index,
+                'image_prompt': item['image_prompt'],
+                'video_prompt': item['video_prompt'],
+                'aspect_ratio': item.get('aspect_ratio', '9:16'),
+                'video_options': item.get('video_options') or {},
+                'edit_options': item.get('edit_options'),
+                'timings': {}
+            })
+        for _ in range(self.workers['image']):
+            await queues['image'].put(_STOP)
+
+        pools = [asyncio.ensure_future(run_stage_pool(i)) for i in range(len(STAGES))]
+
+        try:
+            for _ in range(len(items)):
+                yield self._format_result(await results.get())
+        finally:
+            for pool in pools:
+                pool.cancel()
+
+    async def _run_stage(self, stage, job):
+        """단계 실행 (성공 여부 반환, 결과는 job에 기록)"""
+        media_service = self.media_service
+
+        if stage == 'image':
+            result = await media_service.scheduler.run_with_limit(
+                lambda: media_service.generate_image(job['image_prompt'], job['aspect_ratio']),
+                resource='browser'
+            )
+            job['image'] = result
+
+        elif stage == 'video':
+            result = await media_service.generate_video(
+                job['image']['filepath'],
+                job['video_prompt'],
+                **job['video_options']
+            )
+            job['video'] = result
+
+        else:
+            # FFmpeg 편집은 동기 작업이므로 스레드 풀에서 실행 (프로세스 전체 FFmpeg 동시 실행 제한 적용)
+            loop = asyncio.get_running_loop()
+            result = await media_service.scheduler.run_with_limit(
+                lambda: loop.run_in_executor(
+                    None, media_service.edit_video, job['video']['filepath'], job['edit_options']
+                ),
+                resource='ffmpeg'
+            )
+            job['edited_video'] = result
+
+        if result.get('status') != 'success':
+            job['error'] = result.get('error', '알 수 없는 오류')
+            return False
+        return True
+
+    def _format_result(self, job):
+        result = {
+            'index': job['index'],
+            'status': job['status'],
+            'image': job.get('image'),
+            'video': job.get('video'),
+            'timings': job['timings']
+        }
+        if job.get('edited_video'):
+            result['edited_video'] = job['edited_video']
+        if job['status'] != 'success':
+            result['failed_stage'] = job.get('failed_stage')
+            result['error'] = job.get('error')
+        return result
@@ -144,26 +144,17 @@ function startImageGeneration(data) {
         progressContainer.scrollIntoView({ behavior: 'smooth' });
     }
     
-    // Simulate progress
-    simulateImageProgress();
-    
-    // Make API call
-    fetch('/api/generate/image', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
+    // 작업 등록 후 실제 진행 상황 수신
+    submitJob('image', data)
+    .then(jobId => watchJobProgress(jobId, {
+        fill: 'image-progress-fill',
+        percentage: 'image-progress-percentage',
+        message: 'image-progress-message'
+    }))
     .then(result => {
-        if (result.success) {
-            showImageResult(result);
-            showMessage('이미지가 성공적으로 생성되었습니다!', 'success');
-            loadRecentImages(); // Refresh recent images
-        } else {
-            throw new Error(result.error || '이미지 생성에 실패했습니다.');
-        }
+        showImageResult(result);
+        showMessage('이미지가 성공적으로 생성되었습니다!', 'success');
+        loadRecentImages(); // Refresh recent images
     })
     .catch(error => {
         showMessage('오류: ' + error.message, 'error');
@@ -180,54 +171,6 @@ function startImageGeneration(data) {
     });
 }
 
-function simulateImageProgress() {
-    const progressFill = document.getElementById('image-progress-fill');
-    const progressPercentage = document.getElementById('image-progress-percentage');
-    const progressMessage = document.getElementById('image-progress-message');
-    
-    const messages = [
-        'AI가 프롬프트를 분석하고 있습니다...',
-        '이미지 구성을 계획하고 있습니다...',
-        '세부 사항을 렌더링하고 있습니다...',
-        '최종 이미지를 생성하고 있습니다...'
-    ];
-    
-    let progress = 0;
-    let messageIndex = 0;
-    
-    const interval = setInterval(() => {
-        progress += Math.random() * 12 + 8;
-        
-        if (progress > 100) {
-            progress = 100;
-            clearInterval(interval);
-        }
-        
-        if (progressFill) {
-            progressFill.style.width = progress + '%';
-        }
-        
-        if (progressPercentage) {
-            progressPercentage.textContent = Math.round(progress) + '%';
-        }
-        
-        // Update message
-        const newMessageIndex = Math.floor(progress / 25);
-        if (newMessageIndex !== messageIndex && newMessageIndex < messages.length) {
-            messageIndex = newMessageIndex;
-            if (progressMessage) {
-                progressMessage.textContent = messages[messageIndex];
-            }
-        }
-        
-        if (progress >= 100) {
-            if (progressMessage) {
-                progressMessage.textContent = '완료!';
-            }
-        }
-    }, 150);
-}
-
 function showImageResult(data) {
     const resultContainer = document.getElementById('image-result');
     const resultContent = document.getElementById('image-result-content');
@@ -104,7 +104,79 @@ function downloadFile(path) {
     window.open(`/uploads/${path}`, '_blank');
 }
 
+// 작업 등록 (job_id 반환)
+function submitJob(kind, params, priority = 'interactive') {
+    return fetch('/api/jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ kind: kind, params: params, priority: priority })
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (!result.success) {
+            throw new Error(result.error || '작업 등록에 실패했습니다.');
+        }
+        return result.job_id;
+    });
+}
+
+// 작업 진행 상황을 SSE로 받아 진행 표시줄에 반영하고, 작업 결과로 resolve
+function watchJobProgress(jobId, elements = {}) {
+    const progressFill = document.getElementById(elements.fill);
+    const progressPercentage = document.getElementById(elements.percentage);
+    const progressMessage = document.getElementById(elements.message);
+    
+    const setProgress = (percent, message) => {
+        if (percent !== undefined && percent !== null) {
+            if (progressFill) progressFill.style.width = percent + '%';
+            if (progressPercentage) progressPercentage.textContent = Math.round(percent) + '%';
+        }
+        if (message && progressMessage) {
+            progressMessage.textContent = message;
+        }
+    };
+    
+    setProgress(0, '작업 대기 중...');
+    
+    return new Promise((resolve, reject) => {
+        // EventSource는 연결이 끊기면 Last-Event-ID로 자동 재연결
+        const source = new EventSource(`/api/jobs/${jobId}/events`);
+        let lastPercent = 0;
+        
+        source.addEventListener('progress', event => {
+            const data = JSON.parse(event.data);
+            // 단계가 바뀌어도 진행 표시줄이 뒤로 가지 않도록 유지
+            if (data.percent !== undefined) {
+                lastPercent = Math.max(lastPercent, data.percent);
+            }
+            setProgress(lastPercent, data.message);
+        });
+        
+        source.addEventListener('done', event => {
+            const data = JSON.parse(event.data);
+            source.close();
+            
+            if (data.status === 'succeeded') {
+                setProgress(100, '완료!');
+                resolve(data.result);
+            } else {
+                reject(new Error((data.result && data.result.error) || '작업이 실패했습니다.'));
+            }
+        });
+        
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                reject(new Error('진행 상황 연결이 끊어졌습니다.'));
+            }
+        };
+    });
+}
+
 // Make functions globally available
 window.showLoading = showLoading;
 window.hideLoading = hideLoading;
 window.downloadFile = downloadFile;
+window.submitJob = submitJob;
+window.watchJobProgress = watchJobProgress;
@@ -529,25 +529,16 @@ function startVideoGeneration(data, buttonId) {
     // Scroll to progress
     progressContainer.scrollIntoView({ behavior: 'smooth' });
     
-    // Simulate progress
-    simulateProgress();
+    // 이미지 동영상은 작업으로 등록해 실제 진행 상황을 받고,
+    // 그 외 유형은 진행률을 알 수 없으므로 완료까지 안내 메시지만 표시
+    const request = data.type === 'image-to-video'
+        ? submitImageVideoJob(data)
+        : requestVideo(data);
     
-    // Make API call
-    fetch('/api/generate/video', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
+    request
     .then(result => {
-        if (result.success) {
-            showVideoResult(result);
-            showMessage('동영상이 성공적으로 생성되었습니다!', 'success');
-        } else {
-            throw new Error(result.error || '동영상 생성에 실패했습니다.');
-        }
+        showVideoResult(result);
+        showMessage('동영상이 성공적으로 생성되었습니다!', 'success');
     })
     .catch(error => {
         showMessage('오류: ' + error.message, 'error');
@@ -560,43 +551,51 @@ function startVideoGeneration(data, buttonId) {
     });
 }
 
-function simulateProgress() {
+function submitImageVideoJob(data) {
+    const params = {
+        image_path: data.imagePath,
+        prompt: data.prompt,
+        negative_prompt: data.negativePrompt,
+        duration: parseInt(data.duration, 10),
+        mode: 'pro'
+    };
+    
+    return submitJob('video', params)
+    .then(jobId => watchJobProgress(jobId, {
+        fill: 'video-progress-fill',
+        percentage: 'progress-percentage',
+        message: 'progress-message'
+    }))
+    .then(result => ({
+        ...result,
+        title: `이미지 동영상: ${data.prompt.substring(0, 30)}...`,
+        duration: result.duration || params.duration
+    }));
+}
+
+function requestVideo(data) {
     const progressFill = document.getElementById('video-progress-fill');
     const progressPercentage = document.getElementById('progress-percentage');
     const progressMessage = document.getElementById('progress-message');
     
-    const messages = [
-        '프롬프트 분석 중...',
-        'AI 모델 처리 중...',
-        '동영상 렌더링 중...',
-        '최종 처리 중...'
-    ];
+    progressFill.style.width = '0%';
+    progressPercentage.textContent = '';
+    progressMessage.textContent = '동영상 생성 중입니다. 잠시만 기다려주세요...';
     
-    let progress = 0;
-    let messageIndex = 0;
-    
-    const interval = setInterval(() => {
-        progress += Math.random() * 15 + 5;
-        
-        if (progress > 100) {
-            progress = 100;
-            clearInterval(interval);
-        }
-        
-        progressFill.style.width = progress + '%';
-        progressPercentage.textContent = Math.round(progress) + '%';
-        
-        // Update message
-        const newMessageIndex = Math.floor(progress / 25);
-        if (newMessageIndex !== messageIndex && newMessageIndex < messages.length) {
-            messageIndex = newMessageIndex;
-            progressMessage.textContent = messages[messageIndex];
-        }
-        
-        if (progress >= 100) {
-            progressMessage.textContent = '완료!';
+    return fetch('/api/generate/video', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (!result.success) {
+            throw new Error(result.error || '동영상 생성에 실패했습니다.');
         }
-    }, 200);
+        return result;
+    });
 }
 
 function showVideoResult(data) {
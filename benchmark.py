@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+ImageAuto 마이크로 벤치마크
+
+서버 없이 서비스 코드를 직접 호출해 항목별 소요 시간(중앙값/p95)을 측정하고,
+저장한 기준값(baseline)과 비교해 느려진 항목을 보고합니다.
+
+사용 예:
+    # 전체 측정 후 기준값으로 저장
+    python benchmark.py --save-baseline main
+
+    # 변경 후 같은 기준값과 비교 (15% 넘게 느려진 항목이 있으면 종료 코드 1)
+    python benchmark.py --compare main --fail-on-regression
+
+    # 일부 스위트/항목만 측정
+    python benchmark.py --suite image,placeholder --filter 1920x1080 --repeat 10
+
+스위트 (--suite, 기본 전체):
+    image        ImageService.process_image 옵션 조합 × 이미지 크기
+    video_edit   VideoEditor 편집 기능 (ffmpeg로 만든 합성 클립 사용, ffmpeg가 없으면 건너뜀)
+    placeholder  PlaceholderGenerator / PlaceholderVideoGenerator 생성
+    media_list   GET /api/media/list (미디어 파일 1k/10k/100k개)
+
+모든 입력/출력 파일은 임시 폴더에 만들어지며 uploads/, debug/ 폴더는 건드리지 않습니다.
+기준값은 --baseline-dir(기본 reports/benchmarks/)에 <이름>.json으로 저장됩니다.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+import logging
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SUITES = ['image', 'video_edit', 'placeholder', 'media_list']
+
+IMAGE_SIZES = [(640, 480), (1920, 1080), (4096, 2160)]
+
+IMAGE_OPTIONS = {
+    'copy': {},
+    'resize_w800': {'resize': {'width': 800}},
+    'resize_fit512': {'resize': {'width': 512, 'height': 512, 'maintain_ratio': True}},
+    'enhance': {'enhance': {'brightness': 1.1, 'contrast': 1.2, 'color': 1.1, 'sharpness': 1.5}},
+    'filter_blur': {'filter': 'blur'},
+    'filter_emboss': {'filter': 'emboss'},
+    'all': {
+        'resize': {'width': 800},
+        'enhance': {'brightness': 1.1, 'contrast': 1.2},
+        'filter': 'sharpen'
+    },
+    'png': {'format': 'PNG'}
+}
+
+MEDIA_LIST_SIZES = [1000, 10000, 100000]
+
+# 미디어 목록 측정용 파일 분배 (폴더, 확장자, 비율)
+MEDIA_LIST_LAYOUT = [('images', '.png', 0.6), ('videos', '.mp4', 0.3), ('edited', '.mp4', 0.1)]
+
+
+def percentile(sorted_values, percent):
+    """정렬된 값의 백분위 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(func, repeat, warmup=1):
+    """func를 warmup회 실행한 뒤 repeat회 측정해 ms 단위 통계 반환"""
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'repeat': repeat,
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'min_ms': round(timings[0], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'stdev_ms': round(statistics.stdev(timings), 3) if len(timings) > 1 else 0.0
+    }
+
+
+def _check(result, name):
+    """서비스 반환값이 실패면 예외 (실패한 실행의 시간은 의미가 없음)"""
+    ok = result.get('success') if 'success' in result else result.get('status') == 'success'
+    if not ok:
+        raise RuntimeError(f"{name} 실패: {result.get('error')}")
+    return result
+
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class BenchmarkRunner:
+    """임시 작업 폴더와 Flask 앱을 준비하고 스위트별 측정 실행"""
+
+    def __init__(self, workdir, repeat=5, name_filter=None):
+        self.workdir = workdir
+        self.repeat = repeat
+        self.name_filter = name_filter
+        self.results = {}
+        self.skipped = {}
+
+        from config import Config, TestingConfig
+
+        # 디버그 산출물(플레이스홀더 정보, 자막 파일)과 작업 저장소도 임시 폴더 사용
+        Config.DEBUG_FOLDER = os.path.join(workdir, 'debug')
+        Config.JOB_STORE_PATH = os.path.join(workdir, 'jobs.sqlite3')
+
+        from app import create_app
+
+        bench_config = type('BenchmarkConfig', (TestingConfig,), {
+            'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+            'DEBUG_FOLDER': Config.DEBUG_FOLDER
+        })
+        self.app = create_app(bench_config)
+        self.upload_dir = self.app.config['UPLOAD_FOLDER']
+
+    def _wanted(self, name):
+        return not self.name_filter or self.name_filter in name
+
+    def _record(self, name, func, repeat=None):
+        if not self._wanted(name):
+            return
+        stats = measure(func, repeat or self.repeat)
+        self.results[name] = stats
+        logger.info(f"⏱️ {name}: 중앙값 {stats['median_ms']:.1f}ms, p95 {stats['p95_ms']:.1f}ms")
+
+    def bench_image(self):
+        from PIL import Image
+        from app.services.image_service import ImageService
+
+        with self.app.app_context():
+            for width, height in IMAGE_SIZES:
+                # 단색보다 압축/필터 비용이 실제 사진에 가까운 그라데이션 이미지
+                source = f'bench_{width}x{height}.jpg'
+                Image.radial_gradient('L').resize((width, height)).convert('RGB').save(
+                    os.path.join(self.upload_dir, source), quality=90
+                )
+
+                for option_name, options in IMAGE_OPTIONS.items():
+                    def process(options=options):
+                        result = _check(ImageService.process_image(source, options), 'process_image')
+                        _remove(os.path.join(self.upload_dir, result['processed_filename']))
+
+                    self._record(f'image.process.{option_name}.{width}x{height}', process)
+
+    def bench_video_edit(self):
+        if not shutil.which('ffmpeg'):
+            self.skipped['video_edit'] = 'ffmpeg 실행 파일 없음'
+            logger.warning("⚠️ ffmpeg가 없어 video_edit 스위트를 건너뜁니다")
+            return
+        try:
+            import ffmpeg  # noqa: F401
+        except ImportError:
+            self.skipped['video_edit'] = 'ffmpeg-python 미설치'
+            logger.warning("⚠️ ffmpeg-python이 없어 video_edit 스위트를 건너뜁니다")
+            return
+
+        from PIL import Image
+        from app.services.video_editor import VideoEditor
+
+        clip_dir = os.path.join(self.workdir, 'clips')
+        os.makedirs(clip_dir, exist_ok=True)
+        clips = [self._synthetic_clip(clip_dir, f'clip{index}.mp4', seconds=5, tone=440 + index * 220) for index in range(2)]
+
+        watermark = os.path.join(clip_dir, 'watermark.png')
+        Image.new('RGBA', (120, 40), (255, 255, 255, 180)).save(watermark)
+
+        editor = VideoEditor()
+        editor.output_dir = os.path.join(self.workdir, 'edited')
+        os.makedirs(editor.output_dir, exist_ok=True)
+
+        subtitles = [{'text': f'Benchmark subtitle {index}', 'start': index, 'end': index + 1} for index in range(5)]
+        actions = {
+            'trim': lambda: editor.trim_video(clips[0], 1, 4),
+            'merge': lambda: editor.merge_videos(clips),
+            'add_subtitles': lambda: editor.add_subtitles(clips[0], subtitles),
+            'add_watermark': lambda: editor.add_watermark(clips[0], watermark),
+            'extract_thumbnail': lambda: editor.extract_thumbnail(clips[0], time=2.0, width=320)
+        }
+        # 인코딩이 포함되어 한 번에 수 초가 걸리므로 반복 횟수를 줄임
+        repeat = max(1, min(self.repeat, 3))
+        for action, call in actions.items():
+            def edit(call=call, action=action):
+                _remove(_check(call(), action)['filepath'])
+
+            self._record(f'video_edit.{action}.640x360_5s', edit, repeat=repeat)
+
+    @staticmethod
+    def _synthetic_clip(clip_dir, filename, seconds, tone):
+        """testsrc 영상 + 사인파 음성의 H.264/AAC 합성 클립 생성"""
+        path = os.path.join(clip_dir, filename)
+        subprocess.run([
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'testsrc=size=640x360:rate=30:duration={seconds}',
+            '-f', 'lavfi', '-i', f'sine=frequency={tone}:duration={seconds}',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', path
+        ], check=True)
+        return path
+
+    def bench_placeholder(self):
+        from app.services.generators.placeholder_generator import PlaceholderGenerator
+        from app.services.generators.placeholder_video_generator import PlaceholderVideoGenerator
+
+        output_dir = os.path.join(self.workdir, 'placeholder')
+        os.makedirs(output_dir, exist_ok=True)
+
+        image_generator = PlaceholderGenerator()
+        image_generator.download_dir = output_dir
+        prompt = 'a lighthouse on a cliff at sunset, dramatic clouds, golden hour, highly detailed, cinematic lighting'
+
+        for aspect_ratio in ['9:16', '16:9', '1:1']:
+            def generate_image(aspect_ratio=aspect_ratio):
+                result = _check(asyncio.run(image_generator.generate_image(prompt, aspect_ratio)), 'generate_image')
+                _remove(result['filepath'])
+
+            self._record(f"placeholder.image.{aspect_ratio.replace(':', 'x')}", generate_image)
+
+        # 동영상 생성기는 입력 이미지를 최대 800px로 줄인 뒤 프레임을 만듦
+        source = asyncio.run(image_generator.generate_image(prompt, '16:9'))['filepath']
+        video_generator = PlaceholderVideoGenerator()
+        video_generator.download_dir = output_dir
+
+        for duration in [1, 5]:
+            def generate_video(duration=duration):
+                result = _check(asyncio.run(video_generator.generate_video(source, prompt, duration=duration)), 'generate_video')
+                _remove(result['filepath'])
+
+            self._record(f'placeholder.video.{duration}s', generate_video)
+
+    def bench_media_list(self, sizes=None):
+        client = self.app.test_client()
+        media_root = os.path.join(self.workdir, 'media_list')
+
+        for total in sizes or MEDIA_LIST_SIZES:
+            name = f'media_list.all.{total}'
+            if not self._wanted(name):
+                continue
+
+            # 파일 수만 다른 독립된 업로드 폴더 (빈 파일이어도 listdir/stat/정렬/JSON 비용은 같음)
+            upload_dir = os.path.join(media_root, str(total))
+            self._populate_media(upload_dir, total)
+
+            def list_media(total=total):
+                response = client.get('/api/media/list')
+                if response.status_code != 200:
+                    raise RuntimeError(f'/api/media/list 응답 {response.status_code}')
+                listed = response.get_json()['count']
+                if listed != total:
+                    raise RuntimeError(f'/api/media/list 파일 수 불일치: {listed} != {total}')
+
+            self.app.config['UPLOAD_FOLDER'] = upload_dir
+            try:
+                self._record(name, list_media)
+            finally:
+                self.app.config['UPLOAD_FOLDER'] = self.upload_dir
+                shutil.rmtree(upload_dir, ignore_errors=True)
+
+    @staticmethod
+    def _populate_media(upload_dir, total):
+        logger.info(f"📁 미디어 파일 {total}개 생성 중...")
+        base_time = time.time() - total
+        created = 0
+        for index, (folder, extension, ratio) in enumerate(MEDIA_LIST_LAYOUT):
+            directory = os.path.join(upload_dir, folder)
+            os.makedirs(directory, exist_ok=True)
+            count = total - created if index == len(MEDIA_LIST_LAYOUT) - 1 else int(total * ratio)
+            for number in range(count):
+                path = os.path.join(directory, f'{folder}_{number:06d}{extension}')
+                with open(path, 'wb'):
+                    pass
+                # 정렬 비용이 실제와 비슷하도록 수정 시각을 서로 다르게 지정
+                os.utime(path, (base_time + created + number, base_time + created + number))
+            created += count
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    """측정 환경 (다른 환경의 기준값과 비교할 때 경고용)"""
+    try:
+        import PIL
+        pillow_version = PIL.__version__
+    except ImportError:
+        pillow_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'pillow': pillow_version
+    }
+
+
+def _baseline_path(baseline_dir, name):
+    """기준값 이름 또는 JSON 파일 경로 → 파일 경로"""
+    if name.endswith('.json') or os.sep in name:
+        return name
+    return os.path.join(baseline_dir, f'{name}.json')
+
+
+def compare_reports(previous, current, threshold, min_delta_ms):
+    """
+    항목별 중앙값 비교 표 출력
+
+    threshold 비율보다 많이, 그리고 min_delta_ms보다 크게 느려진 항목을 회귀로 판정합니다
+    (짧은 항목의 측정 잡음을 회귀로 보지 않도록 절대값 기준을 함께 사용).
+
+    Returns:
+        list: 회귀로 판정된 항목 이름
+    """
+    if previous.get('environment') != current.get('environment'):
+        logger.warning("⚠️ 기준값과 측정 환경(Python/플랫폼/CPU/Pillow)이 달라 비교 결과가 부정확할 수 있습니다")
+
+    before_results, after_results = previous['results'], current['results']
+    regressions = []
+    print(f"\n📊 비교: {previous.get('revision') or '기준값'} → {current.get('revision') or '현재'} "
+          f"(회귀 기준 +{threshold * 100:.0f}% 이상, {min_delta_ms}ms 이상)")
+    print(f"{'항목':<46} {'기준(ms)':>12} {'현재(ms)':>12} {'변화':>9}  판정")
+
+    for name in sorted(set(before_results) | set(after_results)):
+        before, after = before_results.get(name), after_results.get(name)
+        if before is None:
+            print(f"{name:<46} {'-':>12} {after['median_ms']:>12.1f} {'':>9}  🆕 새 항목")
+            continue
+        if after is None:
+            print(f"{name:<46} {before['median_ms']:>12.1f} {'-':>12} {'':>9}  ➖ 측정 안 함")
+            continue
+
+        old, new = before['median_ms'], after['median_ms']
+        change = (new - old) / old if old else 0.0
+        if change > threshold and new - old > min_delta_ms:
+            verdict = '🔺 회귀'
+            regressions.append(name)
+        elif change < -threshold and old - new > min_delta_ms:
+            verdict = '🔻 개선'
+        else:
+            verdict = '✅ 유지'
+        print(f"{name:<46} {old:>12.1f} {new:>12.1f} {change * 100:>+8.1f}%  {verdict}")
+
+    if regressions:
+        print(f"\n❌ 회귀 {len(regressions)}개: {', '.join(regressions)}")
+    else:
+        print("\n✅ 회귀 없음")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ImageAuto 마이크로 벤치마크')
+    parser.add_argument('--suite', default=','.join(SUITES), help=f"측정할 스위트 (쉼표 구분, 기본 전체: {','.join(SUITES)})")
+    parser.add_argument('--filter', help='이름에 이 문자열이 들어간 항목만 측정')
+    parser.add_argument('--repeat', type=int, default=5, help='항목당 측정 횟수 (워밍업 1회 별도)')
+    parser.add_argument('--media-sizes', default=','.join(str(size) for size in MEDIA_LIST_SIZES),
+                        help='미디어 목록 측정 파일 수 (쉼표 구분)')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    parser.add_argument('--baseline-dir', default=os.path.join(project_root, 'reports', 'benchmarks'))
+    parser.add_argument('--save-baseline', metavar='NAME', help='결과를 기준값으로 저장')
+    parser.add_argument('--compare', metavar='NAME', help='비교할 기준값 이름 또는 JSON 보고서 경로')
+    parser.add_argument('--threshold', type=float, default=0.15, help='회귀 판정 비율 (기본 0.15 = 15%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='회귀 판정 최소 차이(ms)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='회귀가 있으면 종료 코드 1')
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suite.split(',') if suite.strip()]
+    unknown = [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"알 수 없는 스위트: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='imageauto-bench-')
+    try:
+        runner = BenchmarkRunner(workdir, repeat=args.repeat, name_filter=args.filter)
+        for suite in suites:
+            logger.info(f"▶️ 스위트 실행: {suite}")
+            # 한 스위트가 실패해도 나머지 결과와 기준값은 저장
+            try:
+                if suite == 'media_list':
+                    runner.bench_media_list([int(size) for size in args.media_sizes.split(',') if size.strip()])
+                else:
+                    getattr(runner, f'bench_{suite}')()
+            except Exception as e:
+                runner.skipped[suite] = f'오류: {e}'
+                logger.error(f"❌ {suite} 스위트 실패: {e}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'revision': _git_revision(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': _environment(),
+        'suites': suites,
+        'repeat': args.repeat,
+        'skipped': runner.skipped,
+        'results': runner.results
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+
+    targets = [args.output] if args.output else []
+    if args.save_baseline:
+        targets.append(_baseline_path(args.baseline_dir, args.save_baseline))
+    for path in targets:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"💾 결과 저장: {path}")
+    if not targets and not args.compare:
+        print(output)
+
+    if args.compare:
+        baseline_path = _baseline_path(args.baseline_dir, args.compare)
+        if not os.path.exists(baseline_path):
+            logger.error(f"❌ 기준값 파일이 없습니다: {baseline_path}")
+            sys.exit(2)
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.threshold, args.min_delta_ms)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,23 @@ from dotenv import load_dotenv
 # .env 파일 로드
 load_dotenv()
 
+def _env_float(name, default):
+    """숫자형 환경변수 읽기 (설정하지 않았거나 빈 값이면 기본값 사용, 보존 정책에서 제한 없음은 0)"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return float(value)
+
+def _env_weights(name):
+    """'키:가중치,키:가중치' 형식의 환경변수를 딕셔너리로 변환"""
+    weights = {}
+    for pair in os.environ.get(name, '').split(','):
+        if ':' not in pair:
+            continue
+        key, weight = pair.rsplit(':', 1)
+        weights[key.strip()] = float(weight)
+    return weights
+
 class Config:
     """기본 설정"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -25,9 +42,88 @@ class Config:
     # Playwright 설정
     HEADLESS_BROWSER = os.environ.get('HEADLESS_BROWSER', 'false').lower() == 'true'
     
+    # 배치 생성 설정
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 100))
+    IMAGE_BATCH_MAX_PARALLEL = int(os.environ.get('IMAGE_BATCH_MAX_PARALLEL', 4))
+    
+    # 생성 스케줄러: 테넌트(API 키)별 가중치, batch 작업 최대 대기 시간(초, 초과 시 우선 실행)
+    SCHEDULER_TENANT_WEIGHTS = _env_weights('SCHEDULER_TENANT_WEIGHTS')
+    SCHEDULER_BATCH_MAX_WAIT_SECONDS = _env_float('SCHEDULER_BATCH_MAX_WAIT_SECONDS', 300)
+    
+    # 파이프라인 워크플로우 단계별 워커 수
+    WORKFLOW_STAGE_WORKERS = {
+        'image': int(os.environ.get('WORKFLOW_IMAGE_WORKERS', 1)),
+        'video': int(os.environ.get('WORKFLOW_VIDEO_WORKERS', 3)),
+        'edit': int(os.environ.get('WORKFLOW_EDIT_WORKERS', 2))
+    }
+    
     # FFmpeg 경로
     FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
     
+    # 내부 데이터 저장 위치 (워크플로우 캐시 등)
+    DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    WORKFLOW_CACHE_FOLDER = os.path.join(DATA_FOLDER, 'workflow_cache')
+    
+    # 브라우저 자동화 선택자 순위 (마지막으로 성공한 선택자를 먼저 시도)
+    SELECTOR_CACHE_PATH = os.environ.get('SELECTOR_CACHE_PATH') or os.path.join(DATA_FOLDER, 'selector_cache.json')
+    
+    # 작업 저장소 (재시작 후 미완료 작업 복구)
+    JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH') or os.path.join(DATA_FOLDER, 'jobs.sqlite3')
+    JOB_RECOVERY_ENABLED = os.environ.get('JOB_RECOVERY_ENABLED', 'true').lower() == 'true'
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    
+    # 앱 시작 시 생성기와 무거운 의존성을 백그라운드에서 미리 초기화
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() == 'true'
+    
+    # 브라우저 생성기 단계별 실행 시간 추적 (TRACE_EXPORT_PATH를 지정하면 OTLP/JSON 줄 단위로 기록)
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'true').lower() == 'true'
+    TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 100))
+    TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')
+    
+    # 준비 상태 검사 (/health/ready)
+    HEALTH_CACHE_SECONDS = _env_float('HEALTH_CACHE_SECONDS', 5)
+    HEALTH_KLINGAI_PROBE_SECONDS = _env_float('HEALTH_KLINGAI_PROBE_SECONDS', 60)
+    HEALTH_MIN_FREE_DISK_MB = _env_float('HEALTH_MIN_FREE_DISK_MB', 1024)
+    HEALTH_MAX_QUEUE_DEPTH = int(os.environ.get('HEALTH_MAX_QUEUE_DEPTH', 50))
+    
+    # 디버그 산출물(스크린샷, 플레이스홀더 정보, 자막 중간 파일) 저장 위치
+    DEBUG_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'debug')
+    
+    # 보존 정책 설정 (0이면 해당 제한 없음)
+    # 사용자 미디어(images, videos, edited)는 기본적으로 삭제하지 않으며, 환경변수로 제한을 지정해야 정리됩니다.
+    RETENTION_ENABLED = os.environ.get('RETENTION_ENABLED', 'true').lower() == 'true'
+    RETENTION_INTERVAL_SECONDS = int(os.environ.get('RETENTION_INTERVAL_SECONDS', 3600))
+    RETENTION_POLICIES = {
+        'images': {
+            'max_age_days': _env_float('RETENTION_IMAGES_MAX_AGE_DAYS', 0),
+            'max_size_mb': _env_float('RETENTION_IMAGES_MAX_SIZE_MB', 0)
+        },
+        'videos': {
+            'max_age_days': _env_float('RETENTION_VIDEOS_MAX_AGE_DAYS', 0),
+            'max_size_mb': _env_float('RETENTION_VIDEOS_MAX_SIZE_MB', 0)
+        },
+        'edited': {
+            'max_age_days': _env_float('RETENTION_EDITED_MAX_AGE_DAYS', 0),
+            'max_size_mb': _env_float('RETENTION_EDITED_MAX_SIZE_MB', 0)
+        },
+        'screenshots': {
+            'max_age_days': _env_float('RETENTION_SCREENSHOTS_MAX_AGE_DAYS', 3),
+            'max_size_mb': _env_float('RETENTION_SCREENSHOTS_MAX_SIZE_MB', 500)
+        },
+        'placeholder_info': {
+            'max_age_days': _env_float('RETENTION_PLACEHOLDER_INFO_MAX_AGE_DAYS', 3),
+            'max_size_mb': _env_float('RETENTION_PLACEHOLDER_INFO_MAX_SIZE_MB', 50)
+        },
+        'subtitles': {
+            'max_age_days': _env_float('RETENTION_SUBTITLES_MAX_AGE_DAYS', 1),
+            'max_size_mb': _env_float('RETENTION_SUBTITLES_MAX_SIZE_MB', 50)
+        },
+        'workflow_cache': {
+            'max_age_days': _env_float('RETENTION_WORKFLOW_CACHE_MAX_AGE_DAYS', 14),
+            'max_size_mb': _env_float('RETENTION_WORKFLOW_CACHE_MAX_SIZE_MB', 100)
+        }
+    }
+    
     # 서버 설정
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5000))
@@ -47,6 +143,9 @@ class TestingConfig(Config):
     """테스트 환경 설정"""
     TESTING = True
     WTF_CSRF_ENABLED = False
+    RETENTION_ENABLED = False
+    JOB_RECOVERY_ENABLED = False
+    WARMUP_ENABLED = False
 
 # 설정 선택을 위한 딕셔너리
 config = {
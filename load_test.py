@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+ImageAuto API 부하 테스트
+
+동시 사용자 수를 단계별로 늘리며(--ramp) 시나리오별 처리량, 지연 시간 백분위, 오류율을 측정하고
+JSON 보고서로 저장합니다. 변경 전후 보고서를 --compare로 비교할 수 있습니다.
+
+사용 예:
+    # 플레이스홀더 생성기로 서버를 직접 띄워 측정
+    python load_test.py --start-server --ramp 1,4,16 --stage-seconds 20 --output reports/before.json
+
+    # KlingAI API 대체 서버(mock_klingai_server.py)까지 띄워 API 생성기 경로 측정
+    python load_test.py --start-server --mock-klingai "--latency uniform:1,3 --rate-limit-rate 0.05"
+
+    # 이미 실행 중인 서버 측정 후 이전 결과와 비교
+    python load_test.py --base-url http://127.0.0.1:5000 --output reports/after.json --compare reports/before.json
+
+시나리오 (--scenario, 기본 mixed):
+    image       POST /api/generate/image
+    video       POST /api/generate/video (image-to-video)
+    media_list  GET /api/media/list
+    uploads     GET /uploads/... (생성된 파일 다운로드)
+    mixed       위 시나리오를 MIXED_WEIGHTS 비율로 섞어서 실행
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import signal
+import asyncio
+import argparse
+import statistics
+import subprocess
+import aiohttp
+
+import logging
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+
+# mixed 시나리오의 요청 비율
+MIXED_WEIGHTS = {'image': 0.2, 'video': 0.1, 'media_list': 0.4, 'uploads': 0.3}
+
+PROMPTS = [
+    'a lighthouse on a cliff at sunset',
+    'a cat sleeping on a stack of books',
+    'neon city street in the rain',
+    'a bowl of ramen, studio lighting'
+]
+
+
+def percentile(sorted_values, percent):
+    """정렬된 값의 백분위 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, seconds):
+    """요청 기록 [(지연 초, HTTP 상태, 성공 여부)] → 처리량/지연/오류율 요약"""
+    latencies = sorted(latency * 1000 for latency, _, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    status_codes = {}
+    for _, status, _ in samples:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / seconds, 2) if seconds else None,
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'status_codes': status_codes,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 1) if latencies else None,
+            'p50': round(percentile(latencies, 50), 1) if latencies else None,
+            'p90': round(percentile(latencies, 90), 1) if latencies else None,
+            'p95': round(percentile(latencies, 95), 1) if latencies else None,
+            'p99': round(percentile(latencies, 99), 1) if latencies else None,
+            'max': round(latencies[-1], 1) if latencies else None
+        }
+    }
+
+
+class LoadTester:
+    def __init__(self, base_url, timeout=300, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rng = random.Random(seed)
+        self.image_paths = []   # 동영상 생성에 사용할 이미지 웹 경로
+        self.upload_urls = []   # 다운로드 시나리오에서 사용할 파일 주소
+
+    async def _request(self, session, method, path, **kwargs):
+        """요청 하나 실행 (응답 본문까지 모두 읽은 시간 측정)"""
+        started = time.monotonic()
+        try:
+            async with session.request(method, f'{self.base_url}{path}', **kwargs) as response:
+                body = await response.read()
+                ok = response.status == 200
+                if ok and response.content_type == 'application/json':
+                    payload = json.loads(body)
+                    ok = payload.get('success', True) is not False
+                else:
+                    payload = None
+                return (time.monotonic() - started, response.status, ok), payload
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"요청 실패 ({method} {path}): {e}")
+            return (time.monotonic() - started, type(e).__name__, False), None
+
+    async def scenario_image(self, session):
+        sample, payload = await self._request(session, 'POST', '/api/generate/image', json={
+            'prompt': self.rng.choice(PROMPTS),
+            'aspect_ratio': self.rng.choice(['9:16', '16:9', '1:1'])
+        })
+        if payload and payload.get('web_path'):
+            self.image_paths.append(payload['web_path'])
+            self.upload_urls.append(payload['web_path'])
+        return sample
+
+    async def scenario_video(self, session):
+        if not self.image_paths:
+            return await self.scenario_image(session)
+        sample, payload = await self._request(session, 'POST', '/api/generate/video', json={
+            'type': 'image-to-video',
+            'imagePath': self.rng.choice(self.image_paths),
+            'prompt': self.rng.choice(PROMPTS),
+            'duration': '5'
+        })
+        if payload and payload.get('web_path'):
+            self.upload_urls.append(payload['web_path'])
+        return sample
+
+    async def scenario_media_list(self, session):
+        sample, _ = await self._request(session, 'GET', '/api/media/list')
+        return sample
+
+    async def scenario_uploads(self, session):
+        if not self.upload_urls:
+            return await self.scenario_media_list(session)
+        sample, _ = await self._request(session, 'GET', self.rng.choice(self.upload_urls))
+        return sample
+
+    async def prepare(self, session):
+        """시나리오에 필요한 이미지와 파일 목록 준비"""
+        _, payload = await self._request(session, 'GET', '/api/media/list')
+        if payload:
+            media = payload.get('media', {})
+            self.image_paths = [item['url'] for item in media.get('images', [])[:50]]
+            self.upload_urls = [item['url'] for files in media.values() for item in files[:50]]
+        if not self.image_paths:
+            await self.scenario_image(session)
+        logger.info(f"📦 준비 완료: 이미지 {len(self.image_paths)}개, 다운로드 대상 {len(self.upload_urls)}개")
+
+    def _pick(self, scenario):
+        if scenario != 'mixed':
+            return scenario
+        names = list(MIXED_WEIGHTS)
+        return self.rng.choices(names, weights=[MIXED_WEIGHTS[name] for name in names])[0]
+
+    async def run_stage(self, session, scenario, concurrency, seconds):
+        """동시 사용자 concurrency명이 seconds초 동안 쉬지 않고 요청 (closed loop)"""
+        samples = {}
+        deadline = time.monotonic() + seconds
+
+        async def user():
+            while time.monotonic() < deadline:
+                name = self._pick(scenario)
+                sample = await getattr(self, f'scenario_{name}')(session)
+                samples.setdefault(name, []).append(sample)
+
+        started = time.monotonic()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+        all_samples = [sample for values in samples.values() for sample in values]
+        return {
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 2),
+            'overall': summarize(all_samples, elapsed),
+            'scenarios': {name: summarize(values, elapsed) for name, values in sorted(samples.items())}
+        }
+
+    async def run(self, scenario, ramp, stage_seconds):
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            await self.prepare(session)
+            stages = []
+            for concurrency in ramp:
+                logger.info(f"🚦 동시 사용자 {concurrency}명, {stage_seconds}초 측정 중...")
+                stage = await self.run_stage(session, scenario, concurrency, stage_seconds)
+                overall = stage['overall']
+                logger.info(
+                    f"   {overall['rps']} req/s, p50 {overall['latency_ms']['p50']}ms, "
+                    f"p95 {overall['latency_ms']['p95']}ms, 오류율 {overall['error_rate'] * 100:.1f}%"
+                )
+                stages.append(stage)
+            return stages
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _start_process(args, env, name):
+    logger.info(f"▶️ {name} 실행: {' '.join(args)}")
+    return subprocess.Popen(args, cwd=project_root, env=env, start_new_session=(os.name == 'posix'))
+
+
+def _stop_process(process):
+    if process.poll() is not None:
+        return
+    if os.name == 'posix':
+        os.killpg(process.pid, signal.SIGTERM)
+    else:
+        process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def wait_until_ready(base_url, timeout=120):
+    """/health/ready가 200을 돌려줄 때까지 대기 (생성기 warm-up 포함)"""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f'{base_url}/health/ready') as response:
+                    if response.status == 200:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(1)
+    return False
+
+
+def compare_reports(previous, current):
+    """두 보고서의 같은 동시 사용자 단계끼리 처리량과 p95 지연 비교 출력"""
+    previous_stages = {stage['concurrency']: stage for stage in previous['stages']}
+    print(f"\n📊 비교: {previous.get('revision') or '이전'} → {current.get('revision') or '현재'}")
+    print(f"{'동시 사용자':>10} {'req/s':>18} {'p95(ms)':>20} {'오류율':>16}")
+    for stage in current['stages']:
+        before = previous_stages.get(stage['concurrency'])
+        if before is None:
+            continue
+        old, new = before['overall'], stage['overall']
+
+        def change(old_value, new_value):
+            if not old_value or new_value is None:
+                return f"{old_value} → {new_value}"
+            return f"{old_value} → {new_value} ({(new_value - old_value) / old_value * 100:+.0f}%)"
+
+        print(
+            f"{stage['concurrency']:>10} {change(old['rps'], new['rps']):>18} "
+            f"{change(old['latency_ms']['p95'], new['latency_ms']['p95']):>20} "
+            f"{old['error_rate'] * 100:.1f}% → {new['error_rate'] * 100:.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ImageAuto API 부하 테스트')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scenario', default='mixed', choices=['mixed', 'image', 'video', 'media_list', 'uploads'])
+    parser.add_argument('--ramp', default='1,2,4,8', help='단계별 동시 사용자 수 (쉼표 구분)')
+    parser.add_argument('--stage-seconds', type=float, default=15)
+    parser.add_argument('--timeout', type=float, default=300, help='요청 하나의 최대 대기 시간(초)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--start-server', action='store_true',
+                        help='플레이스홀더 생성기로 서버를 띄워서 측정 (--base-url의 포트 사용)')
+    parser.add_argument('--mock-klingai', metavar='ARGS', nargs='?', const='',
+                        help='KlingAI API 대체 서버를 띄우고 API 생성기로 동영상 생성 (대체 서버 옵션 문자열)')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    parser.add_argument('--compare', help='비교할 이전 JSON 보고서')
+    args = parser.parse_args()
+
+    ramp = [int(value) for value in args.ramp.split(',') if value.strip()]
+    processes = []
+    try:
+        if args.start_server:
+            port = args.base_url.rsplit(':', 1)[-1].split('/')[0]
+            env = {
+                **os.environ,
+                'FLASK_ENV': 'production',
+                'PORT': port,
+                'USE_PLACEHOLDER_GENERATOR': 'true',
+                'VIDEO_GENERATOR_TYPE': 'placeholder',
+                'RETENTION_ENABLED': 'false'
+            }
+            if args.mock_klingai is not None:
+                mock_port = '8791'
+                processes.append(_start_process(
+                    [sys.executable, 'mock_klingai_server.py', '--port', mock_port, *args.mock_klingai.split()],
+                    os.environ.copy(), 'KlingAI 대체 서버'
+                ))
+                env.update({
+                    'VIDEO_GENERATOR_TYPE': 'api',
+                    'KLINGAI_API_BASE_URL': f'http://127.0.0.1:{mock_port}',
+                    'KLINGAI_API_KEY': env.get('KLINGAI_API_KEY') or 'load-test-key',
+                    'KLINGAI_SECRET_KEY': env.get('KLINGAI_SECRET_KEY') or 'load-test-secret',
+                    'KLINGAI_POLL_INTERVAL': '0.5'
+                })
+            processes.append(_start_process([sys.executable, 'run.py'], env, 'ImageAuto 서버'))
+
+        if not asyncio.run(wait_until_ready(args.base_url)):
+            logger.error(f"❌ 서버가 준비되지 않았습니다: {args.base_url}")
+            sys.exit(1)
+
+        tester = LoadTester(args.base_url, timeout=args.timeout, seed=args.seed)
+        stages = asyncio.run(tester.run(args.scenario, ramp, args.stage_seconds))
+    finally:
+        for process in reversed(processes):
+            _stop_process(process)
+
+    report = {
+        'revision': _git_revision(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'base_url': args.base_url,
+        'scenario': args.scenario,
+        'ramp': ramp,
+        'stage_seconds': args.stage_seconds,
+        'backends': {
+            'started_server': args.start_server,
+            'mock_klingai': args.mock_klingai
+        },
+        'stages': stages
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"💾 보고서 저장: {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
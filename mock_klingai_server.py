@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+KlingAI API 로컬 대체 서버 (부하/지연 테스트용)
+
+/v1/videos/image2video 작업 제출과 상태 조회를 실제 API와 같은 응답 형식으로 흉내 내고,
+완료된 작업은 가짜 MP4 파일 주소를 돌려줍니다. 렌더링 시간 분포, 오류율, 429 비율을 지정할 수 있어
+노트북에서 KlingAIVideoGenerator의 폴링과 UnifiedVideoGenerator의 동시 실행 제한/대체 생성기 전환을 시험할 수 있습니다.
+
+사용 예:
+    python mock_klingai_server.py --port 8791 --latency lognormal:3.0,0.5 --error-rate 0.05 --rate-limit-rate 0.1
+
+    # 생성기를 대체 서버로 연결 (.env 또는 환경변수)
+    KLINGAI_API_BASE_URL=http://127.0.0.1:8791
+    KLINGAI_POLL_INTERVAL=1
+
+렌더링 시간 분포 (--latency, 초):
+    fixed:30            항상 30초
+    uniform:10,60       10~60초 균등 분포
+    normal:40,10        평균 40초, 표준편차 10초
+    lognormal:3.5,0.4   ln(초)의 평균/표준편차 (오른쪽 꼬리가 긴 실제 렌더링 시간과 비슷)
+    exp:30              평균 30초 지수 분포
+"""
+
+import os
+import time
+import uuid
+import random
+import struct
+import argparse
+import logging
+from aiohttp import web
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def parse_latency(spec):
+    """
+    렌더링 시간 분포 문자열을 샘플링 함수로 변환
+
+    Returns:
+        callable: (random.Random) -> 초 (0 이상)
+    """
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(value) for value in args.split(',')] if args else []
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"잘못된 분포 인자: {spec}")
+
+    samplers = {
+        'fixed': (1, lambda rng, v: v[0]),
+        'uniform': (2, lambda rng, v: rng.uniform(v[0], v[1])),
+        'normal': (2, lambda rng, v: rng.gauss(v[0], v[1])),
+        'lognormal': (2, lambda rng, v: rng.lognormvariate(v[0], v[1])),
+        'exp': (1, lambda rng, v: rng.expovariate(1 / v[0]))
+    }
+    if kind not in samplers or len(values) != samplers[kind][0]:
+        raise argparse.ArgumentTypeError(f"알 수 없는 분포: {spec} (fixed:S, uniform:A,B, normal:M,SD, lognormal:MU,SIGMA, exp:MEAN)")
+
+    sample = samplers[kind][1]
+    return lambda rng: max(0.0, sample(rng, values))
+
+
+def fake_mp4(size_bytes):
+    """
+    MP4 컨테이너 구조(ftyp + free + mdat 박스)를 갖춘 가짜 동영상 바이트
+
+    재생되지는 않지만 파일 형식 확인(매직 바이트)과 다운로드 진행률 시험에는 충분합니다.
+    """
+    ftyp = b'isom' + struct.pack('>I', 512) + b'isomiso2avc1mp41'
+    ftyp_box = struct.pack('>I', 8 + len(ftyp)) + b'ftyp' + ftyp
+    free_box = struct.pack('>I', 8) + b'free'
+    payload_size = max(0, size_bytes - len(ftyp_box) - len(free_box) - 8)
+    mdat_box = struct.pack('>I', 8 + payload_size) + b'mdat' + os.urandom(payload_size)
+    return ftyp_box + free_box + mdat_box
+
+
+class MockKlingAI:
+    """작업 상태와 통계 (이벤트 루프 하나에서만 접근)"""
+
+    def __init__(self, latency, error_rate=0.0, rate_limit_rate=0.0, task_failure_rate=0.0,
+                 max_concurrent=0, retry_after=5, video_size=256 * 1024, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.task_failure_rate = task_failure_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.video = fake_mp4(video_size)
+        self.tasks = {}
+        self.stats = {
+            'submitted': 0, 'rate_limited': 0, 'concurrency_limited': 0, 'errors': 0,
+            'polls': 0, 'succeeded': 0, 'failed': 0, 'downloads': 0
+        }
+
+    def _envelope(self, data, code=0, message='SUCCEED'):
+        return {'code': code, 'message': message, 'request_id': uuid.uuid4().hex, 'data': data}
+
+    def _active_count(self):
+        now = time.time()
+        return sum(1 for task in self.tasks.values() if task['finishes_at'] > now)
+
+    def _task_status(self, task):
+        """경과 시간으로 상태 계산 (렌더링 시간의 앞 10%는 submitted)"""
+        now = time.time()
+        if now >= task['finishes_at']:
+            return 'failed' if task['fails'] else 'succeed'
+        if now - task['created_at'] < 0.1 * (task['finishes_at'] - task['created_at']):
+            return 'submitted'
+        return 'processing'
+
+    def _task_data(self, request, task):
+        status = self._task_status(task)
+        data = {
+            'task_id': task['task_id'],
+            'task_status': status,
+            'created_at': int(task['created_at'] * 1000),
+            'updated_at': int(min(time.time(), task['finishes_at']) * 1000)
+        }
+        if status == 'failed':
+            data['task_status_msg'] = 'Mock render failure'
+        if status == 'succeed':
+            base = f"{request.scheme}://{request.host}"
+            data['task_result'] = {'videos': [{
+                'id': task['task_id'],
+                'url': f"{base}/videos/{task['task_id']}.mp4",
+                'duration': task['duration']
+            }]}
+        return data
+
+    def _record_outcome(self, task):
+        """완료된 작업을 처음 조회했을 때 한 번만 집계"""
+        if not task['counted'] and time.time() >= task['finishes_at']:
+            task['counted'] = True
+            self.stats['failed' if task['fails'] else 'succeeded'] += 1
+
+    async def submit(self, request):
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return web.json_response(self._envelope(None, 1000, 'Authentication failed'), status=401)
+
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response(self._envelope(None, 1200, 'Invalid request body'), status=400)
+        if not body.get('image'):
+            return web.json_response(self._envelope(None, 1201, 'image is required'), status=400)
+
+        if self.rng.random() < self.rate_limit_rate:
+            self.stats['rate_limited'] += 1
+            return web.json_response(
+                self._envelope(None, 1302, 'Rate limit exceeded'), status=429,
+                headers={'Retry-After': str(self.retry_after)}
+            )
+        if self.max_concurrent and self._active_count() >= self.max_concurrent:
+            self.stats['concurrency_limited'] += 1
+            return web.json_response(
+                self._envelope(None, 1303, 'Parallel task limit exceeded'), status=429,
+                headers={'Retry-After': str(self.retry_after)}
+            )
+        if self.rng.random() < self.error_rate:
+            self.stats['errors'] += 1
+            return web.json_response(self._envelope(None, 5000, 'Internal server error'), status=500)
+
+        now = time.time()
+        task = {
+            'task_id': uuid.uuid4().hex,
+            'created_at': now,
+            'finishes_at': now + self.latency(self.rng),
+            'fails': self.rng.random() < self.task_failure_rate,
+            'duration': str(body.get('duration', '5')),
+            'counted': False
+        }
+        self.tasks[task['task_id']] = task
+        self.stats['submitted'] += 1
+        logger.info(f"🎬 작업 제출: {task['task_id']} ({task['finishes_at'] - now:.1f}초 후 완료)")
+        return web.json_response(self._envelope({
+            'task_id': task['task_id'],
+            'task_status': 'submitted',
+            'created_at': int(now * 1000),
+            'updated_at': int(now * 1000)
+        }))
+
+    async def status(self, request):
+        self.stats['polls'] += 1
+        task = self.tasks.get(request.match_info['task_id'])
+        if task is None:
+            return web.json_response(self._envelope(None, 1203, 'Task not found'), status=404)
+        if self.rng.random() < self.error_rate:
+            self.stats['errors'] += 1
+            return web.json_response(self._envelope(None, 5000, 'Internal server error'), status=500)
+
+        self._record_outcome(task)
+        return web.json_response(self._envelope(self._task_data(request, task)))
+
+    async def download(self, request):
+        task = self.tasks.get(request.match_info['task_id'])
+        if task is None or self._task_status(task) != 'succeed':
+            raise web.HTTPNotFound()
+
+        self.stats['downloads'] += 1
+        response = web.StreamResponse(headers={'Content-Type': 'video/mp4'})
+        response.content_length = len(self.video)
+        await response.prepare(request)
+        for start in range(0, len(self.video), 64 * 1024):
+            await response.write(self.video[start:start + 64 * 1024])
+        await response.write_eof()
+        return response
+
+    async def get_stats(self, request):
+        return web.json_response({**self.stats, 'active_tasks': self._active_count(), 'total_tasks': len(self.tasks)})
+
+
+def create_app(mock):
+    app = web.Application(client_max_size=20 * 1024 * 1024)  # Base64 이미지 (최대 10MB 원본)
+    app.router.add_post('/v1/videos/image2video', mock.submit)
+    app.router.add_get('/v1/videos/image2video/{task_id}', mock.status)
+    app.router.add_get('/videos/{task_id}.mp4', mock.download)
+    app.router.add_get('/stats', mock.get_stats)
+    # 헬스 체크(생성기 base_url 연결 확인)용
+    app.router.add_get('/', lambda request: web.json_response({'status': 'ok', 'mock': 'klingai'}))
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KlingAI API 로컬 대체 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8791)
+    parser.add_argument('--latency', type=parse_latency, default=parse_latency('uniform:5,15'),
+                        help='렌더링 시간 분포 (기본 uniform:5,15)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='HTTP 500을 돌려줄 확률 (제출/조회)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='제출 요청에 429를 돌려줄 확률')
+    parser.add_argument('--task-failure-rate', type=float, default=0.0, help='렌더링이 failed로 끝날 확률')
+    parser.add_argument('--max-concurrent', type=int, default=0, help='동시 렌더링 작업 수 한도 (초과 시 429, 0이면 제한 없음)')
+    parser.add_argument('--retry-after', type=int, default=5, help='429 응답의 Retry-After(초)')
+    parser.add_argument('--video-size-kb', type=int, default=256, help='가짜 MP4 크기(KB)')
+    parser.add_argument('--seed', type=int, help='난수 시드 (같은 순서의 요청에 같은 결과)')
+    args = parser.parse_args()
+
+    mock = MockKlingAI(
+        args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        task_failure_rate=args.task_failure_rate,
+        max_concurrent=args.max_concurrent,
+        retry_after=args.retry_after,
+        video_size=args.video_size_kb * 1024,
+        seed=args.seed
+    )
+    logger.info(f"🧪 KlingAI 대체 서버: http://{args.host}:{args.port} (KLINGAI_API_BASE_URL로 지정)")
+    web.run_app(create_app(mock), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+브라우저 세션 재생 도구 (ImageFX / KlingAI 웹 자동화를 실제 사이트 없이 실행)
+
+먼저 BROWSER_RECORD_DIR을 지정하고 서버에서 한 번 생성하면
+<BROWSER_RECORD_DIR>/<site>/<시각>-<label>/ 폴더에 HAR와 단계별 DOM 스냅샷이 기록됩니다.
+
+사용 예:
+    # 기록한 세션으로 생성 흐름을 반복 실행하고 단계별 소요 시간 측정
+    python session_replay.py bench imagefx recordings/imagefx/20250101-120000-slot0 --runs 5
+
+    # 단계별 DOM 스냅샷에서 저장된 선택자가 아직 요소를 찾는지 확인
+    python session_replay.py check recordings/imagefx/20250101-120000-slot0
+
+    # HAR 응답을 그대로 돌려주는 로컬 대체 서버 실행
+    # (IMAGEFX_URL=http://127.0.0.1:8790/tools/image-fx 처럼 생성기 주소를 바꿔서 사용)
+    python session_replay.py serve recordings/imagefx/20250101-120000-slot0 --port 8790
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+import statistics
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import logging
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+from app.services.generators.session_recorder import HAR_FILENAME, MANIFEST_FILENAME
+
+# 로컬 서버가 응답에서 제외하는 헤더 (본문을 다시 쓰거나 로컬 주소를 막는 헤더)
+_DROPPED_HEADERS = {
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+    'content-security-policy', 'content-security-policy-report-only', 'strict-transport-security'
+}
+_TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'application/x-javascript')
+
+
+def load_manifest(session_dir):
+    with open(os.path.join(session_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------------------------
+# serve: HAR 기반 로컬 대체 서버
+# ---------------------------------------------------------------------------
+
+class HarArchive:
+    """HAR 응답을 (호스트, 메서드, 경로) 기준으로 찾는 저장소 (같은 요청이 여러 번이면 기록된 순서대로 반환)"""
+
+    def __init__(self, har_path):
+        with open(har_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['log']['entries']
+
+        self.entries = {}
+        self.main_host = None
+        for entry in entries:
+            url = urlsplit(entry['request']['url'])
+            if url.scheme not in ('http', 'https'):
+                continue
+            path = url.path + (f'?{url.query}' if url.query else '')
+            self.entries.setdefault((url.hostname, entry['request']['method'], path), []).append(entry)
+            if url.query:
+                self.entries.setdefault((url.hostname, entry['request']['method'], url.path), []).append(entry)
+
+            if self.main_host is None and entry['response']['content'].get('mimeType', '').startswith('text/html'):
+                self.main_host = url.hostname
+
+        self.hosts = sorted({host for host, _, _ in self.entries}, key=len, reverse=True)
+        self._served = {}
+
+    def find(self, host, method, path):
+        """경로(쿼리 포함) → 경로만 순서로 찾고, 같은 요청은 기록된 응답을 차례로 반환 (마지막 응답은 반복)"""
+        for key in ((host, method, path), (host, method, path.split('?', 1)[0])):
+            candidates = self.entries.get(key)
+            if candidates:
+                index = self._served.get(key, 0)
+                self._served[key] = index + 1
+                return candidates[min(index, len(candidates) - 1)]
+        return None
+
+
+def _decode_body(content):
+    text = content.get('text', '')
+    if content.get('encoding') == 'base64':
+        return base64.b64decode(text)
+    return text.encode('utf-8')
+
+
+def make_handler(archive, base_url):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def _rewrite(self, body):
+            """기록된 호스트의 절대 주소를 로컬 서버 주소로 변경 (페이지가 실제 사이트로 요청하지 않도록)"""
+            text = body.decode('utf-8', errors='replace')
+            for host in archive.hosts:
+                local = base_url if host == archive.main_host else f'{base_url}/__host/{host}'
+                text = text.replace(f'https://{host}', local).replace(f'http://{host}', local)
+            return text.encode('utf-8')
+
+        def _handle(self):
+            # 요청 본문은 응답 선택에 쓰지 않지만 연결 재사용을 위해 읽어 둠
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+
+            host, path = archive.main_host, self.path
+            if path.startswith('/__host/'):
+                host, _, rest = path[len('/__host/'):].partition('/')
+                path = '/' + rest
+
+            entry = archive.find(host, self.command, path)
+            if entry is None:
+                self.send_error(404, 'Not recorded', f'기록에 없는 요청: {host}{path}')
+                return
+
+            response = entry['response']
+            body = _decode_body(response['content'])
+            mime_type = response['content'].get('mimeType', '')
+            if mime_type.startswith(_TEXT_TYPES):
+                body = self._rewrite(body)
+
+            self.send_response(response['status'] or 200)
+            for header in response['headers']:
+                name = header['name']
+                if name.lower() in _DROPPED_HEADERS or name.startswith(':'):
+                    continue
+                value = header['value']
+                if name.lower() == 'location':
+                    value = self._rewrite(value.encode('utf-8')).decode('utf-8')
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = do_PATCH = _handle
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return ReplayHandler
+
+
+def serve(session_dir, host, port):
+    archive = HarArchive(os.path.join(session_dir, HAR_FILENAME))
+    base_url = f'http://{host}:{port}'
+    server = ThreadingHTTPServer((host, port), make_handler(archive, base_url))
+    logger.info(f"⏯️ 로컬 대체 서버 실행: {base_url} (기본 호스트 {archive.main_host}, 기록된 호스트 {len(archive.hosts)}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# check: DOM 스냅샷에서 선택자 확인
+# ---------------------------------------------------------------------------
+
+async def check_selectors(session_dir):
+    """
+    기록된 단계별 DOM에서 선택자 캐시의 선택자가 요소를 찾는지 확인
+
+    Returns:
+        dict: {선택자 키: {선택자: [요소를 찾은 단계, ...]}}
+    """
+    from playwright.async_api import async_playwright
+    from app.services.generators.selector_cache import get_selector_cache
+
+    manifest = load_manifest(session_dir)
+    selectors = get_selector_cache().to_dict().get(manifest['site'], {})
+    if not selectors:
+        logger.warning(f"선택자 캐시에 {manifest['site']} 기록이 없습니다. 먼저 한 번 생성해 주세요.")
+
+    report = {key: {selector: [] for selector in entries} for key, entries in selectors.items()}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        # 스냅샷의 스크립트가 실행되어 DOM이 바뀌지 않도록
+        context = await browser.new_context(java_script_enabled=False)
+        page = await context.new_page()
+        try:
+            for snapshot in manifest['snapshots']:
+                with open(os.path.join(session_dir, snapshot['file']), 'r', encoding='utf-8') as f:
+                    await page.set_content(f.read(), wait_until='domcontentloaded')
+                for key, entries in selectors.items():
+                    for selector in entries:
+                        try:
+                            if await page.locator(selector).count():
+                                report[key][selector].append(snapshot['step'])
+                        except Exception as e:
+                            logger.debug(f"선택자 확인 실패 ({selector}): {e}")
+        finally:
+            await browser.close()
+
+    for key, entries in report.items():
+        print(f"\n🔎 {manifest['site']}/{key}")
+        for selector, steps in entries.items():
+            stats = selectors[key][selector]
+            status = '✅' if steps else ('❌' if stats['hits'] else '·')
+            print(f"   {status} {selector}  (성공 {stats['hits']}회) {', '.join(steps) if steps else '찾지 못함'}")
+    return report
+
+
+# ---------------------------------------------------------------------------
+# bench: 기록된 세션으로 생성 흐름 반복 실행
+# ---------------------------------------------------------------------------
+
+async def run_bench(site, session_dir, runs, prompt, image_path):
+    """
+    기록된 세션을 재생하며 생성 흐름을 runs번 실행하고 단계별 소요 시간 집계
+
+    Returns:
+        dict: {'runs': [...], 'steps': {단계: {'mean_ms', 'p50_ms', 'max_ms'}}, 'total': {...}}
+        (단계별 시간은 trace에서 가져오므로 TRACING_ENABLED=true여야 함)
+    """
+    os.environ[f'{site.upper()}_REPLAY_SESSION'] = os.path.abspath(session_dir)
+
+    from app.services import tracing
+
+    if site == 'imagefx':
+        from app.services.generators.imagefx_generator import ImageFXGenerator
+        generator = ImageFXGenerator(pool_size=1)
+        run_once = lambda: generator.generate_image(prompt)
+    elif site == 'klingai_web':
+        os.environ.setdefault('KLINGAI_WEB_MANUAL_WAIT_SECONDS', '0')
+        from app.services.generators.klingai_web_generator import KlingAIWebGenerator
+        generator = KlingAIWebGenerator()
+        run_once = lambda: generator.generate_video(image_path, prompt)
+    else:
+        raise ValueError(f"알 수 없는 사이트: {site}")
+
+    results = []
+    for index in range(runs):
+        started = time.monotonic()
+        result = await run_once()
+        elapsed = time.monotonic() - started
+        trace = tracing.recent_traces(limit=1)
+        results.append({
+            'run': index + 1,
+            'status': result.get('status'),
+            'error': result.get('error'),
+            'seconds': round(elapsed, 3),
+            'steps': {entry['name']: entry['total_ms'] for entry in trace[0]['summary']} if trace else {}
+        })
+        logger.info(f"⏱️ {index + 1}/{runs}: {result.get('status')} {elapsed:.2f}초")
+
+    steps = {}
+    for run in results:
+        for name, duration in run['steps'].items():
+            steps.setdefault(name, []).append(duration)
+    totals = [run['seconds'] for run in results]
+
+    return {
+        'site': site,
+        'session': os.path.abspath(session_dir),
+        'runs': results,
+        'steps': {
+            name: {
+                'mean_ms': round(statistics.mean(values), 1),
+                'p50_ms': round(statistics.median(values), 1),
+                'max_ms': round(max(values), 1)
+            }
+            for name, values in sorted(steps.items(), key=lambda item: -statistics.mean(item[1]))
+        },
+        'total': {
+            'mean_seconds': round(statistics.mean(totals), 3),
+            'p50_seconds': round(statistics.median(totals), 3),
+            'succeeded': sum(1 for run in results if run['status'] == 'success')
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='브라우저 세션 재생 도구')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='HAR 응답을 돌려주는 로컬 대체 서버 실행')
+    serve_parser.add_argument('session_dir')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8790)
+
+    check_parser = subparsers.add_parser('check', help='DOM 스냅샷에서 저장된 선택자 확인')
+    check_parser.add_argument('session_dir')
+
+    bench_parser = subparsers.add_parser('bench', help='기록된 세션으로 생성 흐름 반복 실행')
+    bench_parser.add_argument('site', choices=['imagefx', 'klingai_web'])
+    bench_parser.add_argument('session_dir')
+    bench_parser.add_argument('--runs', type=int, default=3)
+    bench_parser.add_argument('--prompt', default='a lighthouse on a cliff at sunset')
+    bench_parser.add_argument('--image', help='KlingAI 웹에 업로드할 이미지 경로')
+    bench_parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.session_dir, args.host, args.port)
+    elif args.command == 'check':
+        asyncio.run(check_selectors(args.session_dir))
+    elif args.command == 'bench':
+        if args.site == 'klingai_web' and not args.image:
+            parser.error('klingai_web은 --image가 필요합니다.')
+        report = asyncio.run(run_bench(args.site, args.session_dir, args.runs, args.prompt, args.image))
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(output)
+            logger.info(f"💾 결과 저장: {args.output}")
+        print(output)
+
+
+if __name__ == '__main__':
+    main()